@@ -0,0 +1 @@
+"""Genbu benchmarks."""
@@ -0,0 +1,44 @@
+"""Benchmark chained commands against one process per command.
+
+Run: python -m benchmarks.bench_chain
+"""
+
+import subprocess
+import sys
+import typing as t
+
+from .common import measure, report
+
+
+REF = "examples.hello:cli"
+CODE = "from genbu.refs import resolve; resolve({!r}).{}({!r})"
+
+
+def run_separately(commands: t.List[t.List[str]]) -> None:
+    """Run each command in a fresh interpreter."""
+    for argv in commands:
+        code = CODE.format(REF, "run", argv)
+        subprocess.run([sys.executable, "-c", code], check=True,
+                       stdout=subprocess.DEVNULL)
+
+
+def run_chained(commands: t.List[t.List[str]]) -> None:
+    """Run commands as one chain in a fresh interpreter."""
+    argv = [token for command in commands for token in [*command, "+"]]
+    code = CODE.format(REF, "run_chain", argv)
+    subprocess.run([sys.executable, "-c", code], check=True,
+                   stdout=subprocess.DEVNULL)
+
+
+def main() -> None:
+    """Run benchmarks."""
+    count = 20
+    commands = [["-g", "Hi", f"user{i}"] for i in range(count)]
+    report(f"separate processes ({count} commands)",
+           measure(run_separately, commands, repeat=1), count)
+    report(f"one chain ({count} commands)",
+           measure(run_chained, commands, repeat=3), count)
+
+
+if __name__ == "__main__":
+    main()
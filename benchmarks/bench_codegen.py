@@ -0,0 +1,56 @@
+"""Benchmark generated parsers (genbu.codegen) against interpreted parsers.
+
+Run: python -m benchmarks.bench_codegen
+"""
+
+import collections
+import typing as t
+
+from genbu import ParserMaker
+from genbu import codegen, combinators as comb
+
+from .bench_dispatch import HINT
+from .bench_packrat import nested
+from .common import measure, report
+
+
+def parse(parser: comb.Parser, tokens: t.List[str]) -> t.Any:
+    """Parse tokens."""
+    return parser(collections.deque(tokens)).value
+
+
+def compare(name: str,
+            parser: comb.Parser,
+            tokens: t.List[str],
+            repeat: int = 5,
+            ) -> None:
+    """Report interpreted and generated parser times."""
+    compiled = codegen.compile_parser(parser)
+    assert parse(compiled, tokens) == parse(parser, tokens)
+    report(f"interpreted {name}",
+           measure(parse, parser, tokens, repeat=repeat), len(tokens))
+    report(f"generated {name}",
+           measure(parse, compiled, tokens, repeat=repeat), len(tokens))
+
+
+def main() -> None:
+    """Run benchmarks."""
+    maker = ParserMaker()
+    compare("int list (3000 tokens)",
+            maker.infer_parser(t.List[int]),
+            [str(i) for i in range(3000)])
+    compare("(int, str, float) list (3000 tokens)",
+            maker.infer_parser(t.List[t.Tuple[int, str, float]]),
+            ["1", "a", "2.5"] * 1000)
+    compare("union list (3000 tokens)",
+            maker.infer_parser(HINT),
+            ["x", "a", "1", "2.5", "1j", "c"] * 500)
+    for depth in (8, 12):
+        compare(f"nested Or depth={depth}",
+                nested(comb.One(int), depth),
+                ["1"] + ["b"] * depth,
+                repeat=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Benchmark Or dispatch on token kinds (genbu.analysis).
+
+Run: python -m benchmarks.bench_dispatch
+"""
+
+import collections
+import typing as t
+
+from genbu import ParserMaker
+from genbu import combinators as comb
+
+from .common import measure, report
+
+
+HINT = t.List[t.Union[
+    t.Literal["a", "b", "c"],  # pylint: disable=no-member
+    int,
+    float,
+    complex,
+    str,
+]]
+
+
+def parse(parser: comb.Parser, tokens: t.List[str]) -> t.Any:
+    """Parse tokens."""
+    return parser(collections.deque(tokens)).value
+
+
+def main() -> None:
+    """Run benchmarks."""
+    tokens = ["x", "a", "1", "2.5", "1j", "c"] * 500
+    for dispatch in (False, True):
+        parser = ParserMaker(dispatch=dispatch).infer_parser(HINT)
+        report(f"union list dispatch={dispatch} ({len(tokens)} tokens)",
+               measure(parse, parser, tokens), len(tokens))
+
+
+if __name__ == "__main__":
+    main()
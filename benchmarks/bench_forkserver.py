@@ -0,0 +1,66 @@
+"""Benchmark fork server invocations against fresh interpreters.
+
+Fork server invocations include startup of the client process.
+
+Run: python -m benchmarks.bench_forkserver
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import typing as t
+
+from genbu import forkclient
+
+from .common import measure, report
+
+
+REF = "examples.hello:cli"
+
+
+def run_fresh(count: int) -> None:
+    """Run command in fresh interpreters."""
+    code = f"from genbu.refs import resolve; resolve({REF!r}).run([])"
+    for _ in range(count):
+        subprocess.run([sys.executable, "-c", code], check=True,
+                       stdout=subprocess.DEVNULL)
+
+
+def run_client(command: t.List[str], count: int) -> None:
+    """Run command on fork server using client process."""
+    for _ in range(count):
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+
+
+def main() -> None:
+    """Run benchmarks."""
+    count = 20
+    report(f"fresh interpreter ({count} calls)",
+           measure(run_fresh, count, repeat=1), count)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "genbu.sock")
+        server = subprocess.Popen(  # pylint: disable=consider-using-with
+            [sys.executable, "-m", "genbu.forkserver", "serve", REF, path],
+        )
+        try:
+            while not os.path.exists(path):
+                time.sleep(0.01)
+            clients = {
+                "script": [sys.executable, forkclient.__file__, path],
+                "-m genbu.forkserver call":
+                    [sys.executable, "-m", "genbu.forkserver", "call", path],
+            }
+            for name, command in clients.items():
+                report(f"fork server, {name} ({count} calls)",
+                       measure(run_client, command, count, repeat=1), count)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
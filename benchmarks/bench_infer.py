@@ -0,0 +1,68 @@
+"""Benchmark parser construction for trees with many annotated parameters.
+
+Run: python -m benchmarks.bench_infer
+"""
+
+import itertools
+import pathlib
+import typing as t
+
+from genbu import Genbu, ParserMaker
+from genbu.infer_params import infer_params_from_signature
+from tests.strategies import make_callback
+
+from .common import measure, report
+
+
+HINTS = [
+    int, float, str, bool, pathlib.Path, complex,
+    t.List[int], t.Tuple[str, int], t.Dict[str, float], t.Optional[int],
+    t.Union[int, str], t.Tuple[float, ...],
+]
+
+
+def make_tree(subcommands: int,
+              params: int,
+              parser_maker: t.Optional[ParserMaker] = None,
+              ) -> Genbu:
+    """Build Genbu tree with annotated callbacks."""
+    hints = list(itertools.islice(itertools.cycle(HINTS), params))
+    subparsers = [
+        Genbu(make_callback(hints, f"sub{i}"), parser_maker=parser_maker)
+        for i in range(subcommands)
+    ]
+    return Genbu(make_callback(hints, "root"), subparsers=subparsers,
+                 parser_maker=parser_maker)
+
+
+def main() -> None:
+    """Run benchmarks."""
+    for count in (1000, 5000):
+        callback = make_callback(
+            list(itertools.islice(itertools.cycle(HINTS), count)),
+        )
+        report(f"infer_params ({count} params)",
+               measure(infer_params_from_signature, callback),
+               count)
+
+    for subcommands, params in ((10, 100), (100, 50), (500, 10)):
+        maker = ParserMaker()
+        total = (subcommands + 1) * params
+        report(
+            f"Genbu tree ({subcommands} subcommands x {params} params)",
+            measure(make_tree, subcommands, params, maker),
+            total,
+        )
+        print(f"    {maker.cache_info()}")
+
+        bounded = ParserMaker(maxsize=2)
+        report(
+            f"Genbu tree ({subcommands} x {params}, maxsize=2)",
+            measure(make_tree, subcommands, params, bounded),
+            total,
+        )
+        print(f"    {bounded.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
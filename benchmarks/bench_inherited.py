@@ -0,0 +1,75 @@
+"""Benchmark global options: repeated Params vs inherited options.
+
+Run: python -m benchmarks.bench_inherited
+"""
+
+import tracemalloc
+import typing as t
+
+from genbu import Genbu, Param
+from genbu import combinators as comb
+from genbu.aggregators import Count
+
+from .common import measure, report
+
+
+def global_options() -> t.List[Param]:
+    """Make --verbose, --config and --profile options."""
+    return [
+        Param("verbose", ["-v", "--verbose"], comb.Emit(1),
+              aggregator=Count()),
+        Param("config", ["-c", "--config"], comb.One(str)),
+        Param("profile", ["-p", "--profile"], comb.One(str)),
+    ]
+
+
+def callback(name: str = "", verbose: int = 0) -> t.Any:
+    """Return arguments."""
+    return name, verbose
+
+
+def make_tree(subcommands: int, inherited: bool) -> Genbu:
+    """Make Genbu tree with global options on every node or on the root."""
+    def params() -> t.Optional[t.List[t.Union[Param, str]]]:
+        return None if inherited else ["...", *global_options()]
+
+    subparsers = [
+        Genbu(callback, name=f"sub{i}", params=params())
+        for i in range(subcommands)
+    ]
+    return Genbu(callback, name="root", params=params(),
+                 subparsers=subparsers,
+                 inherited=global_options() if inherited else None)
+
+
+def memory(subcommands: int, inherited: bool) -> int:
+    """Return memory allocated by make_tree (in bytes)."""
+    tracemalloc.start()
+    try:
+        tree = make_tree(subcommands, inherited)
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del tree
+    return size
+
+
+def main() -> None:
+    """Run benchmarks."""
+    argv = ["-v", "sub1", "--name", "x", "-v"]
+    for subcommands in (100, 1000):
+        for inherited in (False, True):
+            name = "inherited" if inherited else "repeated"
+            report(f"build {name} ({subcommands} subcommands)",
+                   measure(make_tree, subcommands, inherited), subcommands)
+            print(f"{'':<48} {memory(subcommands, inherited) / 1024:10.1f}"
+                  " KiB")
+
+    tree = make_tree(1000, True)
+    tree.run(argv)
+    report("run inherited (1000 subcommands)",
+           measure(lambda: [tree.run(argv) for _ in range(1000)]), 1000)
+
+
+if __name__ == "__main__":
+    main()
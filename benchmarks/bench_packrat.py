@@ -0,0 +1,74 @@
+"""Benchmark memoized (packrat) parsing of ambiguous grammars.
+
+Run: python -m benchmarks.bench_packrat
+"""
+
+import collections
+import typing as t
+
+from genbu import combinators as comb
+
+from .common import measure, report
+
+
+class Counter:  # pylint: disable=too-few-public-methods
+    """int converter that counts calls."""
+    __name__ = "int"
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self, token: str) -> int:
+        self.calls += 1
+        return int(token)
+
+
+def nested(parser: comb.Parser, depth: int) -> comb.Parser:
+    """Make grammar that backtracks 2**depth times on the worst input.
+
+    Both alternatives of each Or start with the same sub-parser, and only
+    the last one matches the worst-case input.
+    """
+    for _ in range(depth):
+        parser = comb.Or(
+            comb.And(parser, comb.Lit("a")),
+            comb.And(parser, comb.Lit("b")),
+        )
+    return parser
+
+
+def parse(parser: comb.Parser, tokens: t.List[str]) -> t.Any:
+    """Parse tokens."""
+    return parser(collections.deque(tokens)).value
+
+
+def main() -> None:
+    """Run benchmarks."""
+    for depth in (8, 12, 16):
+        tokens = ["1"] + ["b"] * depth
+
+        counter = Counter()
+        plain = nested(comb.One(counter), depth)
+        seconds = measure(parse, plain, tokens, repeat=1)
+        report(f"plain depth={depth} ({counter.calls} converter calls)",
+               seconds)
+
+        counter = Counter()
+        packrat = comb.Packrat(nested(comb.One(counter), depth))
+        seconds = measure(parse, packrat, tokens, repeat=1)
+        report(f"packrat depth={depth} ({counter.calls} converter calls)",
+               seconds)
+
+    typical = comb.Repeat(comb.Or(
+        comb.And(comb.One(int), comb.One(str)),
+        comb.One(float),
+    ))
+    tokens = ["1", "a", "2.5"] * 1000
+    report("plain typical grammar (3000 tokens)",
+           measure(parse, typical, tokens), len(tokens))
+    report("packrat typical grammar (3000 tokens)",
+           measure(parse, comb.Packrat(typical), tokens), len(tokens))
+
+
+if __name__ == "__main__":
+    main()
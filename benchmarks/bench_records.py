@@ -0,0 +1,56 @@
+# pylint: disable=invalid-field-call
+"""Benchmark flattening of large nested dataclasses.
+
+Run: python -m benchmarks.bench_records
+"""
+
+import dataclasses
+import typing as t
+
+from genbu import Genbu
+from genbu.infer_params import infer_params_from_signature
+
+from .common import measure, report
+
+
+def make_config(groups: int, fields: int) -> t.Any:
+    """Make nested dataclass with groups x fields leaves."""
+    group_types = [
+        dataclasses.make_dataclass(
+            f"Group{i}",
+            [(f"f{j}", int, dataclasses.field(default=j))
+             for j in range(fields)],
+        )
+        for i in range(groups)
+    ]
+    return dataclasses.make_dataclass(
+        "Config",
+        [(f"g{i}", g, dataclasses.field(default_factory=g))
+         for i, g in enumerate(group_types)],
+    )
+
+
+def main() -> None:
+    """Run benchmarks."""
+    for groups, fields in ((10, 20), (20, 50)):
+        config = make_config(groups, fields)
+
+        def callback(config: config) -> t.Any:  # type: ignore
+            return config
+
+        total = groups * fields
+        report(f"infer_params ({total} fields)",
+               measure(infer_params_from_signature, callback), total)
+
+        cli = Genbu(callback)
+        argv = [
+            token
+            for i in range(groups)
+            for token in (f"--config.g{i}.f0", "1")
+        ]
+        report(f"Genbu.run ({total} fields, {groups} set)",
+               measure(cli.run, argv), total)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Benchmark batch dispatch to worker processes (genbu.remote).
+
+Run: python -m benchmarks.bench_remote
+"""
+
+import typing as t
+
+from genbu import Genbu
+from genbu.remote import Remote
+
+from .common import measure, report
+
+
+def work(n: int) -> int:
+    """Do some CPU-bound work."""
+    return sum(i * i for i in range(n))
+
+
+cli = Genbu(work)
+
+
+def serial(argvs: t.List[t.List[str]]) -> None:
+    """Run commands in this process."""
+    for argv in argvs:
+        cli.run(argv)
+
+
+def parallel(pool: Remote,
+             argvs: t.List[t.List[str]],
+             chunksize: int,
+             ) -> None:
+    """Run commands in worker processes."""
+    for _ in pool.map(argvs, chunksize):
+        pass
+
+
+def main() -> None:
+    """Run benchmarks."""
+    for n in (10, 100000):
+        argvs = [["--n", str(n)]] * 200
+        report(f"serial (n={n})", measure(serial, argvs, repeat=3),
+               len(argvs))
+        with Remote(cli) as pool:
+            pool.run(argvs[0])
+            for chunksize in (1, 32):
+                report(f"remote (n={n}, chunksize={chunksize})",
+                       measure(parallel, pool, argvs, chunksize, repeat=3),
+                       len(argvs))
+
+
+if __name__ == "__main__":
+    main()
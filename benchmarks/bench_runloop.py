@@ -0,0 +1,41 @@
+"""Benchmark run loop throughput (genbu.runloop).
+
+Run: python -m benchmarks.bench_runloop
+"""
+
+import io
+import typing as t
+
+from genbu import Genbu
+from genbu.runloop import run_lines, write_records
+
+from .common import measure, report
+
+
+def add(a: int, b: int = 0) -> int:
+    """Add numbers."""
+    return a + b
+
+
+cli = Genbu(add)
+
+
+def run(lines: t.List[str], jobs: int, processes: bool = False) -> None:
+    """Run lines and write results."""
+    target: t.Any = cli if not processes else "benchmarks.bench_runloop:cli"
+    records = run_lines(target, lines, jobs=jobs, processes=processes)
+    write_records(records, io.StringIO(), io.StringIO())
+
+
+def main() -> None:
+    """Run benchmarks."""
+    lines = [f"--a {i} --b 'x {i}'" if i % 100 == 0 else f"--a {i} --b {i}"
+             for i in range(100000)]
+    for jobs, processes in ((0, False), (4, False), (4, True)):
+        name = "processes" if processes else "threads" if jobs else "serial"
+        report(f"run loop ({name}, {len(lines)} lines)",
+               measure(run, lines, jobs, processes, repeat=1), len(lines))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Benchmark startup of Genbu trees with explicit params.
+
+Run: python -m benchmarks.bench_startup
+"""
+
+import itertools
+import typing as t
+
+from genbu import Genbu, Param, ParserMaker
+from genbu import combinators as comb
+from tests.strategies import make_callback
+
+from .bench_infer import HINTS
+from .common import measure, report
+
+
+def make_tree(subcommands: int, params: int, ellipsis: bool) -> Genbu:
+    """Build Genbu tree where every callback parameter has explicit Param.
+
+    If ellipsis is True, params also contains "...", so Genbu has to infer
+    Params from the callback signature.
+    """
+    hints = list(itertools.islice(itertools.cycle(HINTS), params))
+    explicit: t.List[t.Union[Param, str]] = [
+        Param(f"p{i}", [f"--p{i}"], parser=comb.One(str))
+        for i in range(params)
+    ]
+    if ellipsis:
+        explicit.insert(0, "...")
+    maker = ParserMaker()
+    subparsers = [
+        Genbu(make_callback(hints, f"sub{i}"), params=explicit,
+              parser_maker=maker)
+        for i in range(subcommands)
+    ]
+    return Genbu(make_callback(hints, "root"), params=explicit,
+                 subparsers=subparsers, parser_maker=maker)
+
+
+def main() -> None:
+    """Run benchmarks."""
+    for subcommands, params in ((10, 100), (100, 50), (500, 10)):
+        total = (subcommands + 1) * params
+        for ellipsis in (True, False):
+            name = "inferred+explicit" if ellipsis else "explicit"
+            report(
+                f"{name} ({subcommands} subcommands x {params} params)",
+                measure(make_tree, subcommands, params, ellipsis),
+                total,
+            )
+
+
+if __name__ == "__main__":
+    main()
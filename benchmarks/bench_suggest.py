@@ -0,0 +1,55 @@
+"""Benchmark suggestions for unknown options (genbu.suggest).
+
+Run: python -m benchmarks.bench_suggest
+"""
+
+import random
+import string
+import typing as t
+
+from genbu.suggest import Index, distance, max_distance
+
+from .common import measure, report
+
+
+def make_options(count: int) -> t.List[str]:
+    """Make random long option names."""
+    rng = random.Random(0)
+    return [
+        "--" + "".join(rng.choices(string.ascii_lowercase + "-", k=12))
+        for _ in range(count)
+    ]
+
+
+def scan(options: t.List[str], queries: t.List[str]) -> None:
+    """Find suggestions by comparing queries with every option."""
+    for query in queries:
+        limit = max_distance(query)
+        sorted(
+            (d, o) for d, o in ((distance(query, o), o) for o in options)
+            if d <= limit
+        )
+
+
+def search(index: Index, queries: t.List[str]) -> None:
+    """Find suggestions using index."""
+    for query in queries:
+        index.suggest(query)
+
+
+def main() -> None:
+    """Run benchmarks."""
+    for count in (100, 1000):
+        options = make_options(count)
+        queries = [o[:-1] + "x" for o in options[:20]]
+        report(f"build index ({count} options)",
+               measure(Index, options, ()), count)
+        index = Index(options, ())
+        report(f"linear scan ({count} options, {len(queries)} queries)",
+               measure(scan, options, queries, repeat=1), len(queries))
+        report(f"n-gram index ({count} options, {len(queries)} queries)",
+               measure(search, index, queries), len(queries))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""Benchmark helpers."""
+
+import time
+import typing as t
+
+
+def measure(function: t.Callable[..., t.Any],
+            *args: t.Any,
+            repeat: int = 5,
+            ) -> float:
+    """Return best wall time (in seconds) of function(*args) over repeats."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(name: str, seconds: float, count: t.Optional[int] = None) -> None:
+    """Print benchmark result."""
+    line = f"{name:<48} {seconds * 1000:10.3f} ms"
+    if count:
+        line += f" {seconds / count * 1e6:10.3f} us/item"
+    print(line)
@@ -0,0 +1,139 @@
+"""Fuzz benchmark: parse throughput on random signatures and argv.
+
+Signatures and argv are generated with tests/strategies.py. Shards run in
+parallel (one process per core by default), and the slowest inputs can be
+saved as regression fixtures (see tests/test_fuzz_regressions.py).
+
+Run: python -m benchmarks.fuzz [--examples N] [--shards N] [--save]
+"""
+
+import json
+import multiprocessing
+import os
+import time
+import typing as t
+
+import hypothesis
+
+from genbu import CLError, Genbu, Param, combinators as comb
+from tests import strategies
+
+from .common import report
+
+
+FIXTURES = os.path.join(os.path.dirname(__file__), os.pardir, "tests",
+                        "fixtures", "slow_parses.json")
+
+
+class Case(t.NamedTuple):
+    """Timed parse."""
+    seconds: float
+    hints: t.List[str]
+    argv: t.List[str]
+
+
+class ShardResult(t.NamedTuple):
+    """Results of one shard."""
+    seconds: float
+    tokens: int
+    parses: int
+    errors: int
+    slowest: t.List[Case]
+
+
+def time_parse(hints: t.Sequence[t.Any],
+               argv: t.Sequence[str],
+               repeat: int = 3,
+               ) -> t.Tuple[float, bool]:
+    """Return best parse time of argv and whether parsing succeeded."""
+    parser = Genbu(strategies.make_callback(hints))
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            Genbu.parse_optargs(parser, argv)
+            ok = True
+        except CLError:
+            ok = False
+        best = min(best, time.perf_counter() - start)
+    return best, ok
+
+
+def run_shard(args: t.Tuple[int, int, int]) -> ShardResult:
+    """Parse generated inputs and return timing results."""
+    examples, shard_seed, top = args
+    cases: t.List[Case] = []
+    totals = [0.0, 0, 0, 0]  # seconds, tokens, parses, errors
+
+    @hypothesis.seed(shard_seed)
+    @hypothesis.settings(max_examples=examples, database=None, deadline=None,
+                         suppress_health_check=list(hypothesis.HealthCheck))
+    @hypothesis.given(strategies.signatures())
+    def shard(signature: t.Tuple[t.List[t.Any], t.List[str]]) -> None:
+        hints, argv = signature
+        seconds, ok = time_parse(hints, argv)
+        totals[0] += seconds
+        totals[1] += len(argv)
+        totals[2] += 1
+        totals[3] += not ok
+        cases.append(Case(seconds, list(map(strategies.dump_hint, hints)),
+                          argv))
+        cases.sort(reverse=True)
+        del cases[top:]
+
+    shard()  # pylint: disable=no-value-for-parameter
+    return ShardResult(totals[0], int(totals[1]), int(totals[2]),
+                       int(totals[3]), cases)
+
+
+def save_fixtures(cases: t.Sequence[Case], path: str = FIXTURES) -> None:
+    """Save cases as regression fixtures."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump([c._asdict() for c in cases], file, indent=1)
+        file.write("\n")
+
+
+def fuzz(examples: int = 200,
+         shards: int = 0,
+         seed: int = 0,
+         top: int = 10,
+         save: bool = False,
+         ) -> None:
+    """Run fuzz benchmark.
+
+    examples is the number of examples per shard. shards defaults to the
+    number of cores. If save is True, the slowest inputs are saved as
+    regression fixtures.
+    """
+    shards = shards or os.cpu_count() or 1
+    with multiprocessing.Pool(shards) as pool:
+        results = pool.map(
+            run_shard,
+            [(examples, seed + i, top) for i in range(shards)],
+        )
+
+    seconds = sum(r.seconds for r in results)
+    tokens = sum(r.tokens for r in results)
+    parses = sum(r.parses for r in results)
+    errors = sum(r.errors for r in results)
+    report(f"fuzz ({parses} parses, {errors} errors, {shards} shards)",
+           seconds, tokens)
+
+    slowest = sorted((c for r in results for c in r.slowest),
+                     reverse=True)[:top]
+    for case in slowest:
+        print(f"    {case.seconds * 1000:10.3f} ms  {len(case.argv)} tokens"
+              f"  {', '.join(case.hints)}")
+    if save:
+        save_fixtures(slowest)
+
+
+cli = Genbu(
+    fuzz,
+    params=["...", Param("save", ["--save"], comb.Emit(True))],
+)
+
+
+if __name__ == "__main__":
+    cli.run()
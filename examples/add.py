@@ -25,4 +25,4 @@ cli = Genbu(
 )
 
 if __name__ == "__main__":
-    print(cli.run())
+    cli.main()
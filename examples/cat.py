@@ -1,12 +1,13 @@
 from pathlib import Path
 import sys
+import typing as t
 
 from genbu import Genbu, Param, combinators as comb, usage
 
 
-def cat(path: Path) -> str:
+def cat(path: Path) -> t.BinaryIO:
     """Concatenate contents of path to stdout."""
-    return path.read_text()
+    return path.open("rb")
 
 
 cli = Genbu(
@@ -24,7 +25,7 @@ cli = Genbu(
 
 if __name__ == "__main__":
     try:
-        print(cli.run())
+        cli.main()
     except Exception as exc:
         name = " ".join(cli.complete_name())
         print(f"{name}: {exc}\nTry '{name} -h' for more information.")
@@ -11,4 +11,4 @@ def echo(*args: str) -> str:
 cli = Genbu(echo)
 
 if __name__ == "__main__":
-    print(cli.run())
+    cli.main()
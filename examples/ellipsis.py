@@ -18,4 +18,4 @@ cli = Genbu(ellipsis, params=[
 
 
 if __name__ == "__main__":
-    print(cli.run())
+    cli.main()
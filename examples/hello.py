@@ -24,4 +24,4 @@ cli = Genbu(
 )
 
 if __name__ == "__main__":
-    print(cli.run())
+    cli.main()
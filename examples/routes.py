@@ -34,6 +34,6 @@ cli = Genbu(
 
 if __name__ == "__main__":
     try:
-        print(cli.run())
+        cli.main()
     except Exception as exc:
         print("something went wrong:", exc)
@@ -1,22 +1,53 @@
-"""Genbu CLI."""
+"""Genbu CLI.
 
-from .cli import Genbu, MissingArgument, default_error_handler
-from .combinators import CantParse
-from .exceptions import CLError
-from .infer import UnsupportedType, infer_parser
-from .infer_params import infer_params_from_signature as infer_params
-from .normalize import AmbiguousOption, UnknownOption
-from .params import InvalidOption, Param
-from .usage import usage
+Names are imported from submodules on first use, so stdlib-only modules
+(e.g. the snapshot reader in genbu.snapshot) start quickly.
+"""
+
+import importlib
+import sys
+import types
+import typing as t
+
+if t.TYPE_CHECKING:
+    from .cli import Genbu, default_error_handler
+    from .combinators import CantParse
+    from .exceptions import CLError, MissingArgument
+    from .infer import ParserMaker, UnsupportedType, infer_parser
+    from .infer_params import infer_params_from_signature as infer_params
+    from .normalize import AmbiguousOption, UnknownOption
+    from .params import InvalidOption, Param
+    from .sources import ConfigError
+    from .usage import usage
+
+EXPORTS = {
+    "AmbiguousOption": (".normalize", "AmbiguousOption"),
+    "CLError": (".exceptions", "CLError"),
+    "CantParse": (".combinators", "CantParse"),
+    "ConfigError": (".sources", "ConfigError"),
+    "Genbu": (".cli", "Genbu"),
+    "InvalidOption": (".params", "InvalidOption"),
+    "MissingArgument": (".exceptions", "MissingArgument"),
+    "Param": (".params", "Param"),
+    "ParserMaker": (".infer", "ParserMaker"),
+    "UnknownOption": (".normalize", "UnknownOption"),
+    "UnsupportedType": (".infer", "UnsupportedType"),
+    "default_error_handler": (".cli", "default_error_handler"),
+    "infer_params": (".infer_params", "infer_params_from_signature"),
+    "infer_parser": (".infer", "infer_parser"),
+    "usage": (".usage", "usage"),
+}
 
 __all__ = [
     "AmbiguousOption",
     "CLError",
     "CantParse",
+    "ConfigError",
     "Genbu",
     "InvalidOption",
     "MissingArgument",
     "Param",
+    "ParserMaker",
     "UnknownOption",
     "UnsupportedType",
     "default_error_handler",
@@ -24,3 +55,29 @@ __all__ = [
     "infer_parser",
     "usage",
 ]
+
+
+class Package(types.ModuleType):
+    """Genbu package that imports exported names on first use."""
+    def __getattr__(self, name: str) -> t.Any:
+        if name not in EXPORTS:
+            raise AttributeError(
+                f"module {self.__name__!r} has no attribute {name!r}"
+            )
+        module, attr = EXPORTS[name]
+        value = getattr(importlib.import_module(module, self.__name__), attr)
+        setattr(self, name, value)
+        return value
+
+    def __setattr__(self, name: str, value: t.Any) -> None:
+        # Importing a submodule sets it as attribute, but exported names
+        # shadow submodules (e.g. genbu.usage is the usage function).
+        if name in EXPORTS and isinstance(value, types.ModuleType):
+            value = getattr(value, EXPORTS[name][1])
+        super().__setattr__(name, value)
+
+    def __dir__(self) -> t.List[str]:
+        return sorted(set(super().__dir__()) | set(EXPORTS))
+
+
+sys.modules[__name__].__class__ = Package
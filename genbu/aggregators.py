@@ -0,0 +1,166 @@
+"""Streaming (incremental) aggregators for repeated options."""
+
+import abc
+import os
+import typing as t
+
+from .combinators import force
+from .params import Aggregator, Param, default_aggregator
+
+
+class StreamingAggregator(abc.ABC):
+    """Aggregator with init/step/finish semantics.
+
+    Values are aggregated one at a time as they are parsed, so repeated
+    options don't have to be stored. If lazy is True, step gets unforced
+    values (see combinators.Lazy) and the result of finish gets forced.
+    StreamingAggregators can also be called on a sequence of values like
+    ordinary aggregators.
+    """
+    lazy = False
+
+    def init(self) -> t.Any:
+        """Return initial state."""
+        return None
+
+    @abc.abstractmethod
+    def step(self, state: t.Any, value: t.Any) -> t.Any:
+        """Return next state."""
+
+    def finish(self, state: t.Any) -> t.Any:
+        """Return aggregated value."""
+        return state
+
+    def __call__(self, values: t.Sequence[t.Any]) -> t.Any:
+        state = self.init()  # pylint: disable=assignment-from-none
+        for value in values:
+            state = self.step(state, value)
+        return self.finish(state)
+
+
+class Last(StreamingAggregator):
+    """Keep last value (default)."""
+    lazy = True
+
+    def step(self, state: t.Any, value: t.Any) -> t.Any:
+        return value
+
+
+class Count(StreamingAggregator):
+    """Count occurrences (values are still converted, to check them)."""
+    def init(self) -> int:
+        return 0
+
+    def step(self, state: int, value: t.Any) -> int:
+        return state + 1
+
+
+class Sum(StreamingAggregator):
+    """Add values."""
+    def __init__(self, start: t.Any = 0):
+        self.start = start
+
+    def init(self) -> t.Any:
+        return self.start
+
+    def step(self, state: t.Any, value: t.Any) -> t.Any:
+        return state + value
+
+
+class SetUnion(StreamingAggregator):
+    """Collect distinct values.
+
+    Values that are lists, tuples or sets (e.g. from Repeat parsers) are
+    merged into the result.
+    """
+    def init(self) -> t.Set[t.Any]:
+        return set()
+
+    def step(self, state: t.Set[t.Any], value: t.Any) -> t.Set[t.Any]:
+        if isinstance(value, (list, tuple, set, frozenset)):
+            state.update(value)
+        else:
+            state.add(value)
+        return state
+
+
+class AppendToFile(StreamingAggregator):
+    """Write values to file (one line per value) and return path.
+
+    Lines are buffered and appended in finish, so the file isn't touched
+    if parsing fails.
+    """
+    def __init__(self, path: t.Union[str, "os.PathLike[str]"]):
+        self.path = path
+
+    def init(self) -> t.List[str]:
+        return []
+
+    def step(self, state: t.List[str], value: t.Any) -> t.List[str]:
+        state.append(f"{value}\n")
+        return state
+
+    def finish(self, state: t.List[str]) -> t.Any:
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.writelines(state)
+        return self.path
+
+
+class Collect(StreamingAggregator):
+    """Store values and pass them to ordinary aggregator in finish."""
+    def __init__(self, aggregator: Aggregator):
+        self.aggregator = aggregator
+
+    def init(self) -> t.List[t.Any]:
+        return []
+
+    def step(self, state: t.List[t.Any], value: t.Any) -> t.List[t.Any]:
+        state.append(value)
+        return state
+
+    def finish(self, state: t.List[t.Any]) -> t.Any:
+        return self.aggregator(state)
+
+
+LAST = Last()
+
+
+def streaming(aggregator: Aggregator) -> StreamingAggregator:
+    """Return aggregator as StreamingAggregator.
+
+    default_aggregator becomes Last, and other aggregators are wrapped in
+    Collect.
+    """
+    if isinstance(aggregator, StreamingAggregator):
+        return aggregator
+    if aggregator is default_aggregator:
+        return LAST
+    return Collect(aggregator)
+
+
+class Aggregation:
+    """Aggregation states of Params."""
+    def __init__(self) -> None:
+        self.states: t.Dict[Param, t.Tuple[StreamingAggregator, t.Any]] = {}
+
+    def __contains__(self, param: object) -> bool:
+        return param in self.states
+
+    def add(self, param: Param, value: t.Any) -> None:
+        """Add value to aggregation state of param."""
+        entry = self.states.get(param)
+        if entry is None:
+            aggregator = streaming(param.aggregator)
+            state = aggregator.init()
+        else:
+            aggregator, state = entry
+        if not aggregator.lazy:
+            value = force(value)
+        self.states[param] = (aggregator, aggregator.step(state, value))
+
+    def finish(self) -> t.Dict[str, t.Any]:
+        """Return aggregated values (keys are Param dests)."""
+        return {
+            param.dest: force(aggregator.finish(state))
+            for param, (aggregator, state) in self.states.items()
+        }
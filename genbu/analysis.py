@@ -0,0 +1,325 @@
+"""Static analysis of parser trees."""
+
+import collections
+import re
+import typing as t
+import warnings
+
+from . import combinators as comb
+
+
+INTEGER = "integer"
+NUMBER = "number"
+OTHER = "other"
+KINDS = frozenset((INTEGER, NUMBER, OTHER))
+
+INTEGER_PATTERN = re.compile(r"\s*[+-]?\d+(?:_\d+)*\s*\Z")
+NUMBER_PATTERN = re.compile(
+    r"\s*[+-]?(?:[\d_]*\.?[\d_]*(?:e[+-]?[\d_]+)?|inf(?:inity)?|nan)\s*\Z",
+    re.IGNORECASE,
+)
+
+# Token kinds that may be accepted by One(func).
+FUNC_KINDS: t.Dict[t.Any, t.FrozenSet[str]] = {
+    int: frozenset((INTEGER,)),
+    float: frozenset((INTEGER, NUMBER)),
+}
+BOOL_KINDS = frozenset((INTEGER, OTHER))
+
+
+def classify(token: str) -> str:
+    """Return token kind.
+
+    INTEGER tokens look like ints, NUMBER tokens look like other floats.
+    """
+    if INTEGER_PATTERN.match(token):
+        return INTEGER
+    if NUMBER_PATTERN.match(token):
+        return NUMBER
+    return OTHER
+
+
+class First(t.NamedTuple):
+    """FIRST set of a parser.
+
+    A parser can only succeed if it's nullable (it may succeed without
+    consuming tokens), or if the kind of the first token is in kinds, or if
+    the first token is in literals.
+    """
+    nullable: bool
+    kinds: t.FrozenSet[str] = frozenset()
+    literals: t.FrozenSet[str] = frozenset()
+
+    def admits(self, token: str) -> bool:
+        """Check if first token may start a match."""
+        return token in self.literals or classify(token) in self.kinds
+
+    def union(self, other: "First") -> "First":
+        """Return union of FIRST sets."""
+        return First(self.nullable or other.nullable,
+                     self.kinds | other.kinds,
+                     self.literals | other.literals)
+
+
+ANY = First(True, KINDS)
+LEAVES: t.List[t.Tuple[type, First]] = [
+    (comb.Bool, First(False, BOOL_KINDS)),
+    (comb.Try, First(False, KINDS)),
+    (comb.Lazy, First(False, KINDS)),
+    (comb.Emit, First(True)),
+    (comb.Eof, First(True)),
+]
+
+
+def unwrap(parser: comb.Parser) -> comb.Parser:
+    """Return parser wrapped by Memo or Packrat parsers."""
+    while isinstance(parser, (comb.Memo, comb.Packrat)):
+        parser = parser.parser
+    return parser
+
+
+def first_of_sequence(parsers: t.Iterable[comb.Parser]) -> First:
+    """Return FIRST set of concatenated parsers."""
+    result = First(True)
+    for parser in parsers:
+        current = first(parser)
+        result = First(current.nullable, result.kinds | current.kinds,
+                       result.literals | current.literals)
+        if not current.nullable:
+            break
+    return result
+
+
+def first_of_leaf(parser: comb.Parser) -> First:
+    """Compute FIRST set of parser without sub-parsers."""
+    if isinstance(parser, comb.Lit):
+        return First(False, literals=frozenset((str(parser.value),)))
+    if isinstance(parser, comb.One):
+        return First(False, FUNC_KINDS.get(parser.func, KINDS))
+    for cls, result in LEAVES:
+        if isinstance(parser, cls):
+            return result
+    return ANY
+
+
+def first(parser: comb.Parser) -> First:
+    """Compute FIRST set of parser (over-approximation)."""
+    parser = unwrap(parser)
+    if isinstance(parser, comb.Or):
+        result = First(False)
+        for alternative in parser.parsers:
+            result = result.union(first(alternative))
+        return result
+    if isinstance(parser, comb.And):
+        return first_of_sequence(parser.parsers)
+    if isinstance(parser, comb.Repeat):
+        return first(parser.parser)._replace(nullable=True)
+    return first_of_leaf(parser)
+
+
+def always_succeeds(parser: comb.Parser) -> bool:
+    """Check if parser succeeds on every input."""
+    parser = unwrap(parser)
+    if isinstance(parser, (comb.Emit, comb.Repeat)):
+        return True
+    if isinstance(parser, comb.And):
+        return all(map(always_succeeds, parser.parsers))
+    if isinstance(parser, comb.Or):
+        return any(map(always_succeeds, parser.parsers))
+    return False
+
+
+def accepts_any_token(parser: comb.Parser) -> bool:
+    """Check if parser succeeds on every non-empty input."""
+    parser = unwrap(parser)
+    if isinstance(parser, comb.One) and parser.func is str:
+        return True
+    if isinstance(parser, comb.Lazy):
+        return True
+    if isinstance(parser, comb.Or):
+        return any(map(accepts_any_token, parser.parsers))
+    return always_succeeds(parser)
+
+
+def is_single_token(parser: comb.Parser) -> bool:
+    """Check if parser only looks at the first token."""
+    return isinstance(unwrap(parser),
+                      (comb.One, comb.Lit, comb.Bool, comb.Try, comb.Lazy))
+
+
+class Arity(t.NamedTuple):
+    """Number of tokens that a parser may consume on success.
+
+    maximum is None if there's no upper bound.
+    """
+    minimum: int
+    maximum: t.Optional[int]
+
+
+UNBOUNDED = Arity(0, None)
+
+
+def arity_of_leaf(parser: comb.Parser) -> Arity:
+    """Compute arity of parser without sub-parsers."""
+    if is_single_token(parser):
+        return Arity(1, 1)
+    if isinstance(parser, (comb.Emit, comb.Eof)):
+        return Arity(0, 0)
+    return UNBOUNDED
+
+
+def bounded(arities: t.Sequence[Arity]) -> t.Optional[t.List[int]]:
+    """Return maximum token counts, or None if any of them is unbounded."""
+    maxima = [a.maximum for a in arities]
+    return None if None in maxima else t.cast(t.List[int], maxima)
+
+
+def arity(parser: comb.Parser) -> Arity:
+    """Compute arity of parser (over-approximation)."""
+    parser = unwrap(parser)
+    if isinstance(parser, (comb.Or, comb.And)):
+        arities = list(map(arity, parser.parsers))
+        minima = [a.minimum for a in arities]
+        maxima = bounded(arities)
+        if isinstance(parser, comb.Or):
+            return Arity(min(minima, default=0),
+                         None if maxima is None else max(maxima, default=0))
+        return Arity(sum(minima), None if maxima is None else sum(maxima))
+    if isinstance(parser, comb.Repeat):
+        return Arity(0, 0 if arity(parser.parser).maximum == 0 else None)
+    return arity_of_leaf(parser)
+
+
+def shadows(earlier: comb.Parser, later: comb.Parser) -> bool:
+    """Check if earlier alternative succeeds whenever later one would.
+
+    Only checks cases that are cheap to prove.
+    """
+    earlier, later = unwrap(earlier), unwrap(later)
+    if always_succeeds(earlier):
+        return True
+    if accepts_any_token(earlier) and not first(later).nullable:
+        return True
+    if isinstance(later, comb.Lit) and is_single_token(earlier):
+        return earlier.attempt(collections.deque([str(later.value)])) \
+            is not None
+    if isinstance(earlier, comb.One) and isinstance(later, comb.One):
+        return earlier.func is later.func or \
+            (earlier.func, later.func) == (float, int)
+    return isinstance(earlier, comb.Bool) and isinstance(later, comb.Bool)
+
+
+class DeadAlternative(t.NamedTuple):
+    """Or alternative that can never succeed."""
+    parser: comb.Or
+    position: int
+    shadowed_by: int
+
+    def __str__(self) -> str:
+        alternative = self.parser.parsers[self.position]
+        earlier = self.parser.parsers[self.shadowed_by]
+        return f"{alternative} in {self.parser} is shadowed by {earlier}"
+
+
+class GrammarWarning(UserWarning):
+    """Parser tree has problems (e.g. dead alternatives)."""
+
+
+def dead_alternatives(parser: comb.Or) -> t.List[DeadAlternative]:
+    """Return dead alternatives of Or parser (does not recurse)."""
+    result = []
+    alternatives = parser.parsers
+    for index, alternative in enumerate(alternatives):
+        for earlier in range(index):
+            if shadows(alternatives[earlier], alternative):
+                result.append(DeadAlternative(parser, index, earlier))
+                break
+    return result
+
+
+def walk(parser: comb.Parser) -> t.Iterator[comb.Parser]:
+    """Yield parser and all its sub-parsers (preorder)."""
+    stack = [parser]
+    seen = set()
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        yield node
+        stack.extend(reversed(comb.children(unwrap(node))))
+
+
+def warn(alternatives: t.Iterable[DeadAlternative]) -> None:
+    """Emit GrammarWarning for each dead alternative."""
+    for dead in alternatives:
+        warnings.warn(str(dead), GrammarWarning, stacklevel=3)
+
+
+def check(parser: comb.Parser) -> t.List[DeadAlternative]:
+    """Find dead alternatives in parser tree and warn about them."""
+    result = [
+        dead
+        for node in walk(parser) if isinstance(node, comb.Or)
+        for dead in dead_alternatives(node)
+    ]
+    warn(result)
+    return result
+
+
+class Dispatch(comb.Or):
+    """Or parser that only tries alternatives that may match first token.
+
+    Alternatives are tried in the same order as in Or, so results are the
+    same, but alternatives that can't match the token kind (or literal)
+    and dead alternatives are skipped without being run.
+    """
+    def __init__(self, *parsers: comb.Parser):
+        super().__init__(*parsers)
+        self.dead = dead_alternatives(self)
+        dead = {d.position for d in self.dead}
+        live = [
+            (p, first(p)) for i, p in enumerate(parsers) if i not in dead
+        ]
+        self.nullable = tuple(p for p, f in live if f.nullable)
+        self.by_kind = {
+            kind: tuple(p for p, f in live if f.nullable or kind in f.kinds)
+            for kind in KINDS
+        }
+        literals = set().union(*(f.literals for _, f in live))
+        self.by_literal = {
+            literal: tuple(
+                p for p, f in live if f.nullable or f.admits(literal)
+            )
+            for literal in literals
+        }
+
+    def candidates(self, tokens: comb.Tokens) -> t.Tuple[comb.Parser, ...]:
+        """Return alternatives that may match tokens."""
+        if not tokens:
+            return self.nullable
+        token = tokens[0]
+        result = self.by_literal.get(token)
+        if result is None:
+            result = self.by_kind[classify(token)]
+        return result
+
+    def parse(self, tokens: comb.Tokens) -> comb.Result:
+        """Run candidate parsers and return first non-error result."""
+        for parse in self.candidates(tokens):
+            result = parse.attempt(tokens)
+            if result is not None:
+                return result
+        raise comb.CantParse(self, tokens)
+
+
+def dispatch(parser: comb.Parser) -> comb.Parser:
+    """Turn Or parser into Dispatch parser (does not recurse)."""
+    if isinstance(parser, comb.Or) and not isinstance(parser, Dispatch):
+        return Dispatch(*parser.parsers)
+    return parser
+
+
+def optimize(parser: comb.Parser) -> comb.Parser:
+    """Return copy of parser tree with Or parsers replaced by Dispatch."""
+    return dispatch(comb.map_children(parser, optimize))
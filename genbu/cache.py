@@ -0,0 +1,224 @@
+"""On-disk cache of callback results.
+
+Commands that are pure functions of their arguments (and of the contents of
+files that they read) can skip their callback on repeated invocations:
+
+    Genbu(build, cache=ResultCache(".cache/genbu"))
+
+Keys are SHA-256 digests of the command name, the callback code and the
+aggregated Param values. Path values are fingerprinted by file contents.
+"""
+
+import functools
+import hashlib
+import marshal
+import os
+import pathlib
+import pickle
+import tempfile
+import typing as t
+
+from .output import is_file, is_stream
+from .sources import PathLike
+
+if t.TYPE_CHECKING:
+    from .cli import Namespace
+
+
+BUFSIZE = 1 << 16
+SUFFIX = ".pickle"
+
+
+def file_digest(path: "os.PathLike[str]") -> bytes:
+    """Return digest of path and file contents (if path is a file)."""
+    digest = hashlib.sha256(os.fsencode(os.path.abspath(path)) + b"\0")
+    try:
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(BUFSIZE), b""):
+                digest.update(chunk)
+    except (IsADirectoryError, FileNotFoundError):
+        digest.update(b"\0not a file")
+    return digest.digest()
+
+
+def fingerprint(value: t.Any) -> bytes:
+    """Return digest of value.
+
+    Paths are fingerprinted by file contents, and sets and dicts don't
+    depend on iteration order. Raise TypeError (or pickle errors) if value
+    can't be pickled.
+    """
+    if isinstance(value, pathlib.PurePath):
+        return file_digest(value)
+    if isinstance(value, (list, tuple)):
+        parts = list(map(fingerprint, value))
+    elif isinstance(value, (set, frozenset)):
+        parts = sorted(map(fingerprint, value))
+    elif isinstance(value, dict):
+        parts = sorted(fingerprint(i) for i in value.items())
+    else:
+        return hashlib.sha256(pickle.dumps(value, protocol=4)).digest()
+    tag = type(value).__qualname__.encode()
+    return hashlib.sha256(tag + b"\0" + b"".join(parts)).digest()
+
+
+def callback_digest(callback: t.Callable[..., t.Any]) -> bytes:
+    """Return digest of callback name and code.
+
+    Cached results are invalidated when the callback's code, closure or
+    default arguments change. Digests of functools.partial objects include
+    their arguments, and digests of callable instances include their
+    pickled state (raise TypeError or pickle errors if they can't be
+    fingerprinted).
+    """
+    if isinstance(callback, functools.partial):
+        parts = [
+            callback_digest(callback.func),
+            fingerprint((callback.args, callback.keywords)),
+        ]
+    elif not hasattr(callback, "__qualname__"):
+        parts = [callback_digest(type(callback).__call__),
+                 fingerprint(callback)]
+    else:
+        code = getattr(callback, "__code__", None)
+        name = f"{getattr(callback, '__module__', None)}:" \
+            f"{callback.__qualname__}"
+        parts = [
+            name.encode(),
+            marshal.dumps(code) if code else b"",
+            fingerprint(function_state(callback)),
+        ]
+    return hashlib.sha256(b"\0".join(parts)).digest()
+
+
+def function_state(function: t.Any) -> t.Tuple[t.Any, ...]:
+    """Return closure cell contents and default arguments of function.
+
+    Closures made by the same factory share their code, so their results
+    are told apart by their state. Raise ValueError on empty cells.
+    """
+    cells = getattr(function, "__closure__", None) or ()
+    return (
+        tuple(c.cell_contents for c in cells),
+        getattr(function, "__defaults__", None),
+        getattr(function, "__kwdefaults__", None),
+    )
+
+
+def is_cacheable(result: t.Any) -> bool:
+    """Check if result can be cached (streams and files aren't cached)."""
+    return not is_stream(result) and not is_file(result)
+
+
+class ResultCache:
+    """On-disk cache of callback results.
+
+    Results are pickled into one file per key in directory. Once the files
+    take up more than max_size bytes, the least recently used results are
+    evicted. Results that can't be pickled, iterators and files aren't
+    cached, and commands with unpicklable Param values always run.
+    Writes are atomic, so the cache can be shared by processes.
+    """
+    def __init__(self, directory: PathLike, max_size: int = 1 << 26):
+        if max_size < 0:
+            raise ValueError(max_size)
+        self.directory = os.fspath(directory)
+        self.max_size = max_size
+
+    def key(self, namespace: "Namespace") -> t.Optional[str]:
+        """Return cache key of parsed command (or None if uncacheable)."""
+        cli = namespace.cli
+        digest = hashlib.sha256(" ".join(cli.complete_name()).encode())
+        try:
+            digest.update(callback_digest(cli.callback))
+            digest.update(fingerprint(namespace.names))
+        except Exception:  # pylint: disable=broad-except
+            return None
+        return digest.hexdigest()
+
+    def path(self, key: str) -> str:
+        """Return path of cache entry."""
+        return os.path.join(self.directory, key + SUFFIX)
+
+    def get(self, key: str) -> t.Tuple[bool, t.Any]:
+        """Return (True, result) if key is cached, or (False, None)."""
+        path = self.path(key)
+        try:
+            with open(path, "rb") as file:
+                result = pickle.load(file)
+            os.utime(path)
+        except FileNotFoundError:
+            return False, None
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError,
+                ImportError):  # e.g. stale pickles of renamed classes
+            self.remove(path)
+            return False, None
+        return True, result
+
+    def set(self, key: str, result: t.Any) -> bool:
+        """Cache result (return False if it can't be pickled)."""
+        try:
+            data = pickle.dumps(result, protocol=4)
+        except Exception:  # pylint: disable=broad-except
+            return False
+        if len(data) > self.max_size:
+            return False
+        os.makedirs(self.directory, exist_ok=True)
+        fd, temp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(temp, self.path(key))
+        except BaseException:
+            self.remove(temp)
+            raise
+        self.evict()
+        return True
+
+    def evict(self) -> None:
+        """Remove least recently used entries until size <= max_size."""
+        try:
+            entries = [
+                e for e in os.scandir(self.directory)
+                if e.name.endswith(SUFFIX)
+            ]
+            stats = [(e.stat(), e.path) for e in entries]
+        except FileNotFoundError:
+            return
+        size = sum(s.st_size for s, _ in stats)
+        for stat, path in sorted(stats, key=lambda s: s[0].st_mtime_ns):
+            if size <= self.max_size:
+                break
+            self.remove(path)
+            size -= stat.st_size
+
+    def clear(self) -> None:
+        """Remove every cached result."""
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            if entry.name.endswith(SUFFIX):
+                self.remove(entry.path)
+
+    @staticmethod
+    def remove(path: str) -> None:
+        """Remove file if it exists."""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def call(self, namespace: "Namespace") -> t.Any:
+        """Return cached result of command, or run its callback."""
+        key = self.key(namespace)
+        if key is None:
+            return namespace.bind(namespace.cli.callback)
+        hit, result = self.get(key)
+        if hit:
+            return result
+        result = namespace.bind(namespace.cli.callback)
+        if is_cacheable(result):
+            self.set(key, result)
+        return result
@@ -1,23 +1,45 @@
 """CLI parser."""
 
 import collections
+import functools
 import inspect
 import sys
 import typing as t
 
-from .exceptions import CLError
+from . import output
+from .aggregators import Aggregation
+from .analysis import Arity, arity, bounded
+from .combinators import CantParse
+from .exceptions import CLError, MissingArgument
+from .infer import ParserMaker
 from .infer_params import infer_params_from_signature
-from .normalize import UnknownOption, normalize
+from .normalize import (
+    AmbiguousOption, OptionTable, UnknownOption, normalize,
+)
 from .params import Param
+from .records import get_record
+from .sources import PathLike, SourceIndex
+from .suggest import Index
+
+if t.TYPE_CHECKING:
+    from .cache import ResultCache
 
 
 ExceptionHandler = t.Callable[["Genbu", CLError], t.NoReturn]
 
 
+def error_message(cli: "Genbu", exc: CLError) -> str:
+    """Return error message with command name (and suggestions)."""
+    name = " ".join(cli.complete_name())
+    message = f"{name}: {exc}"
+    if isinstance(exc, UnknownOption) and exc.suggestions:
+        message += "\n\nDid you mean " + " or ".join(exc.suggestions) + "?"
+    return message
+
+
 def default_error_handler(cli: "Genbu", exc: CLError) -> t.NoReturn:
     """Default exception handler."""
-    name = " ".join(cli.complete_name())
-    sys.exit(f"{name}: {exc}")
+    sys.exit(error_message(cli, exc))
 
 
 def unique(items: t.Iterable[t.Any]) -> t.List[t.Any]:
@@ -32,8 +54,117 @@ def unique(items: t.Iterable[t.Any]) -> t.List[t.Any]:
     return list(result.values())
 
 
+def check_token_count(arguments: t.Sequence[t.Tuple[Param, Arity]],
+                      tokens: t.Sequence[str],
+                      ) -> None:
+    """Check if there are enough tokens for positional arguments.
+
+    Raise CantParse (not enough tokens) or UnknownOption (too many tokens)
+    without running parsers.
+    """
+    available = len(tokens)
+    for param, (minimum, _) in arguments:
+        if available < minimum:
+            raise CantParse(param.parser, tokens[len(tokens) - available:])
+        available -= minimum
+
+    maxima = bounded([a for _, a in arguments])
+    if maxima is not None and sum(maxima) < len(tokens):
+        raise UnknownOption(tokens[sum(maxima)])
+
+
+def parse_arguments(arguments: t.Sequence[t.Tuple[Param, Arity]],
+                    tokens: t.Sequence[str],
+                    aggregation: Aggregation,
+                    ) -> None:
+    """Parse positional arguments and add their values to aggregation.
+
+    Each parser gets the tokens that aren't reserved for the minimum number
+    of tokens of the parsers after it, so variadic arguments can be in any
+    position (e.g. SRC... DST). Tokens that a parser doesn't consume are
+    passed on to the next parser.
+    """
+    check_token_count(arguments, tokens)
+    reserved = sum(a.minimum for _, a in arguments)
+    start = 0
+    for param, (minimum, maximum) in arguments:
+        reserved -= minimum
+        stop = len(tokens) - reserved
+        if maximum is not None:
+            stop = min(stop, start + maximum)
+        deque = collections.deque(tokens[start:stop])
+        aggregation.add(param, param.parser(deque).value)
+        start = stop - len(deque)
+
+    if start < len(tokens):
+        raise UnknownOption(tokens[start])
+
+
+class Scope:  # pylint: disable=too-few-public-methods
+    """Params with their option table and value sources.
+
+    Lookups in the option table and sources fall back to the inherited
+    Scope, whose Params replace Params with the same dest. params only
+    contains the Params that aren't replaced.
+    """
+    def __init__(self,
+                 params: t.Sequence[Param],
+                 inherited: t.Optional["Scope"] = None):
+        if inherited is not None:
+            params = [p for p in params if p.dest not in inherited.dests]
+        self.params = params
+        self.dests: t.FrozenSet[str] = frozenset(p.dest for p in params)
+        self.option_table: OptionTable = OptionTable(
+            params,
+            inherited.option_table if inherited else None,
+        )
+        self.sources: SourceIndex = SourceIndex(
+            params,
+            inherited.sources if inherited else None,
+        )
+
+
+UNSET: t.Any = object()
+
+
+def take_arguments(deque: t.Deque[str], table: OptionTable) -> t.List[str]:
+    """Pop tokens from deque up to the next option."""
+    tokens = []
+    while deque and (
+        not deque[0].startswith("-") or table.is_argument(deque[0])
+    ):
+        tokens.append(deque.popleft())
+    return tokens
+
+
+def split_chain(argv: t.Iterable[str],
+                delimiter: str = "+",
+                ) -> t.List[t.List[str]]:
+    """Split argv into non-empty commands at delimiter tokens."""
+    commands: t.List[t.List[str]] = [[]]
+    for token in argv:
+        if token == delimiter:
+            commands.append([])
+        else:
+            commands[-1].append(token)
+    return [c for c in commands if c]
+
+
+def add_suggestions(cli: "Genbu", exc: CLError) -> CLError:
+    """Add suggestions to UnknownOption errors (but not AmbiguousOption)."""
+    if isinstance(exc, UnknownOption) and \
+            not isinstance(exc, AmbiguousOption):
+        exc.suggestions = cli.suggest(exc.option)
+    return exc
+
+
 class Genbu:  # pylint: disable=R0902,R0913
-    """Shell (argv) parser."""
+    """Shell (argv) parser.
+
+    parse and run only fill lazy caches (scopes and suggestion indexes),
+    which are assigned once they're complete, so a built tree can be shared
+    by threads (callbacks and error handlers must be thread-safe, too).
+    """
     def __init__(self,
                  callback: t.Callable[..., t.Any],
                  *,
@@ -41,8 +172,21 @@ class Genbu:  # pylint: disable=R0902,R0913
                  description: t.Optional[str] = None,
                  params: t.Optional[t.List[t.Union[Param, str]]] = None,
                  subparsers: t.Optional[t.Sequence["Genbu"]] = None,
-                 error_handler: ExceptionHandler = default_error_handler):
-        """Note: infer_params_from_signature may throw UnsupportedCallback."""
+                 error_handler: ExceptionHandler = default_error_handler,
+                 parser_maker: t.Optional[ParserMaker] = None,
+                 config_files: t.Optional[t.Sequence[PathLike]] = None,
+                 inherited: t.Optional[t.Sequence[Param]] = None,
+                 cache: t.Optional["ResultCache"] = None):
+        """Note: infer_params_from_signature may throw UnsupportedCallback.
+
+        Params are inferred using parser_maker (or the default ParserMaker).
+        Param values may also come from config_files (JSON or TOML). If
+        config_files is None, the parent's config files are used.
+        inherited options (e.g. --verbose) are accepted by the Genbu and all
+        of its subcommands, before or after subcommand names. Their values
+        are passed to callbacks that take them.
+        If cache is not None, callback results are cached (see ResultCache).
+        """
         if name is None:
             name = callback.__name__
 
@@ -56,18 +200,31 @@ class Genbu:  # pylint: disable=R0902,R0913
         self.callback = callback
         self.error_handler = error_handler
         self.parent = None
+        self.parser_maker = parser_maker
+        self.config_files = config_files
+        self.inherited = list(inherited or ())
+        self.cache = cache
+        for param in self.inherited:
+            if not param.is_option():
+                raise ValueError(f"inherited Param isn't an option: {param}")
 
         self._set_params(params)
-
-        self.options = {}
-        self.arguments = {}
-
-        for param in self.params:
-            for optarg in param.optargs:
-                if optarg.startswith("-"):
-                    self.options[optarg] = param
-                else:
-                    self.arguments[optarg] = param
+        self.scope = Scope(self.params)
+        self.sources = self.scope.sources
+        self.option_table = self.scope.option_table
+        self.options = self.option_table.options
+        self.shared: t.Optional[Scope] = UNSET
+        self.merged: t.Optional[Scope] = None
+        self.arguments = {
+            optarg: param
+            for param in self.params
+            for optarg in param.optargs
+            if not optarg.startswith("-")
+        }
+        self.positionals = [
+            (param, arity(param.parser)) for param in self.arguments.values()
+        ]
+        self.index: t.Optional[Index] = None
 
         for sub in self.subparsers.values():
             sub.parent = self
@@ -78,17 +235,21 @@ class Genbu:  # pylint: disable=R0902,R0913
         """Set params.
 
         If params contains "...", then the params arguments override the
-        inferred Params.
+        inferred Params. Params are only inferred from the callback
+        signature if params is None or contains "...", and only for
+        parameters that aren't overridden.
         Should be called after self.callback is set.
         """
-        default_params = infer_params_from_signature(self.callback)
         filtered = [p for p in params or () if isinstance(p, Param)]
-        if params is None:
-            self.params = unique(default_params)
-        elif "..." in params:
-            self.params = unique(default_params + filtered)
-        else:
+        if params is not None and "..." not in params:
             self.params = unique(filtered)
+            return
+        default_params = infer_params_from_signature(
+            self.callback,
+            self.parser_maker,
+            overrides={p.dest: p for p in filtered},
+        )
+        self.params = unique(default_params + filtered)
 
     def complete_name(self) -> t.Tuple[str, ...]:
         """Return complete command name (includes parents)."""
@@ -107,7 +268,7 @@ class Genbu:  # pylint: disable=R0902,R0913
 
         Return expanded Param, parsed value and unparsed tokens."""
         assert name.startswith("-")
-        param = self.options.get(name)
+        param = self.parsing_scope().option_table.options.get(name)
 
         assert param is not None
 
@@ -115,6 +276,82 @@ class Genbu:  # pylint: disable=R0902,R0913
         value = param.parser(deque).value
         return param, value, list(deque)
 
+    def suggest(self, token: str) -> t.List[str]:
+        """Return options or subcommand names similar to unknown token.
+
+        The suggestion index is built on first use.
+        """
+        if self.index is None:
+            options = self.parsing_scope().option_table.options
+            self.index = Index(options, self.subparsers)
+        return self.index.suggest(token)
+
+    def inherited_scope(self) -> t.Optional[Scope]:
+        """Return Scope of inherited options of Genbu and its ancestors.
+
+        The Scope is built on first use, and Genbus that don't declare
+        inherited options share their parent's Scope instead of copying it.
+        """
+        if self.shared is UNSET:
+            parent = self.parent.inherited_scope() if self.parent else None
+            if not self.inherited:
+                self.shared = parent
+            else:
+                params = parent.params if parent else ()
+                self.shared = Scope(unique([*params, *self.inherited]))
+        return self.shared
+
+    def parsing_scope(self) -> Scope:
+        """Return Scope of Params and inherited options of Genbu.
+
+        Inherited options replace Params with the same dest (e.g. Params
+        inferred from callback parameters that take inherited values). The
+        Scope is built on first use, and chains lookups to the inherited
+        Scope instead of copying its options.
+        """
+        if self.merged is None:
+            shared = self.inherited_scope()
+            self.merged = self.scope if shared is None else \
+                Scope(self.params, shared)
+        return self.merged
+
+    def parse_inherited(self,
+                        deque: t.Deque[str],
+                        aggregation: Aggregation,
+                        ) -> bool:
+        """Parse inherited option at the start of deque (before subcommand).
+
+        Return False if deque doesn't start with an inherited option.
+        Tokens that the option parser doesn't consume (e.g. subcommand
+        names) are put back into deque.
+        """
+        shared = self.inherited_scope()
+        if shared is None or not deque[0].startswith("-"):
+            return False
+        try:
+            options = normalize(shared.params, [deque[0]],
+                                shared.option_table).options
+        except UnknownOption:
+            return False
+        if not options:
+            return False
+
+        deque.popleft()
+        if len(options[-1]) == 1:
+            options[-1].extend(take_arguments(deque, shared.option_table))
+        for name, *args in options:
+            param = shared.option_table.options[name]
+            tokens = collections.deque(args)
+            aggregation.add(param, param.parser(tokens).value)
+            deque.extendleft(reversed(tokens))
+        return True
+
+    def get_config_files(self) -> t.Sequence[PathLike]:
+        """Return config files of Genbu or of its nearest ancestor."""
+        if self.config_files is not None or self.parent is None:
+            return self.config_files or ()
+        return self.parent.get_config_files()
+
     def takes_params(self) -> bool:
         """Check if Genbu can directly take Params."""
         return bool(self.params)
@@ -123,76 +360,135 @@ class Genbu:  # pylint: disable=R0902,R0913
         """Check if Genbu has named subcommands."""
         return bool(self.subparsers)
 
-    def parse(self, argv: t.Iterable[str]) -> "Namespace":
+    def parse(self,
+              argv: t.Iterable[str],
+              error_handler: t.Optional[ExceptionHandler] = None,
+              ) -> "Namespace":
         """Parse commands, options and arguments from argv.
 
         Parse argv in three passes.
-        0. Parse commands.
+        0. Parse commands (and inherited options before them).
         1. Parse options.
         2. Parse arguments.
 
         Note: parsers may throw CantParse.
         Long option expansion may raise UnknownOption.
+        Errors are passed to error_handler if it's not None, or else to the
+        error handler of the subcommand.
         """
-        route: t.List["Genbu"] = []
+        node = self
         deque = collections.deque(argv)
+        aggregation = Aggregation()
         try:
             while deque:
-                prev = len(route)
-                for name, sub in self.subparsers.items():
-                    if name == deque[0]:
-                        route.append(sub)
-                        deque.popleft()
-                        break
-                if prev == len(route):
+                sub = node.subparsers.get(deque[0])
+                if sub is not None:
+                    node = sub
+                    deque.popleft()
+                elif not node.parse_inherited(deque, aggregation):
                     break
-
-            subparser = route[-1] if route else self
-            optargs = self.parse_optargs(subparser, deque)
-            return Namespace(optargs, route[0] if route else self)
+            optargs = self.parse_optargs(node, deque, aggregation)
+            return Namespace(optargs, node)
         except CLError as exc:
-            subparser = route[-1] if route else self
-            subparser.error_handler(subparser, exc)
+            handler = error_handler or node.error_handler
+            handler(node, add_suggestions(node, exc))
 
     def run(self, argv: t.Optional[t.Iterable[str]] = None) -> t.Any:
         """Parse argv and run callback."""
         if argv is None:
             argv = sys.argv[1:]
-        namespace = self.parse(argv)
-        return namespace.bind(namespace.cli.callback)
+        return self.parse(argv).run()
+
+    def parse_chain(self,
+                    argv: t.Iterable[str],
+                    delimiter: str = "+",
+                    ) -> t.List["Namespace"]:
+        """Parse chain of commands separated by delimiter tokens.
+
+        Every command is parsed before any callback runs. Empty commands
+        (e.g. from a trailing delimiter) are skipped.
+        """
+        return [self.parse(c) for c in split_chain(argv, delimiter)]
+
+    def run_chain(self,
+                  argv: t.Optional[t.Iterable[str]] = None,
+                  delimiter: str = "+",
+                  forward: t.Optional[str] = None,
+                  ) -> t.List[t.Any]:
+        """Run chain of commands (see parse_chain) in order.
+
+        Return list of results. If forward is not None, the result of each
+        callback is passed to the next callback as parameter forward, unless
+        it's set in argv (the parameter should have a default value).
+        """
+        if argv is None:
+            argv = sys.argv[1:]
+        results: t.List[t.Any] = []
+        for namespace in self.parse_chain(argv, delimiter):
+            if forward is not None and results:
+                namespace.names.setdefault(forward, results[-1])
+            results.append(namespace.run())
+        return results
+
+    def main(self,
+             argv: t.Optional[t.Iterable[str]] = None,
+             *,
+             output_format: str = "text",
+             ) -> None:
+        """Parse argv, run callback and write its result to stdout.
+
+        Iterators and files returned by the callback are streamed, and
+        output_format can be "text", "json" or "ndjson" (see output.write).
+        Exits with status 1 if stdout is closed early (e.g. by head).
+        Raise ValueError before running the callback if output_format is
+        unknown.
+        """
+        output.check_format(output_format)
+        try:
+            output.write(self.run(argv), output=output_format)
+            sys.stdout.flush()
+        except BrokenPipeError:
+            output.silence_stdout()
+            sys.exit(1)
 
     @staticmethod
     def parse_optargs(subparser: "Genbu",
                       argv: t.Sequence[str],
+                      aggregation: t.Optional[Aggregation] = None,
                       ) -> t.Dict[str, t.Any]:
         """Parse options and arguments from argv using custom subparser.
 
         Assume program name and subcommands have been removed.
+        Values are added to aggregation (e.g. values of inherited options
+        that come before subcommand names).
         """
-        normalized = normalize(subparser.params, argv)
+        scope = subparser.parsing_scope()
+        normalized = normalize(scope.params, argv, scope.option_table)
         args = normalized.arguments
         opts = normalized.options
-        optargs: t.Dict[Param, t.List[t.Any]] = {}
+        if aggregation is None:
+            aggregation = Aggregation()
 
         for opt in opts:
             param, value, unused = subparser.parse_opt(opt[0], opt[1:])
-
-            values = optargs.get(param, [])
-            values.append(value)
-            optargs[param] = values
+            aggregation.add(param, value)
             args.extend(unused)
 
-        deque = collections.deque(args)
-        for param in subparser.arguments.values():
-            values = optargs.get(param, [])
-            values.append(param.parser(deque).value)
-            optargs[param] = values
-
-        if deque:
-            raise UnknownOption(deque[0])
-
-        aggregated = {p.dest: p.aggregator(v) for p, v in optargs.items()}
-        _ = to_args_kwargs(aggregated, subparser.callback)  # Check arguments
+        parse_arguments(subparser.positionals, args, aggregation)
+
+        if scope.sources:
+            sources = scope.sources.resolve(
+                aggregation,
+                subparser.get_config_files(),
+            )
+            for param, tokens in sources:
+                deque = collections.deque(tokens)
+                aggregation.add(param, param.parser(deque).value)
+                if deque:
+                    raise CantParse(param.parser, tokens)
+
+        aggregated = aggregation.finish()
+        check_arguments(aggregated, subparser.callback)
         return aggregated
 
 
@@ -211,15 +507,75 @@ class Namespace:  # pylint: disable=too-few-public-methods
         args, kwargs = to_args_kwargs(self.names, function)
         return function(*args, **kwargs)
 
+    def run(self) -> t.Any:
+        """Run callback (or return its cached result)."""
+        if self.cli.cache is None:
+            return self.bind(self.cli.callback)
+        return self.cli.cache.call(self)
 
-class MissingArgument(CLError):
-    """Missing argument to function."""
-    def __init__(self, name: str):
-        super().__init__()
-        self.name = name
 
-    def __str__(self) -> str:
-        return f"missing argument: {self.name}"
+def get_value(optargs: t.Dict[str, t.Any], param: inspect.Parameter) -> t.Any:
+    """Return value of signature parameter from optargs.
+
+    Records (e.g. dataclasses) are constructed from dotted names in optargs.
+    Return param.empty if there's no value or default value.
+    """
+    if param.name in optargs:
+        return optargs[param.name]
+
+    default = default_argument(param)
+    record = get_record(param.annotation)
+    if record is not None and (
+        default is param.empty or record.is_set(optargs, param.name)
+    ):
+        return record.build(optargs, param.name)
+    return default
+
+
+def default_argument(param: inspect.Parameter) -> t.Any:
+    """Return default value of signature parameter (or param.empty)."""
+    if param.default is not param.empty:
+        return param.default
+    if param.kind == param.VAR_POSITIONAL:
+        return ()
+    if param.kind == param.VAR_KEYWORD:
+        return {}
+    return param.empty
+
+
+def check_arguments(optargs: t.Dict[str, t.Any],
+                    function: t.Callable[..., t.Any],
+                    ) -> None:
+    """Check that optargs has values for every required parameter.
+
+    Records aren't built (see get_value), so default factories only run
+    when the function gets called. Raise MissingArgument otherwise.
+    """
+    for name, param in signature(function).parameters.items():
+        if name in optargs:
+            continue
+        default = default_argument(param)
+        record = get_record(param.annotation)
+        if record is not None and (
+            default is param.empty or record.is_set(optargs, name)
+        ):
+            record.check(optargs, name)
+        elif default is param.empty:
+            raise MissingArgument(name)
+
+
+@functools.lru_cache(maxsize=1024)
+def _signature(function: t.Callable[..., t.Any]) -> inspect.Signature:
+    return inspect.signature(function)
+
+
+def signature(function: t.Callable[..., t.Any]) -> inspect.Signature:
+    """Return (cached) signature of function."""
+    try:
+        hash(function)
+    except TypeError:
+        return inspect.signature(function)
+    return _signature(function)
 
 
 def to_args_kwargs(optargs: t.Dict[str, t.Any],
@@ -232,16 +588,9 @@ def to_args_kwargs(optargs: t.Dict[str, t.Any],
     args = []
     kwargs = {}
 
-    sig = inspect.signature(function)
+    sig = signature(function)
     for name, param in sig.parameters.items():
-        default = (
-            param.default if param.default is not param.empty
-            else () if param.kind == param.VAR_POSITIONAL
-            else {} if param.kind == param.VAR_KEYWORD
-            else param.empty
-        )
-
-        value = optargs.get(name, default)
+        value = get_value(optargs, param)
         if value is param.empty:
             raise MissingArgument(name)
         if param.kind in (param.POSITIONAL_ONLY, param.POSITIONAL_OR_KEYWORD):
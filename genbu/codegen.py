@@ -0,0 +1,430 @@
+"""Generate Python source code for parser trees.
+
+compile_parser turns a parser tree into a Compiled parser that runs
+generated code instead of interpreting the tree: tokens are read by index
+instead of being copied, single token parsers (One, Try, Lazy, Lit and
+Bool) are inlined, and Repeat parsers become loops. Results and errors
+are the same as the interpreted tree's. Parsers without code generators
+(e.g. Memo, Packrat and custom parsers) are called as is.
+"""
+
+import collections
+import threading
+import typing as t
+
+from . import analysis, combinators as comb
+
+
+EMPTY: t.Any = object()  # Value of empty results (see Eof)
+TRUE = frozenset(("1", "t", "true", "y", "yes"))
+FALSE = frozenset(("0", "f", "false", "n", "no"))
+MAXSIZE = 256
+
+Lines = t.List[str]
+OnSuccess = t.Callable[[str, str], Lines]
+Function = t.Callable[[t.Tuple[str, ...], int, int], t.Tuple[t.Any, int]]
+
+
+def indent(lines: Lines) -> Lines:
+    """Indent lines of code."""
+    return [f"    {line}" for line in lines]
+
+
+def may_be_empty(parser: comb.Parser) -> bool:
+    """Check if parser may return empty results."""
+    kind = type(parser)
+    if kind is comb.Eof:
+        return True
+    if kind in (comb.Or, analysis.Dispatch):
+        return any(map(may_be_empty, t.cast(comb.Or, parser).parsers))
+    return kind not in LEAVES and kind not in (comb.And, comb.Repeat)
+
+
+class Generator:
+    """Python source code generator for parser trees.
+
+    Each And, Or and Repeat parser becomes a function that takes a tuple of
+    tokens, the index of the first token and the number of tokens, and that
+    returns the parsed value and the index of the next token. Parser
+    attributes are stored in the namespace with the node number as suffix
+    (e.g. P0 is the root parser and F0 is its func).
+    """
+    def __init__(self) -> None:
+        self.namespace: t.Dict[str, t.Any] = {
+            "CantParse": comb.CantParse,
+            "EMPTY": EMPTY,
+            "FALSE": FALSE,
+            "NOTHING": comb.NOTHING,
+            "TRUE": TRUE,
+            "Thunk": comb.Thunk,
+            "deque": collections.deque,
+        }
+        self.numbers: t.Dict[int, int] = {}
+        self.functions: t.Dict[int, str] = {}
+        self.sources: t.List[str] = []
+
+    def source(self) -> str:
+        """Return generated source code."""
+        return "\n\n".join(self.sources)
+
+    def number(self, parser: comb.Parser) -> int:
+        """Return node number of parser and add it to the namespace."""
+        number = self.numbers.get(id(parser))
+        if number is None:
+            number = self.numbers[id(parser)] = len(self.numbers)
+            self.namespace[f"P{number}"] = parser
+            for attr in ("func", "value", "then"):
+                if hasattr(parser, attr):
+                    self.namespace[f"{attr[0].upper()}{number}"] = \
+                        getattr(parser, attr)
+            if isinstance(parser, comb.Lit):
+                self.namespace[f"S{number}"] = str(parser.value)
+        return number
+
+    def function(self, parser: comb.Parser) -> str:
+        """Generate function for parser (once) and return its name."""
+        name = self.functions.get(id(parser))
+        if name is not None:
+            return name
+        number = self.number(parser)
+        name = self.functions[id(parser)] = f"parse{number}"
+
+        make_body = BODIES.get(type(parser))
+        if make_body is not None:
+            body = make_body(self, parser, number)
+        elif type(parser) in LEAVES:
+            body = self.must(parser, "value") + ["return value, i"]
+        else:
+            body = [
+                "tokens = deque(toks[i:])",
+                f"result = P{number}(tokens)",
+                "value = EMPTY if result.empty else result.value",
+                "return value, n - len(tokens)",
+            ]
+        self.sources.append(
+            "\n".join([f"def {name}(toks, i, n):"] + indent(body))
+        )
+        return name
+
+    def must(self, parser: comb.Parser, target: str) -> Lines:
+        """Generate code that parses value into target or raises CantParse.
+
+        The code updates the token index (i) on success.
+        """
+        leaf = LEAVES.get(type(parser))
+        if leaf is not None:
+            return leaf[0](self, parser, target)
+        return [f"{target}, i = {self.function(parser)}(toks, i, n)"]
+
+    def attempt(self, parser: comb.Parser, on_success: OnSuccess) -> Lines:
+        """Generate code that runs on_success code if parser succeeds.
+
+        on_success gets the value and next index expressions, and its code
+        must leave the current block (e.g. return). Otherwise the code falls
+        through without changing the token index.
+        """
+        leaf = LEAVES.get(type(parser))
+        if leaf is not None:
+            return leaf[1](self, parser, on_success)
+        return [
+            "try:",
+            f"    value, j = {self.function(parser)}(toks, i, n)",
+            "except CantParse:",
+            "    pass",
+            "else:",
+        ] + indent(on_success("value", "j"))
+
+
+def must_one(gen: Generator, parser: comb.Parser, target: str) -> Lines:
+    """Generate One parser code."""
+    number = gen.number(parser)
+    return [
+        "if i >= n:",
+        f"    raise CantParse(P{number}, ())",
+        "try:",
+        f"    {target} = F{number}(toks[i])",
+        "except Exception as exc:",
+        f"    raise CantParse(P{number}, toks[i + 1:]) from exc",
+        "i += 1",
+    ]
+
+
+def attempt_one(gen: Generator,
+                parser: comb.Parser,
+                on_success: OnSuccess,
+                ) -> Lines:
+    """Generate One parser code for Or and Repeat."""
+    number = gen.number(parser)
+    return [
+        "if i < n:",
+        "    try:",
+        f"        value = F{number}(toks[i])",
+        "    except Exception:",
+        "        pass",
+        "    else:",
+    ] + indent(indent(on_success("value", "i + 1")))
+
+
+def must_try(gen: Generator, parser: comb.Parser, target: str) -> Lines:
+    """Generate Try parser code."""
+    number = gen.number(parser)
+    return [
+        f"{target} = F{number}(toks[i]) if i < n else NOTHING",
+        f"if {target} is NOTHING:",
+        f"    raise CantParse(P{number}, toks[i:])",
+        "i += 1",
+    ]
+
+
+def attempt_try(gen: Generator,
+                parser: comb.Parser,
+                on_success: OnSuccess,
+                ) -> Lines:
+    """Generate Try parser code for Or and Repeat."""
+    number = gen.number(parser)
+    return [
+        f"value = F{number}(toks[i]) if i < n else NOTHING",
+        "if value is not NOTHING:",
+    ] + indent(on_success("value", "i + 1"))
+
+
+def must_lazy(gen: Generator, parser: comb.Parser, target: str) -> Lines:
+    """Generate Lazy parser code."""
+    number = gen.number(parser)
+    return [
+        "if i >= n:",
+        f"    raise CantParse(P{number}, ())",
+        f"{target} = Thunk(P{number}, toks[i])",
+        "i += 1",
+    ]
+
+
+def attempt_lazy(gen: Generator,
+                 parser: comb.Parser,
+                 on_success: OnSuccess,
+                 ) -> Lines:
+    """Generate Lazy parser code for Or and Repeat."""
+    number = gen.number(parser)
+    return ["if i < n:"] + indent(
+        on_success(f"Thunk(P{number}, toks[i])", "i + 1")
+    )
+
+
+def must_lit(gen: Generator, parser: comb.Parser, target: str) -> Lines:
+    """Generate Lit parser code."""
+    number = gen.number(parser)
+    return [
+        f"if i >= n or toks[i] != S{number}:",
+        f"    raise CantParse(P{number}, toks[i:])",
+        f"{target} = V{number}",
+        "i += 1",
+    ]
+
+
+def attempt_lit(gen: Generator,
+                parser: comb.Parser,
+                on_success: OnSuccess,
+                ) -> Lines:
+    """Generate Lit parser code for Or and Repeat."""
+    number = gen.number(parser)
+    return [f"if i < n and toks[i] == S{number}:"] + indent(
+        on_success(f"V{number}", "i + 1")
+    )
+
+
+def must_bool(gen: Generator, parser: comb.Parser, target: str) -> Lines:
+    """Generate Bool parser code."""
+    number = gen.number(parser)
+    return [
+        "if i >= n:",
+        f"    raise CantParse(P{number}, ())",
+        "lower = toks[i].lower()",
+        "i += 1",
+        "if lower in TRUE:",
+        f"    {target} = True",
+        "elif lower in FALSE:",
+        f"    {target} = False",
+        "else:",
+        f"    raise CantParse(P{number}, toks[i:])",
+    ]
+
+
+def attempt_bool(_: Generator,
+                 _parser: comb.Parser,
+                 on_success: OnSuccess,
+                 ) -> Lines:
+    """Generate Bool parser code for Or and Repeat."""
+    return [
+        "if i < n:",
+        "    lower = toks[i].lower()",
+        "    if lower in TRUE:",
+    ] + indent(indent(on_success("True", "i + 1"))) + [
+        "    if lower in FALSE:",
+    ] + indent(indent(on_success("False", "i + 1")))
+
+
+def must_emit(gen: Generator, parser: comb.Parser, target: str) -> Lines:
+    """Generate Emit parser code."""
+    return [f"{target} = V{gen.number(parser)}"]
+
+
+def attempt_emit(gen: Generator,
+                 parser: comb.Parser,
+                 on_success: OnSuccess,
+                 ) -> Lines:
+    """Generate Emit parser code for Or and Repeat."""
+    return on_success(f"V{gen.number(parser)}", "i")
+
+
+def must_eof(gen: Generator, parser: comb.Parser, target: str) -> Lines:
+    """Generate Eof parser code."""
+    return [
+        "if i < n:",
+        f"    raise CantParse(P{gen.number(parser)}, toks[i:])",
+        f"{target} = EMPTY",
+    ]
+
+
+def attempt_eof(_: Generator,
+                _parser: comb.Parser,
+                on_success: OnSuccess,
+                ) -> Lines:
+    """Generate Eof parser code for Or and Repeat."""
+    return ["if i == n:"] + indent(on_success("EMPTY", "i"))
+
+
+LEAVES: t.Dict[type, t.Tuple[
+    t.Callable[[Generator, comb.Parser, str], Lines],
+    t.Callable[[Generator, comb.Parser, OnSuccess], Lines],
+]] = {
+    comb.Bool: (must_bool, attempt_bool),
+    comb.Emit: (must_emit, attempt_emit),
+    comb.Eof: (must_eof, attempt_eof),
+    comb.Lazy: (must_lazy, attempt_lazy),
+    comb.Lit: (must_lit, attempt_lit),
+    comb.One: (must_one, attempt_one),
+    comb.Try: (must_try, attempt_try),
+}
+
+
+def and_body(gen: Generator, parser: comb.Parser, number: int) -> Lines:
+    """Generate And parser function body."""
+    parsers = t.cast(comb.And, parser).parsers
+    if not any(map(may_be_empty, parsers)):
+        lines = []
+        for index, sub in enumerate(parsers):
+            lines.extend(gen.must(sub, f"v{index}"))
+        values = ", ".join(f"v{index}" for index in range(len(parsers)))
+        return lines + [f"return T{number}([{values}]), i"]
+
+    lines = ["values = []"]
+    for sub in parsers:
+        lines.extend(gen.must(sub, "value"))
+        if may_be_empty(sub):
+            lines.extend([
+                "if value is not EMPTY:",
+                "    values.append(value)",
+            ])
+        else:
+            lines.append("values.append(value)")
+    return lines + [f"return T{number}(values), i"]
+
+
+def or_body(gen: Generator, parser: comb.Parser, number: int) -> Lines:
+    """Generate Or parser function body."""
+    def on_success(value: str, end: str) -> Lines:
+        return [f"return {value}, {end}"]
+
+    lines = []
+    for sub in t.cast(comb.Or, parser).parsers:
+        lines.extend(gen.attempt(sub, on_success))
+    return lines + [f"raise CantParse(P{number}, toks[i:])"]
+
+
+def repeat_body(gen: Generator, parser: comb.Parser, number: int) -> Lines:
+    """Generate Repeat parser function body.
+
+    Like Repeat.parse, the loop stops when the sub-parser doesn't consume
+    tokens.
+    """
+    def on_success(value: str, end: str) -> Lines:
+        if end == "i":
+            return [f"values.append({value})", "break"]
+        if end == "i + 1":
+            return [f"values.append({value})", "i += 1", "continue"]
+        return [
+            f"values.append({value})",
+            f"if {end} == i:",
+            "    break",
+            f"i = {end}",
+            "continue",
+        ]
+
+    sub = t.cast(comb.Repeat, parser).parser
+    return ["values = []", "while i < n:"] + indent(
+        gen.attempt(sub, on_success) + ["break"]
+    ) + [f"return T{number}(values), i"]
+
+
+BODIES: t.Dict[type, t.Callable[[Generator, comb.Parser, int], Lines]] = {
+    comb.And: and_body,
+    comb.Or: or_body,
+    analysis.Dispatch: or_body,  # Same results as Or
+    comb.Repeat: repeat_body,
+}
+
+
+class Compiled(comb.Parser):
+    """Parser that runs generated code (see compile_parser)."""
+    def __init__(self, parser: comb.Parser):
+        self.parser = parser
+        generator = Generator()
+        name = generator.function(parser)
+        self.source = generator.source()
+        code = compile(self.source, f"<genbu.codegen {parser}>", "exec")
+        exec(code, generator.namespace)  # pylint: disable=exec-used
+        self.func: Function = generator.namespace[name]
+
+    def __str__(self) -> str:
+        return str(self.parser)
+
+    def __call__(self, tokens: comb.Tokens) -> comb.Result:
+        """Parse tokens (consumes tokens only on success)."""
+        return self.parse(tokens)
+
+    def parse(self, tokens: comb.Tokens) -> comb.Result:
+        """Parse tokens using generated function."""
+        toks = tuple(tokens)
+        value, end = self.func(toks, 0, len(toks))
+        for _ in range(end):
+            tokens.popleft()
+        if value is EMPTY:
+            return comb.Result(None, empty=True)
+        return comb.Result(value)
+
+
+cache: t.Dict[int, Compiled] = collections.OrderedDict()
+lock = threading.Lock()
+
+
+def compile_parser(parser: comb.Parser) -> Compiled:
+    """Return Compiled parser for parser tree.
+
+    The MAXSIZE most recently used Compiled parsers are cached. Cached
+    Compiled parsers keep their parser trees alive, so tree ids aren't
+    reused while they're in the cache. Don't modify compiled trees.
+    """
+    if isinstance(parser, Compiled):
+        return parser
+    with lock:
+        compiled = cache.get(id(parser))
+        if compiled is not None:
+            t.cast(t.Any, cache).move_to_end(id(parser))
+            return compiled
+
+    compiled = Compiled(parser)
+    with lock:
+        compiled = cache.setdefault(id(parser), compiled)
+        if len(cache) > MAXSIZE:
+            t.cast(t.Any, cache).popitem(last=False)
+    return compiled
@@ -1,6 +1,8 @@
 """Option arguments parser combinators."""
 
 import abc
+import collections
+import threading
 import typing as t
 
 from .exceptions import CLError
@@ -27,6 +29,13 @@ class Parser(abc.ABC):
             tokens.popleft()
         return result
 
+    def attempt(self, tokens: Tokens) -> t.Optional[Result]:
+        """Like __call__, but return None instead of raising CantParse."""
+        try:
+            return self(tokens)
+        except CantParse:
+            return None
+
     @abc.abstractmethod
     def parse(self, tokens: Tokens) -> Result:
         """Abstract parse method."""
@@ -68,6 +77,106 @@ class One(Parser):
             raise CantParse(self, tokens) from exc
 
 
+NOTHING: t.Any = object()  # Returned by Try functions on invalid input
+
+
+class Try(Parser):
+    """Single token parser that uses a non-raising conversion function.
+
+    self.func should return NOTHING instead of raising an exception if it
+    can't convert the token. Unlike One, Try doesn't copy tokens or catch
+    exceptions, so it's cheaper to try inside Or and Repeat.
+    """
+    def __init__(self,
+                 func: t.Callable[[str], t.Any],
+                 name: t.Optional[str] = None):
+        self.func = func
+        self.name = name if name is not None else func.__name__
+
+    def __str__(self) -> str:
+        return self.name
+
+    def __call__(self, tokens: Tokens) -> Result:
+        """Parse tokens (consumes tokens only on success)."""
+        return self.parse(tokens)
+
+    def attempt(self, tokens: Tokens) -> t.Optional[Result]:
+        """Parse tokens without raising CantParse."""
+        if tokens:
+            value = self.func(tokens[0])
+            if value is not NOTHING:
+                tokens.popleft()
+                return Result(value)
+        return None
+
+    def parse(self, tokens: Tokens) -> Result:
+        """Parse tokens using non-raising function (self.func)."""
+        result = self.attempt(tokens)
+        if result is None:
+            raise CantParse(self, tokens)
+        return result
+
+
+class Thunk:  # pylint: disable=too-few-public-methods
+    """Deferred conversion of a token (see Lazy)."""
+    __slots__ = ("parser", "token", "value")
+
+    def __init__(self, parser: "Lazy", token: str):
+        self.parser = parser
+        self.token = token
+        self.value: t.Any = NOTHING
+
+    def force(self) -> t.Any:
+        """Convert token (only once).
+
+        Raise CantParse if the conversion fails.
+        """
+        if self.value is NOTHING:
+            try:
+                self.value = self.parser.func(self.token)
+            except Exception as exc:
+                raise CantParse(self.parser, [self.token]) from exc
+        return self.value
+
+
+def force(value: t.Any) -> t.Any:
+    """Replace Thunks in value with converted values.
+
+    Looks inside lists, tuples, sets and dicts (but not their subclasses).
+    """
+    kind = type(value)
+    if kind is Thunk:
+        return value.force()
+    if kind in (list, tuple, set, frozenset):
+        return kind(map(force, value))
+    if kind is dict:
+        return {force(k): force(v) for k, v in value.items()}
+    return value
+
+
+class Lazy(Parser):
+    """Single token parser that defers conversion until forced.
+
+    Returns a Thunk for any token, so conversion errors are raised only
+    when the Thunk is forced (see lazify).
+    """
+    def __init__(self, func: t.Callable[[str], t.Any]):
+        self.func = func
+
+    def __str__(self) -> str:
+        return self.func.__name__
+
+    def __call__(self, tokens: Tokens) -> Result:
+        """Parse tokens (consumes tokens only on success)."""
+        return self.parse(tokens)
+
+    def parse(self, tokens: Tokens) -> Result:
+        """Wrap token in Thunk."""
+        if not tokens:
+            raise CantParse(self, tokens)
+        return Result(Thunk(self, tokens.popleft()))
+
+
 class Lit(Parser):
     """Literal parser.
 
@@ -106,10 +215,9 @@ class Or(Parser):
     def parse(self, tokens: Tokens) -> Result:
         """Run parsers one at a time and return first non-error result."""
         for parse in self.parsers:
-            try:
-                return parse(tokens)
-            except CantParse:
-                pass
+            result = parse.attempt(tokens)
+            if result is not None:
+                return result
         raise CantParse(self, tokens)
 
 
@@ -151,12 +259,11 @@ class Repeat(Parser):
         value = []
         length = len(tokens)
         while tokens:
-            try:
-                result = self.parser(tokens)
-                assert not result.empty
-                value.append(result.value)
-            except CantParse:
+            result = self.parser.attempt(tokens)
+            if result is None:
                 break
+            assert not result.empty
+            value.append(result.value)
             if length == len(tokens):  # Avoid infinite loop
                 break
             length = len(tokens)
@@ -202,3 +309,163 @@ class Bool(Parser):
             if lower in ("0", "f", "false", "n", "no"):
                 return Result(False)
         raise CantParse(self, tokens)
+
+
+def children(parser: Parser) -> t.Tuple[Parser, ...]:
+    """Return sub-parsers of parser."""
+    if isinstance(parser, (Or, And)):
+        return parser.parsers
+    if isinstance(parser, (Repeat, Memo)):
+        return (parser.parser,)
+    return ()
+
+
+def map_children(parser: Parser,
+                 func: t.Callable[[Parser], Parser],
+                 ) -> Parser:
+    """Return copy of parser with func applied to its sub-parsers.
+
+    Leaf parsers are returned as is.
+    """
+    if isinstance(parser, Or):
+        return Or(*map(func, parser.parsers))
+    if isinstance(parser, And):
+        return And(*map(func, parser.parsers), then=parser.then)
+    if isinstance(parser, Repeat):
+        return Repeat(func(parser.parser), then=parser.then)
+    return parser
+
+
+def lazify(parser: Parser) -> Parser:
+    """Return copy of parser with One parsers replaced by Lazy parsers.
+
+    Only replaces parsers whose failure can't change the parse result, i.e.
+    One parsers that aren't inside Or or Repeat parsers, and And parsers
+    that collect values in lists or tuples.
+    """
+    if isinstance(parser, One):
+        return Lazy(parser.func)
+    if isinstance(parser, And) and parser.then in (list, tuple):
+        return map_children(parser, lazify)
+    return parser
+
+
+MemoEntry = t.Union[t.Tuple[Result, int], CantParse]
+
+
+class MemoTable:
+    """Bounded memo table (evicts least recently used entries).
+
+    Each thread gets its own entries, so threads can share Memo parsers.
+    """
+    def __init__(self, maxsize: t.Optional[int] = 4096):
+        self.maxsize = maxsize
+        self.local = threading.local()
+
+    @property
+    def entries(self) -> t.Dict[t.Tuple[int, int], MemoEntry]:
+        """Return entries of the current thread."""
+        entries = getattr(self.local, "entries", None)
+        if entries is None:
+            entries = self.local.entries = collections.OrderedDict()
+        return t.cast(t.Dict[t.Tuple[int, int], MemoEntry], entries)
+
+    def get(self, key: t.Tuple[int, int]) -> t.Optional[MemoEntry]:
+        """Return entry or None."""
+        entry = self.entries.get(key)
+        if entry is not None and self.maxsize is not None:
+            t.cast(t.Any, self.entries).move_to_end(key)
+        return entry
+
+    def put(self, key: t.Tuple[int, int], entry: MemoEntry) -> None:
+        """Add entry and evict old entries if the table is full."""
+        self.entries[key] = entry
+        if self.maxsize is not None and len(self.entries) > self.maxsize:
+            t.cast(t.Any, self.entries).popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self.entries.clear()
+
+
+class Memo(Parser):
+    """Parser that runs self.parser at most once per token position.
+
+    Token positions are identified by the number of remaining tokens, so
+    the table must be cleared before parsing different input (see Packrat).
+    """
+    def __init__(self, parser: Parser, table: MemoTable):
+        self.parser = parser
+        self.table = table
+
+    def __str__(self) -> str:
+        return str(self.parser)
+
+    def __call__(self, tokens: Tokens) -> Result:
+        """Parse tokens (self.parser consumes tokens only on success)."""
+        return self.parse(tokens)
+
+    def parse(self, tokens: Tokens) -> Result:
+        """Return memoized result or run self.parser."""
+        key = (id(self.parser), len(tokens))
+        entry = self.table.get(key)
+        if entry is None:
+            try:
+                result = self.parser(tokens)
+                entry = (result, key[1] - len(tokens))
+            except CantParse as exc:
+                entry = exc
+            self.table.put(key, entry)
+            if isinstance(entry, CantParse):
+                raise entry
+            return result
+
+        if isinstance(entry, CantParse):
+            raise entry.with_traceback(None)
+        result, consumed = entry
+        for _ in range(consumed):
+            tokens.popleft()
+        return result
+
+
+def memoize(parser: Parser, table: MemoTable) -> Parser:
+    """Wrap parser and its sub-parsers in Memo parsers that share table.
+
+    Emit and Eof parsers are not wrapped, because they're cheap.
+    Shared sub-parsers stay shared.
+    """
+    wrapped: t.Dict[int, Parser] = {}
+
+    def wrap(node: Parser) -> Parser:
+        result = wrapped.get(id(node))
+        if result is None:
+            result = map_children(node, wrap)
+            if not isinstance(node, (Emit, Eof)):
+                result = Memo(result, table)
+            wrapped[id(node)] = result
+        return result
+    return wrap(parser)
+
+
+class Packrat(Parser):
+    """Memoizing (packrat) parser.
+
+    Each sub-parser runs at most once per token position, so ambiguous
+    grammars (e.g. Or inside Repeat inside And) don't backtrack
+    exponentially. maxsize bounds the number of memoized results.
+    """
+    def __init__(self, parser: Parser, maxsize: t.Optional[int] = 4096):
+        self.parser = parser
+        self.table = MemoTable(maxsize)
+        self.memoized = memoize(parser, self.table)
+
+    def __str__(self) -> str:
+        return str(self.parser)
+
+    def parse(self, tokens: Tokens) -> Result:
+        """Parse tokens using memoized parser tree."""
+        self.table.clear()
+        try:
+            return self.memoized(tokens)
+        finally:
+            self.table.clear()
@@ -0,0 +1,170 @@
+"""Optimized converters for types registered in ParserMaker."""
+
+import datetime
+import decimal
+import enum
+import functools
+import ipaddress
+import sys
+import typing as t
+
+from . import combinators as comb
+
+
+Converter = t.Callable[[str], t.Any]
+
+
+def nonraising(func: Converter,
+               errors: t.Tuple[t.Type[Exception], ...] = (ValueError,),
+               ) -> Converter:
+    """Return func wrapper that returns comb.NOTHING instead of raising.
+
+    Only errors are caught.
+    """
+    def wrapper(token: str) -> t.Any:
+        try:
+            return func(token)
+        except errors:
+            return comb.NOTHING
+    return wrapper
+
+
+def interned(func: Converter, maxsize: t.Optional[int] = 1024) -> Converter:
+    """Return func wrapper that reuses results for repeated tokens.
+
+    Only use on functions that return immutable values.
+    """
+    return functools.lru_cache(maxsize=maxsize)(func)
+
+
+def with_kind(parser: comb.Parser, kind: str, **details: t.Any,
+              ) -> comb.Parser:
+    """Attach token kind to parser, so genbu.schema can check tokens.
+
+    details are JSON-compatible (e.g. choices of enum parsers).
+    """
+    setattr(parser, "kind", {"kind": kind, **details})
+    return parser
+
+
+def make_enum_parser(cls: t.Type[enum.Enum]) -> comb.Parser:
+    """Return parser that looks up enum members in a precomputed table.
+
+    Accepts member values (if the value is a str) and member names.
+    """
+    table: t.Dict[str, enum.Enum] = {}
+    for name, member in cls.__members__.items():
+        table.setdefault(name, member)
+    for member in cls:
+        if isinstance(member.value, str):
+            table[member.value] = member
+    parser = comb.Try(lambda token: table.get(token, comb.NOTHING),
+                      name=cls.__name__)
+    return with_kind(parser, "choice", choices=list(table))
+
+
+IP_KINDS = {
+    ipaddress.IPv4Address: "ipv4_address",
+    ipaddress.IPv4Interface: "ipv4_interface",
+    ipaddress.IPv4Network: "ipv4_network",
+    ipaddress.IPv6Address: "ipv6_address",
+    ipaddress.IPv6Interface: "ipv6_interface",
+    ipaddress.IPv6Network: "ipv6_network",
+}
+
+
+def make_ip_parser(cls: t.Type[t.Any]) -> comb.Parser:
+    """Return parser for ipaddress types (interns parsed addresses)."""
+    parser = comb.Try(interned(nonraising(cls)), name=cls.__name__)
+    kind = next((IP_KINDS[c] for c in cls.__mro__ if c in IP_KINDS), "any")
+    return with_kind(parser, kind)
+
+
+def make_decimal_parser(cls: t.Type[decimal.Decimal]) -> comb.Parser:
+    """Return parser for decimal.Decimal."""
+    parser = comb.Try(nonraising(cls, (ArithmeticError, ValueError)),
+                      name=cls.__name__)
+    return with_kind(parser, "decimal")
+
+
+DateTimeType = t.Union[
+    t.Type[datetime.date],
+    t.Type[datetime.datetime],
+    t.Type[datetime.time],
+]
+
+
+def strptime_converter(cls: DateTimeType,
+                       formats: t.Sequence[str],
+                       ) -> Converter:
+    """Return non-raising converter that tries strptime formats in order."""
+    def convert(token: str) -> t.Any:
+        for fmt in formats:
+            try:
+                value = datetime.datetime.strptime(token, fmt)
+            except ValueError:
+                continue
+            if issubclass(cls, datetime.datetime):
+                return value
+            if issubclass(cls, datetime.date):
+                return value.date()
+            return value.time()
+        return comb.NOTHING
+    return convert
+
+
+def datetime_kind(cls: DateTimeType) -> str:
+    """Return token kind of date, datetime or time class."""
+    if issubclass(cls, datetime.datetime):
+        return "datetime"
+    if issubclass(cls, datetime.date):
+        return "date"
+    return "time"
+
+
+DATETIME_KINDS: t.Dict[str, DateTimeType] = {
+    "date": datetime.date,
+    "datetime": datetime.datetime,
+    "time": datetime.time,
+}
+
+
+def make_datetime_parser(*formats: str,
+                         ) -> t.Callable[[DateTimeType], comb.Parser]:
+    """Return maker for date, datetime and time parsers.
+
+    The parsers try formats in order (strptime formats). If there are no
+    formats, the parsers use the class's fromisoformat method.
+    Results are cached, because date and time objects are immutable.
+    """
+    def make_parser(cls: DateTimeType) -> comb.Parser:
+        if formats:
+            func = strptime_converter(cls, formats)
+        else:
+            func = nonraising(getattr(cls, "fromisoformat"))
+        parser = comb.Try(interned(func), name=cls.__name__)
+        details = {"formats": list(formats)} if formats else {}
+        return with_kind(parser, datetime_kind(cls), **details)
+    return make_parser
+
+
+def default_converters() -> t.Dict[type, t.Callable[[t.Any], comb.Parser]]:
+    """Return parser makers that ParserMaker registers by default."""
+    converters: t.Dict[type, t.Callable[[t.Any], comb.Parser]] = {
+        decimal.Decimal: make_decimal_parser,
+        enum.Enum: make_enum_parser,
+        ipaddress.IPv4Address: make_ip_parser,
+        ipaddress.IPv4Interface: make_ip_parser,
+        ipaddress.IPv4Network: make_ip_parser,
+        ipaddress.IPv6Address: make_ip_parser,
+        ipaddress.IPv6Interface: make_ip_parser,
+        ipaddress.IPv6Network: make_ip_parser,
+    }
+    if sys.version_info >= (3, 7):
+        make = make_datetime_parser()
+        converters.update({
+            datetime.date: make,
+            datetime.datetime: make,
+            datetime.time: make,
+        })
+    return converters
@@ -3,3 +3,13 @@
 
 class CLError(Exception):
     """Base CLI exception."""
+
+
+class MissingArgument(CLError):
+    """Missing argument to function."""
+    def __init__(self, name: str):
+        super().__init__()
+        self.name = name
+
+    def __str__(self) -> str:
+        return f"missing argument: {self.name}"
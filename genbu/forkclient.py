@@ -0,0 +1,90 @@
+"""Client of genbu.forkserver (Unix only).
+
+Only imports the standard library, so it starts quickly when it's run as
+a script (running it with -m imports the genbu package first).
+
+Request: 4-byte length + JSON header, with fds attached (SCM_RIGHTS).
+Response: 4-byte exit status.
+
+Usage: python path/to/genbu/forkclient.py SOCKET [ARGS...]
+"""
+
+import array
+import json
+import os
+import socket
+import struct
+import sys
+import typing as t
+
+
+HEADER = struct.Struct("!I")
+STATUS = struct.Struct("!i")
+STDIO = (0, 1, 2)
+
+
+def recv_exactly(conn: socket.socket, size: int) -> bytes:
+    """Receive exactly size bytes, or raise EOFError."""
+    data = b""
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            raise EOFError
+        data += chunk
+    return data
+
+
+def send_request(conn: socket.socket,
+                 argv: t.Sequence[str],
+                 env: t.Mapping[str, str],
+                 cwd: str,
+                 fds: t.Sequence[int] = STDIO,
+                 ) -> None:
+    """Send request header with fds."""
+    payload = json.dumps(
+        {"argv": list(argv), "env": dict(env), "cwd": cwd},
+    ).encode()
+    ancillary = [(socket.SOL_SOCKET, socket.SCM_RIGHTS,
+                  array.array("i", fds).tobytes())]
+    conn.sendmsg([HEADER.pack(len(payload))], ancillary)
+    conn.sendall(payload)
+
+
+def call(path: str,
+         argv: t.Sequence[str],
+         env: t.Optional[t.Mapping[str, str]] = None,
+         cwd: t.Optional[str] = None,
+         fds: t.Sequence[int] = STDIO,
+         ) -> int:
+    """Run command on fork server and return its exit status.
+
+    env and cwd default to the current process's. fds are the stdin,
+    stdout and stderr file descriptors of the command.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(path)
+        send_request(
+            conn,
+            argv,
+            os.environ if env is None else env,
+            os.getcwd() if cwd is None else cwd,
+            fds,
+        )
+        try:
+            (status,) = STATUS.unpack(recv_exactly(conn, STATUS.size))
+        except EOFError:
+            return 255  # Child died without sending status
+        return t.cast(int, status)
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> int:
+    """Call fork server with command-line arguments."""
+    args = list(sys.argv[1:] if argv is None else argv)
+    if not args:
+        print(__doc__.strip().rsplit("\n\n", 1)[-1], file=sys.stderr)
+        return 2
+    return call(args[0], args[1:])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""Fork server for fast CLI invocations (Unix only).
+
+The server holds a fully built Genbu tree and listens on a Unix socket.
+For each connection, the server forks a child that receives argv, env, cwd
+and the stdin, stdout and stderr file descriptors of the client, runs
+Genbu.run with the client's stdio, and sends back the exit status. The
+protocol and client are in genbu.forkclient.
+
+The socket is only accessible to the server's user, and connections from
+other users are rejected (if the platform supports SO_PEERCRED).
+
+Usage:
+    python -m genbu.forkserver serve MODULE:ATTR SOCKET
+    python -m genbu.forkserver call SOCKET [ARGS...]
+"""
+
+import array
+import json
+import os
+import socket
+import struct
+import sys
+import traceback
+import typing as t
+
+from . import output
+from .forkclient import HEADER, STATUS, STDIO, call, recv_exactly
+from .refs import resolve
+
+if t.TYPE_CHECKING:
+    from .cli import Genbu
+
+
+TIMEOUT = 10.0  # Seconds to wait for a request
+MAX_REQUEST = 1 << 24  # Bytes
+CREDENTIALS = struct.Struct("3i")  # struct ucred: pid, uid, gid
+
+
+class Request(t.NamedTuple):
+    """Client request."""
+    argv: t.List[str]
+    env: t.Dict[str, str]
+    cwd: str
+    fds: t.List[int]
+
+
+def recv_request(conn: socket.socket) -> Request:
+    """Receive request header and fds."""
+    fds = array.array("i")
+    size = socket.CMSG_SPACE(len(STDIO) * fds.itemsize)
+    data, ancillary, _, _ = conn.recvmsg(HEADER.size, size)
+    for level, kind, value in ancillary:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            fds.frombytes(value[:len(value) - len(value) % fds.itemsize])
+    try:
+        return validate(recv_header(conn, data), list(fds))
+    except BaseException:
+        for fd in fds:
+            os.close(fd)
+        raise
+
+
+def recv_header(conn: socket.socket, data: bytes) -> t.Any:
+    """Receive rest of JSON header (data is the start of the request)."""
+    if len(data) < HEADER.size:
+        data += recv_exactly(conn, HEADER.size - len(data))
+    (length,) = HEADER.unpack(data)
+    if length > MAX_REQUEST:
+        raise ValueError("request too large")
+    return json.loads(recv_exactly(conn, length))
+
+
+def is_strings(value: t.Any) -> bool:
+    """Check if value is a list of strings."""
+    return isinstance(value, list) and all(isinstance(v, str) for v in value)
+
+
+def validate(header: t.Any, fds: t.List[int]) -> Request:
+    """Convert request header into Request (raise ValueError if invalid)."""
+    if not isinstance(header, dict):
+        raise ValueError("header must be an object")
+    argv, env, cwd = header.get("argv"), header.get("env"), header.get("cwd")
+    valid = is_strings(argv) and isinstance(cwd, str) \
+        and isinstance(env, dict) and is_strings([*env, *env.values()])
+    if not valid:
+        raise ValueError("invalid argv, env or cwd")
+    if len(fds) != len(STDIO):
+        raise ValueError("expected stdin, stdout and stderr fds")
+    return Request(header["argv"], header["env"], header["cwd"], fds)
+
+
+def peer_uid(conn: socket.socket) -> t.Optional[int]:
+    """Return uid of peer process, or None if the platform can't tell."""
+    option = getattr(socket, "SO_PEERCRED", None)
+    if option is None:  # pragma: no cover; not Linux
+        return None
+    data = conn.getsockopt(socket.SOL_SOCKET, option, CREDENTIALS.size)
+    return t.cast(int, CREDENTIALS.unpack(data)[1])
+
+
+def exit_status(code: t.Any) -> int:
+    """Convert SystemExit code into exit status."""
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def setup_child(request: Request) -> None:
+    """Set up stdio, env and cwd of client in child process."""
+    for target, fd in zip(STDIO, request.fds):
+        os.dup2(fd, target)
+    for fd in request.fds:
+        if fd not in STDIO:
+            os.close(fd)
+    # The server may have replaced sys.stdout, etc. (e.g. in tests).
+    sys.stdin = os.fdopen(0, "r", closefd=False)
+    sys.stdout = os.fdopen(1, "w", closefd=False)
+    sys.stderr = os.fdopen(2, "w", closefd=False)
+    os.environ.clear()
+    os.environ.update(request.env)
+    os.chdir(request.cwd)
+
+
+def serve_connection(cli: "Genbu", conn: socket.socket) -> int:
+    """Receive request, run it and send back exit status (in child).
+
+    Invalid requests, and clients that don't send their request within
+    TIMEOUT seconds, are dropped.
+    """
+    conn.settimeout(TIMEOUT)
+    try:
+        request = recv_request(conn)
+    except (OSError, EOFError, ValueError):
+        return 1
+    conn.settimeout(None)
+    status = run_child(cli, request)
+    conn.sendall(STATUS.pack(status))
+    return status
+
+
+def run_child(cli: "Genbu", request: Request) -> int:
+    """Set up client's process state, run cli and return exit status."""
+    setup_child(request)
+    sys.argv = [cli.name] + request.argv
+    try:
+        output.write(cli.run(request.argv))
+        sys.stdout.flush()
+        return 0
+    except BrokenPipeError:
+        output.silence_stdout()
+        return 1
+    except SystemExit as exc:
+        return exit_status(exc.code)
+    except Exception:  # pylint: disable=broad-except
+        traceback.print_exc()
+        return 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+
+def reap() -> None:
+    """Reap finished children without blocking."""
+    while True:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+
+
+class ForkServer:
+    """Fork server for Genbu tree."""
+    def __init__(self, cli: "Genbu", path: str):
+        self.cli = cli
+        self.path = path
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    def __enter__(self) -> "ForkServer":
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        umask = os.umask(0o177)  # Only the owner may connect
+        try:
+            self.sock.bind(self.path)
+        finally:
+            os.umask(umask)
+        os.chmod(self.path, 0o600)
+        self.sock.listen()
+        return self
+
+    def __exit__(self, *_: t.Any) -> None:
+        self.sock.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def serve_forever(self) -> None:
+        """Handle requests until the process is killed."""
+        while True:
+            self.handle()
+
+    @staticmethod
+    def is_trusted(conn: socket.socket) -> bool:
+        """Check if peer runs as the same user as the server."""
+        uid = peer_uid(conn)
+        return uid is None or uid == os.getuid()
+
+    def handle(self) -> None:
+        """Accept one connection and fork child to handle it.
+
+        The request is received by the child, so slow or invalid requests
+        don't block or crash the server.
+        """
+        try:
+            conn, _ = self.sock.accept()
+        except OSError:
+            return
+        reap()
+        with conn:
+            if not self.is_trusted(conn):
+                return
+            sys.stdout.flush()
+            sys.stderr.flush()
+            if os.fork() == 0:  # pragma: no cover; runs in child
+                status = 1
+                try:
+                    self.sock.close()
+                    status = serve_connection(self.cli, conn)
+                finally:
+                    os._exit(status)  # pylint: disable=protected-access
+
+
+def serve(cli: "Genbu", path: str) -> None:
+    """Run fork server for cli on Unix socket path."""
+    with ForkServer(cli, path) as server:
+        server.serve_forever()
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> int:
+    """Run fork server or client."""
+    args = list(sys.argv[1:] if argv is None else argv)
+    if len(args) == 3 and args[0] == "serve":
+        serve(resolve(args[1]), args[2])
+        return 0
+    if len(args) >= 2 and args[0] == "call":
+        return call(args[1], args[2:])  # Or use genbu.forkclient directly
+    print(__doc__.strip().rsplit("\n\n", 1)[-1], file=sys.stderr)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,22 +1,36 @@
 """Infer parser from type hint."""
 
+import collections
+import functools
 import sys
+import threading
 import typing as t
+import weakref
 
-from . import combinators as comb
+from . import analysis, combinators as comb
+from .converters import default_converters
 
 
-def make_optional_parser(arg: t.Any) -> comb.Parser:
+InferFunction = t.Callable[[t.Any], comb.Parser]
+
+
+def make_optional_parser(arg: t.Any,
+                         *,
+                         infer: t.Optional[InferFunction] = None,
+                         ) -> comb.Parser:
     """Return parser for t.Optional[arg]."""
-    return comb.Or(infer_parser(arg), infer_parser(type(None)))
+    infer = infer or infer_parser
+    return comb.Or(infer(arg), infer(type(None)))
 
 
-def make_union_parser(*args: t.Any) -> comb.Parser:
+def make_union_parser(*args: t.Any,
+                      infer: t.Optional[InferFunction] = None,
+                      ) -> comb.Parser:
     """Return parser for t.Union[args]."""
     if len(args) == 2 and type(None) in args:
         arg = args[0] if args[0] is not type(None) else args[1]  # noqa:E721
-        return make_optional_parser(arg)
-    return comb.Or(*map(infer_parser, args))
+        return make_optional_parser(arg, infer=infer)
+    return comb.Or(*map(infer or infer_parser, args))
 
 
 def make_literal_parser(*args: t.Any) -> comb.Parser:
@@ -24,24 +38,35 @@ def make_literal_parser(*args: t.Any) -> comb.Parser:
     return comb.Or(*map(comb.Lit, args))
 
 
-def make_list_parser(arg: t.Any) -> comb.Parser:
+def make_list_parser(arg: t.Any,
+                     *,
+                     infer: t.Optional[InferFunction] = None,
+                     ) -> comb.Parser:
     """Return parser for list[arg] and t.List[arg]."""
-    return comb.Repeat(infer_parser(arg))
+    infer = infer or infer_parser
+    return comb.Repeat(infer(arg))
 
 
-def make_dict_parser(key: t.Any, val: t.Any) -> comb.Parser:
+def make_dict_parser(key: t.Any,
+                     val: t.Any,
+                     *,
+                     infer: t.Optional[InferFunction] = None,
+                     ) -> comb.Parser:
     """Return parser for dict[key, val] and t.Dict[key, val]."""
-    return comb.Repeat(comb.And(infer_parser(key), infer_parser(val)),
-                       then=dict)
+    infer = infer or infer_parser
+    return comb.Repeat(comb.And(infer(key), infer(val)), then=dict)
 
 
-def make_tuple_parser(*args: t.Any) -> comb.Parser:
+def make_tuple_parser(*args: t.Any,
+                      infer: t.Optional[InferFunction] = None,
+                      ) -> comb.Parser:
     """Return parser for tuple[args] and t.Tuple[args]."""
+    infer = infer or infer_parser
     if args in ((), ((),)):
         return comb.Emit(())
     if len(args) == 2 and args[-1] == ...:
-        return comb.Repeat(infer_parser(args[0]), then=tuple)
-    return comb.And(*map(infer_parser, args), then=tuple)
+        return comb.Repeat(infer(args[0]), then=tuple)
+    return comb.And(*map(infer, args), then=tuple)
 
 
 def get_origin(hint: t.Any) -> t.Any:
@@ -74,24 +99,71 @@ class UnsupportedType(TypeError):
     """Unsupported type."""
 
 
-class ParserMaker:
-    """Parser maker with cache."""
-    def __init__(self) -> None:
-        self.parsers = {
+class CacheInfo(t.NamedTuple):
+    """ParserMaker cache statistics."""
+    hits: int
+    misses: int
+    maxsize: t.Optional[int]
+    currsize: int
+
+
+class ParserMaker:  # pylint: disable=too-many-instance-attributes
+    """Parser maker with cache.
+
+    If maxsize is not None, the cache evicts the least recently used parsers
+    once it holds more than maxsize entries.
+    If dispatch is True, Or parsers are replaced by analysis.Dispatch parsers
+    (same results, but fewer failed attempts), and dead alternatives are
+    reported as analysis.GrammarWarning.
+    If lazy is True, inferred Params defer conversions (see comb.lazify).
+
+    ParserMakers can be shared by threads. Cache hits don't take locks
+    unless maxsize is set (LRU order is updated), and concurrent misses of
+    the same hint return the same parser. Statistics are approximate.
+    """
+    def __init__(self,
+                 maxsize: t.Optional[int] = None,
+                 *,
+                 dispatch: bool = False,
+                 lazy: bool = False) -> None:
+        if maxsize is not None and maxsize < 0:
+            raise ValueError(maxsize)
+
+        self.maxsize = maxsize
+        self.dispatch = dispatch
+        self.lazy = lazy
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.pinned: t.Dict[t.Any, comb.Parser] = {
             None: comb.Emit(None),
             bool: comb.Bool(),
             type(None): comb.Emit(None),
         }
-        self.parser_makers = {
-            dict: make_dict_parser,
-            list: make_list_parser,
+        self.parsers: t.Dict[t.Any, comb.Parser] = collections.OrderedDict()
+        self.hints: t.MutableMapping[comb.Parser, t.Any] = \
+            weakref.WeakKeyDictionary(
+                {p: h for h, p in self.pinned.items()},
+            )
+        self.registry: t.Dict[type, t.Callable[[t.Any], comb.Parser]] = \
+            default_converters()
+        make_dict = functools.partial(make_dict_parser,
+                                      infer=self.infer_parser)
+        make_list = functools.partial(make_list_parser,
+                                      infer=self.infer_parser)
+        make_tuple = functools.partial(make_tuple_parser,
+                                       infer=self.infer_parser)
+        self.parser_makers: t.Dict[t.Any, t.Callable[..., comb.Parser]] = {
+            dict: make_dict,
+            list: make_list,
             t.ClassVar: self.infer_parser,
-            t.Dict: make_dict_parser,
-            t.List: make_list_parser,
-            t.Tuple: make_tuple_parser,
+            t.Dict: make_dict,
+            t.List: make_list,
+            t.Tuple: make_tuple,
             t.Type: self.infer_parser,
-            t.Union: make_union_parser,
-            tuple: make_tuple_parser,
+            t.Union: functools.partial(make_union_parser,
+                                       infer=self.infer_parser),
+            tuple: make_tuple,
             type: self.infer_parser,
         }
         if sys.version_info >= (3, 8):
@@ -99,10 +171,78 @@ class ParserMaker:
                 t.Final: self.infer_parser,  # pylint: disable=no-member
             })
 
+    def cache_info(self) -> CacheInfo:
+        """Return cache statistics."""
+        return CacheInfo(self.hits, self.misses, self.maxsize,
+                         len(self.parsers))
+
+    def cache_clear(self) -> None:
+        """Clear cache and statistics."""
+        with self.lock:
+            self.parsers.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def register(self,
+                 cls: type,
+                 make_parser: t.Callable[[t.Any], comb.Parser],
+                 ) -> None:
+        """Register parser maker for cls and its subclasses.
+
+        make_parser gets called with the type hint (cls or a subclass).
+        Registered types take precedence over the default One(cls) parser.
+        Subclasses use the maker of the closest registered base class.
+        """
+        with self.lock:
+            self.registry[cls] = make_parser
+            self.evict_subclasses(cls)
+
+    def unregister(self, cls: type) -> None:
+        """Remove registered parser maker for cls."""
+        with self.lock:
+            del self.registry[cls]
+            self.evict_subclasses(cls)
+
+    def evict_subclasses(self, cls: type) -> None:
+        """Remove cached parsers of cls and its subclasses (needs lock)."""
+        for hint in [h for h in self.parsers if issubclass(h, cls)]:
+            del self.parsers[hint]
+
+    def make_class_parser(self, hint: type) -> comb.Parser:
+        """Make parser for class using the registry."""
+        for base in hint.__mro__:
+            make_parser = self.registry.get(base)
+            if make_parser is not None:
+                return make_parser(hint)
+        return comb.One(hint)
+
     def cache(self, hint: t.Any, parser: comb.Parser) -> comb.Parser:
-        """Cache and return parser."""
+        """Cache and return parser.
+
+        If another thread cached a parser for hint first, return that parser.
+        hints maps parsers to their type hints even after they're evicted
+        (e.g. for genbu.schema).
+        """
         assert get_origin(hint) is None
-        self.parsers[hint] = parser
+        with self.lock:
+            if self.maxsize != 0:
+                parser = self.parsers.setdefault(hint, parser)
+            if self.maxsize and len(self.parsers) > self.maxsize:
+                t.cast(t.Any, self.parsers).popitem(last=False)
+            self.hints[parser] = hint
+        return parser
+
+    def lookup(self, hint: t.Any) -> t.Optional[comb.Parser]:
+        """Return cached parser for hint or None, and update statistics."""
+        parser = self.pinned.get(hint) or self.parsers.get(hint)
+        if parser is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if self.maxsize is not None:
+            with self.lock:
+                if hint in self.parsers:
+                    t.cast(t.Any, self.parsers).move_to_end(hint)
         return parser
 
     def infer_parser(self, hint: t.Any) -> comb.Parser:
@@ -112,11 +252,13 @@ class ParserMaker:
         result. Don't cache types with parameters, because it doesn't work with
         Union and possibly other types.
         """
-        parser = self.parsers.get(hint)
-        if parser is not None:
-            return parser
+        if hint is None:
+            return self.pinned[None]
         if isinstance(hint, type) and not is_generic_alias(hint):
-            return self.cache(hint, comb.One(hint))
+            parser = self.lookup(hint)
+            if parser is not None:
+                return parser
+            return self.cache(hint, self.finish(self.make_class_parser(hint)))
 
         origin, args = destructure(hint)
         if (
@@ -129,12 +271,25 @@ class ParserMaker:
             and origin is t.Literal  # pylint: disable=no-member
             and len(args) > 0
         ):
-            return make_literal_parser(*args)
+            return self.finish(make_literal_parser(*args))
 
         maker = self.parser_makers.get(origin)
         if maker is not None:
-            return maker(*args)  # type: ignore
+            return self.finish(maker(*args))
         raise UnsupportedType(hint)
 
+    def finish(self, parser: comb.Parser) -> comb.Parser:
+        """Turn Or parser into Dispatch parser if self.dispatch is set.
+
+        Sub-parsers were made by infer_parser, so they're already finished.
+        """
+        if not self.dispatch or not isinstance(parser, comb.Or):
+            return parser
+        result = analysis.Dispatch(*parser.parsers)
+        analysis.warn(result.dead)
+        return result
+
 
-infer_parser = ParserMaker().infer_parser
+default_parser_maker = ParserMaker()
+infer_parser = default_parser_maker.infer_parser
+register = default_parser_maker.register
@@ -5,7 +5,11 @@ import typing as t
 
 from . import combinators as comb
 from .params import Param
-from .infer import infer_parser
+from .infer import ParserMaker, default_parser_maker
+from .records import Record, get_record
+
+
+Overrides = t.Mapping[str, Param]
 
 
 class UnsupportedCallback(ValueError):
@@ -15,10 +19,19 @@ class UnsupportedCallback(ValueError):
         self.callback = callback
 
 
-def infer_parser_from_parameter(parameter: inspect.Parameter) -> comb.Parser:
+def infer_param_parser(hint: t.Any, parser_maker: ParserMaker) -> comb.Parser:
+    """Infer Param parser from type hint (lazy if parser_maker is lazy)."""
+    parser = parser_maker.infer_parser(hint)
+    return comb.lazify(parser) if parser_maker.lazy else parser
+
+
+def infer_parser_from_parameter(parameter: inspect.Parameter,
+                                parser_maker: t.Optional[ParserMaker] = None,
+                                ) -> comb.Parser:
     """Infer parser from signature.
 
     Handles var arguments and unannotated parameters.
+    Uses the default ParserMaker if parser_maker is None.
     Throws UnsupportedType.
     """
     hint: t.Any = str
@@ -28,14 +41,37 @@ def infer_parser_from_parameter(parameter: inspect.Parameter) -> comb.Parser:
         hint = t.Tuple[hint, ...]
     elif parameter.kind == parameter.VAR_KEYWORD:
         hint = t.Dict[str, hint]
-    return infer_parser(hint)
+    return infer_param_parser(hint, parser_maker or default_parser_maker)
+
+
+def infer_record_params(parameter: inspect.Parameter,
+                        record: Record,
+                        parser_maker: ParserMaker,
+                        overrides: Overrides,
+                        ) -> t.List[Param]:
+    """Infer one Param per leaf field of record (or use its override)."""
+    params = []
+    for leaf in record.leaves:
+        dest = f"{parameter.name}.{leaf.path}"
+        params.append(overrides.get(dest) or Param(
+            dest=dest,
+            optargs=[f"--{dest}"],
+            parser=infer_param_parser(leaf.hint, parser_maker),
+        ))
+    return params
 
 
 def infer_params_from_signature(function: t.Callable[..., t.Any],
+                                parser_maker: t.Optional[ParserMaker] = None,
+                                overrides: t.Optional[Overrides] = None,
                                 ) -> t.List[Param]:
     """Infer Genbu Params from function signature.
 
     Creates named options by default.
+    Parameters annotated with a dataclass, NamedTuple or TypedDict get
+    expanded into one option per field (e.g. --db.host).
+    Parameters (and record fields) whose dest is in overrides are replaced
+    by the override Params, without inferring their parsers.
     Throws UnsupportedCallback or UnsupportedType.
     """
     try:
@@ -43,11 +79,27 @@ def infer_params_from_signature(function: t.Callable[..., t.Any],
     except (TypeError, ValueError) as exc:
         raise UnsupportedCallback(function) from exc
 
-    return [
-        Param(
-            dest=p.name,
-            optargs=[f"--{p.name}"],
-            parser=infer_parser_from_parameter(p),
-        )
-        for p in signature.parameters.values()
-    ]
+    overrides = overrides or {}
+    params = []
+    for parameter in signature.parameters.values():
+        if parameter.name in overrides:
+            params.append(overrides[parameter.name])
+            continue
+        record = None
+        if parameter.kind not in (parameter.VAR_POSITIONAL,
+                                  parameter.VAR_KEYWORD):
+            record = get_record(parameter.annotation)
+        if record is None:
+            params.append(Param(
+                dest=parameter.name,
+                optargs=[f"--{parameter.name}"],
+                parser=infer_parser_from_parameter(parameter, parser_maker),
+            ))
+        else:
+            params.extend(infer_record_params(
+                parameter,
+                record,
+                parser_maker or default_parser_maker,
+                overrides,
+            ))
+    return params
@@ -1,16 +1,28 @@
 """Normalize CLI inputs."""
 
+import collections
+import re
+import types
 import typing as t
 
+from .analysis import arity
 from .exceptions import CLError
 from .params import Param
 
 
+NEGATIVE_NUMBER = re.compile(r"^-\d+$|^-\d*\.\d+$")
+
+
 class UnknownOption(CLError):
-    """Unrecognized option."""
-    def __init__(self, option: str):
+    """Unrecognized option (or command).
+
+    suggestions contains similar options or commands (see genbu.suggest).
+    """
+    def __init__(self, option: str,
+                 suggestions: t.Optional[t.List[str]] = None):
         super().__init__()
         self.option = option
+        self.suggestions = suggestions or []
 
     def __str__(self) -> str:
         return f"received unrecognized option: {self.option}"
@@ -55,7 +67,57 @@ class Argv:
             self.current = []
 
 
-def complete(options: t.Dict[str, Param], prefix: str) -> str:
+class OptionTable:  # pylint: disable=too-few-public-methods
+    """Precomputed option lookup table.
+
+    short maps short option names (without "-") to True if the option takes
+    arguments, or to False if it's a flag (i.e. its parser consumes no
+    tokens). optional contains short options whose arguments are optional
+    (e.g. Or(One(int), Emit(0))), so they can also be stacked like flags.
+    Negative numbers (e.g. -5) are treated as arguments, unless an option
+    looks like a negative number.
+    Lookups fall back to the inherited table, whose options take precedence
+    (the inherited table isn't copied).
+    The tables are read-only, so they can be shared by parsing threads.
+    """
+    def __init__(self,
+                 params: t.Iterable[Param],
+                 inherited: t.Optional["OptionTable"] = None):
+        options = {
+            o: p for p in params for o in p.optargs if o.startswith("-")
+        }
+        arities = {
+            o[1]: arity(p.parser)
+            for o, p in options.items()
+            if len(o) == 2 and o != "--"
+        }
+        short = {o: a.maximum != 0 for o, a in arities.items()}
+        self.optional = frozenset(
+            o for o, a in arities.items() if a.minimum == 0 != a.maximum
+        )
+        self.numeric_options = any(map(NEGATIVE_NUMBER.match, options))
+        self.options: t.Mapping[str, Param] = types.MappingProxyType(options)
+        self.short: t.Mapping[str, bool] = types.MappingProxyType(short)
+        if inherited is not None:
+            # ChainMap only reads the inherited (read-only) mappings
+            self.options = types.MappingProxyType(collections.ChainMap(
+                t.cast(t.Dict[str, Param], inherited.options), options,
+            ))
+            self.short = types.MappingProxyType(collections.ChainMap(
+                t.cast(t.Dict[str, bool], inherited.short), short,
+            ))
+            self.optional |= inherited.optional
+            self.numeric_options |= inherited.numeric_options
+
+    def is_argument(self, token: str) -> bool:
+        """Check if short option-like token should be treated as argument."""
+        return token == "-" or (
+            not self.numeric_options
+            and NEGATIVE_NUMBER.match(token) is not None
+        )
+
+
+def complete(options: t.Mapping[str, Param], prefix: str) -> str:
     """Complete long option prefix.
 
     Raise error if prefix is invalid or ambiguous.
@@ -69,14 +131,8 @@ def complete(options: t.Dict[str, Param], prefix: str) -> str:
     return candidates[0]
 
 
-def is_stacked(options: t.Container[str], opts: str) -> bool:
-    """Check if short options in opts are all valid."""
-    assert opts.startswith("-")
-    return all(f"-{opt}" in options for opt in opts[1:])
-
-
 def _handle_long_option(normalized: Argv,
-                        options: t.Dict[str, Param],
+                        options: t.Mapping[str, Param],
                         token: str,
                         ) -> None:
     """Handle long option token from argv."""
@@ -89,43 +145,76 @@ def _handle_long_option(normalized: Argv,
         normalized.flush()
 
 
+def _split_short_options(table: OptionTable,
+                         token: str,
+                         ) -> t.Tuple[t.List[str], t.Optional[str]]:
+    """Split short option token into options and attached argument.
+
+    Scans token once: flags may be stacked, and the first option that takes
+    arguments ends the stack, unless its arguments are optional and the next
+    character is also a short option. The rest of the token (without a
+    leading "=") is an argument of the last option.
+    """
+    options = []
+    index = 1
+    while index < len(token):
+        option = token[index]
+        takes_args = table.short.get(option)
+        if takes_args is None:
+            break
+        options.append(f"-{option}")
+        index += 1
+        if takes_args and not (option in table.optional
+                               and token[index:index + 1] in table.short):
+            break
+
+    if not options:
+        raise UnknownOption(token.split("=", 1)[0])
+    rest = token[index:]
+    if not rest:
+        return options, None
+    return options, rest[1:] if rest.startswith("=") else rest
+
+
 def _handle_short_option(normalized: Argv,
-                         options: t.Dict[str, Param],
+                         table: OptionTable,
                          token: str,
                          ) -> None:
     """Handle short option token from argv."""
-    if "=" in token:
-        option, arg = token.split("=", 1)
-        if option not in options:
-            raise UnknownOption(option)
+    if token in table.options:
+        normalized.add_opt(token)
+        return
+    if table.is_argument(token):
+        normalized.add_arg(token)
+        return
+
+    options, arg = _split_short_options(table, token)
+    for option in options:
         normalized.add_opt(option)
+    if arg is not None:
         normalized.add_arg(arg)
         normalized.flush()
-    elif token in options:
-        normalized.add_opt(token)
-    elif is_stacked(options, token):
-        for opt in token[1:]:
-            normalized.add_opt(f"-{opt}")
-        normalized.flush()
-    elif token[:2] in options:
-        normalized.add_opt(token[:2])
-        arg = token[2:]
-        normalized.add_arg(arg if not arg.startswith("=") else arg[1:])
+    elif not table.short[options[-1][1]]:
         normalized.flush()
-    else:
-        raise UnknownOption(token)
 
 
-def normalize(params: t.Iterable[Param], argv: t.Iterable[str]) -> Argv:
-    """Normalize argv."""
-    options = {o: p for p in params for o in p.optargs if o.startswith("-")}
+def normalize(params: t.Iterable[Param],
+              argv: t.Iterable[str],
+              table: t.Optional[OptionTable] = None,
+              ) -> Argv:
+    """Normalize argv.
+
+    Pass a precomputed OptionTable of params to avoid rebuilding it.
+    """
+    if table is None:
+        table = OptionTable(params)
     normalized = Argv()
 
     for token in argv:
         if token.startswith("--"):
-            _handle_long_option(normalized, options, token)
+            _handle_long_option(normalized, table.options, token)
         elif token.startswith("-"):
-            _handle_short_option(normalized, options, token)
+            _handle_short_option(normalized, table, token)
         else:
             normalized.add_arg(token)
 
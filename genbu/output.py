@@ -0,0 +1,212 @@
+"""Write callback results to stdout.
+
+Iterators (e.g. generators) are streamed one item per line, and open files
+are copied in chunks (using os.sendfile if possible), so large outputs
+don't have to fit in memory. Small writes are joined into BUFSIZE chunks.
+"""
+
+import errno
+import io
+import json
+import os
+import shutil
+import stat
+import sys
+import typing as t
+
+
+BUFSIZE = 1 << 16
+BINARY = (bytes, bytearray, memoryview)
+SENDFILE_ERRORS = (
+    errno.EINVAL, errno.ENOSYS, errno.ENOTSOCK, errno.EOPNOTSUPP,
+)
+
+
+def is_file(value: t.Any) -> bool:
+    """Check if value is a file-like object."""
+    return callable(getattr(value, "read", None))
+
+
+def is_stream(value: t.Any) -> bool:
+    """Check if value is an iterator (but not a file) that gets streamed."""
+    return isinstance(value, t.Iterator) and not is_file(value)
+
+
+def binary(stream: t.IO[t.Any]) -> t.Optional[t.BinaryIO]:
+    """Return binary stream for writing to stream (or None)."""
+    if not isinstance(stream, io.TextIOBase):
+        return t.cast(t.BinaryIO, stream)
+    buffer = getattr(stream, "buffer", None)
+    if buffer is not None:
+        stream.flush()
+    return t.cast(t.Optional[t.BinaryIO], buffer)
+
+
+def write_bytes(data: t.Any, stream: t.IO[t.Any]) -> None:
+    """Write bytes-like data as is (or decoded if stream has no buffer)."""
+    out = binary(stream)
+    if out is None:
+        stream.write(bytes(data).decode(errors="replace"))
+    else:
+        out.write(data)
+
+
+def write_chunks(chunks: t.Iterable[t.Any], stream: t.IO[t.Any]) -> None:
+    """Write strings and bytes-like chunks using large buffered writes."""
+    buffer: t.List[str] = []
+    size = 0
+    for chunk in chunks:
+        if isinstance(chunk, BINARY):
+            stream.write("".join(buffer))
+            buffer, size = [], 0
+            write_bytes(chunk, stream)
+            continue
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= BUFSIZE:
+            stream.write("".join(buffer))
+            buffer, size = [], 0
+    stream.write("".join(buffer))
+
+
+def sendfile(source: t.Any, target: t.BinaryIO) -> bool:
+    """Copy regular file to target with os.sendfile.
+
+    Return False if sendfile can't be used.
+    """
+    try:
+        infd, outfd = source.fileno(), target.fileno()
+        status = os.fstat(infd)
+        start = source.tell()
+    except (AttributeError, OSError, ValueError):
+        return False
+    if not hasattr(os, "sendfile") or not stat.S_ISREG(status.st_mode):
+        return False
+
+    target.flush()
+    offset = send(outfd, infd, start, status.st_size)
+    if offset is None:
+        return False
+    source.seek(offset)
+    return True
+
+
+def send(outfd: int, infd: int, offset: int, size: int) -> t.Optional[int]:
+    """Send bytes from offset to size with os.sendfile.
+
+    Return offset after the last byte sent, or None if the file descriptors
+    don't support sendfile.
+    """
+    start = offset
+    while offset < size:
+        try:
+            sent = os.sendfile(outfd, infd, offset, size - offset)
+        except OSError as exc:
+            if offset == start and exc.errno in SENDFILE_ERRORS:
+                return None
+            raise
+        if sent == 0:
+            break
+        offset += sent
+    return offset
+
+
+def copy_file(file: t.Any, stream: t.IO[t.Any]) -> None:
+    """Copy rest of file to stream and close the file."""
+    with file:
+        if isinstance(file.read(0), str):
+            shutil.copyfileobj(file, stream, BUFSIZE)
+            return
+        out = binary(stream)
+        if out is None or not sendfile(file, out):
+            write_chunks(iter(lambda: file.read(BUFSIZE), b""), stream)
+
+
+def lines(items: t.Iterable[t.Any]) -> t.Iterator[t.Any]:
+    """Turn items into lines (bytes-like items are passed as is)."""
+    for item in items:
+        yield item if isinstance(item, BINARY) else f"{item}\n"
+
+
+def to_json(value: t.Any) -> t.Any:
+    """Convert value that json doesn't support."""
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    return str(value)
+
+
+def dumps(value: t.Any) -> str:
+    """Serialize value as compact JSON."""
+    return json.dumps(value, default=to_json, separators=(",", ":"))
+
+
+def json_chunks(result: t.Any) -> t.Iterator[str]:
+    """Serialize result as JSON (iterators become arrays)."""
+    if not is_stream(result):
+        yield dumps(result) + "\n"
+        return
+    yield "["
+    for index, item in enumerate(result):
+        yield ("," if index else "") + dumps(item)
+    yield "]\n"
+
+
+def ndjson_chunks(result: t.Any) -> t.Iterator[str]:
+    """Serialize result as newline-delimited JSON (one line per item)."""
+    items = result if is_stream(result) or isinstance(result, list) \
+        else [result]
+    return (dumps(item) + "\n" for item in items)
+
+
+def write_text(result: t.Any, stream: t.IO[t.Any]) -> None:
+    """Write result as text (see write)."""
+    if is_file(result):
+        copy_file(result, stream)
+    elif is_stream(result):
+        write_chunks(lines(result), stream)
+    elif isinstance(result, BINARY):
+        write_bytes(result, stream)
+    elif result is not None:
+        stream.write(f"{result}\n")
+
+
+SERIALIZERS: t.Dict[str, t.Callable[[t.Any], t.Iterator[str]]] = {
+    "json": json_chunks,
+    "ndjson": ndjson_chunks,
+}
+
+
+def check_format(output: str) -> None:
+    """Raise ValueError if output isn't "text" or a serializer name."""
+    if output != "text" and output not in SERIALIZERS:
+        raise ValueError(output)
+
+
+def write(result: t.Any,
+          stream: t.Optional[t.IO[t.Any]] = None,
+          output: str = "text",
+          ) -> None:
+    """Write callback result to stream (default: sys.stdout).
+
+    With output="text", None isn't written, bytes-like objects are written
+    as is, files are copied (and closed), iterators are written one item
+    per line, and other values are printed. With output="json" or
+    output="ndjson", results are serialized as JSON (iterators are
+    streamed as arrays or one item per line).
+    """
+    check_format(output)
+    stream = stream if stream is not None else sys.stdout
+    if output == "text":
+        write_text(result, stream)
+    else:
+        write_chunks(SERIALIZERS[output](result), stream)
+
+
+def silence_stdout() -> None:
+    """Redirect stdout to devnull (e.g. after BrokenPipeError).
+
+    Python would otherwise fail again when it flushes stdout at exit.
+    """
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, sys.stdout.fileno())
+    os.close(devnull)
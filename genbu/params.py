@@ -19,15 +19,23 @@ def default_aggregator(values: t.Sequence[t.Any]) -> t.Any:
     return values[-1]
 
 
-class Param:  # pylint: disable=too-many-arguments
-    """CLI parameter descriptor."""
+class Param:  # pylint: disable=too-many-arguments,too-many-instance-attributes
+    """CLI parameter descriptor.
+
+    If the Param doesn't appear in argv, its value is taken from the first
+    set environment variable in env, or else from config_key (dotted path)
+    in the Genbu config files.
+    """
     def __init__(self,
                  dest: str,
                  optargs: t.Optional[t.List[str]] = None,
                  parser: comb.Parser = comb.One(str),
                  aggregator: Aggregator = default_aggregator,
                  description: t.Optional[str] = None,
-                 arg_description: t.Optional[str] = None):
+                 arg_description: t.Optional[str] = None,
+                 *,
+                 env: t.Optional[t.List[str]] = None,
+                 config_key: t.Optional[str] = None):
         if optargs is None:
             optargs = [dest]
         for optarg in optargs:
@@ -40,6 +48,8 @@ class Param:  # pylint: disable=too-many-arguments
         self.aggregator = aggregator
         self.description = description
         self.arg_description = arg_description
+        self.env = env
+        self.config_key = config_key
 
     def __eq__(self, other: object) -> bool:
         return self.dest == other.dest if isinstance(other, Param) else False
@@ -0,0 +1,242 @@
+"""Flatten dataclasses, NamedTuples and TypedDicts into dotted options."""
+
+import functools
+import inspect
+import threading
+import typing as t
+
+from .exceptions import MissingArgument
+from .infer import UnsupportedType
+
+try:
+    import dataclasses
+except ImportError:  # pragma: no cover; python 3.6
+    dataclasses = None  # type: ignore
+
+
+EMPTY: t.Any = inspect.Parameter.empty
+PENDING = threading.local()  # Records being built by the current thread
+
+
+class Field(t.NamedTuple):
+    """Record field descriptor.
+
+    If default_factory is not None, it's used to construct the default value.
+    """
+    name: str
+    hint: t.Any
+    default: t.Any = EMPTY
+    default_factory: t.Optional[t.Callable[[], t.Any]] = None
+    record: t.Optional["Record"] = None
+    optional: bool = False
+
+
+class Leaf(t.NamedTuple):
+    """Flattened (non-record) field."""
+    path: str
+    hint: t.Any
+
+
+def get_hints(cls: type) -> t.Dict[str, t.Any]:
+    """Return resolved type hints of cls, or raw annotations on failure."""
+    try:
+        return t.get_type_hints(cls)
+    except Exception:  # pylint: disable=broad-except
+        return dict(getattr(cls, "__annotations__", {}))
+
+
+def is_dataclass(hint: t.Any) -> bool:
+    """Check if hint is a dataclass type."""
+    return dataclasses is not None and isinstance(hint, type) \
+        and dataclasses.is_dataclass(hint)
+
+
+def is_namedtuple(hint: t.Any) -> bool:
+    """Check if hint is a NamedTuple (or namedtuple) type."""
+    return isinstance(hint, type) and issubclass(hint, tuple) \
+        and hasattr(hint, "_fields")
+
+
+def is_typeddict(hint: t.Any) -> bool:
+    """Check if hint is a TypedDict type."""
+    return isinstance(hint, type) and issubclass(hint, dict) \
+        and hasattr(hint, "__total__")
+
+
+def dataclass_fields(cls: type) -> t.List[Field]:
+    """Return dataclass fields (only fields that __init__ takes)."""
+    assert dataclasses is not None
+    hints = get_hints(cls)
+    result = []
+    for field in dataclasses.fields(cls):
+        if not field.init:
+            continue
+        factory = None
+        if field.default_factory is not dataclasses.MISSING:
+            factory = field.default_factory
+        default = EMPTY
+        if field.default is not dataclasses.MISSING:
+            default = field.default
+        result.append(Field(field.name, hints.get(field.name, field.type),
+                            default, factory))
+    return result
+
+
+def namedtuple_fields(cls: type) -> t.List[Field]:
+    """Return NamedTuple fields."""
+    hints = get_hints(cls)
+    defaults = getattr(cls, "_field_defaults", {})
+    return [
+        Field(name, hints.get(name, str), defaults.get(name, EMPTY))
+        for name in getattr(cls, "_fields")
+    ]
+
+
+def typeddict_fields(cls: type) -> t.List[Field]:
+    """Return TypedDict fields.
+
+    Keys that aren't required are omitted from the dict if not set.
+    """
+    hints = get_hints(cls)
+    total = getattr(cls, "__total__", True)
+    required = getattr(cls, "__required_keys__", hints if total else ())
+    return [
+        Field(name, hint, optional=name not in required)
+        for name, hint in hints.items()
+    ]
+
+
+class Record:
+    """Precomputed field table of a dataclass, NamedTuple or TypedDict."""
+    def __init__(self, cls: type):
+        self.cls = cls
+        if is_dataclass(cls):
+            fields = dataclass_fields(cls)
+        elif is_namedtuple(cls):
+            fields = namedtuple_fields(cls)
+        else:
+            assert is_typeddict(cls)
+            fields = typeddict_fields(cls)
+
+        self.fields = [
+            f._replace(record=get_record(f.hint)) for f in fields
+        ]
+        self.leaves: t.List[Leaf] = []
+        for field in self.fields:
+            if field.record is None:
+                self.leaves.append(Leaf(field.name, field.hint))
+            else:
+                self.leaves.extend(
+                    Leaf(f"{field.name}.{leaf.path}", leaf.hint)
+                    for leaf in field.record.leaves
+                )
+
+    def is_set(self, values: t.Mapping[str, t.Any], prefix: str) -> bool:
+        """Check if any of the record leaves is in values."""
+        return any(f"{prefix}.{leaf.path}" in values for leaf in self.leaves)
+
+    def check(self,
+              values: t.Mapping[str, t.Any],
+              prefix: str,
+              has_base: bool = False,
+              ) -> None:
+        """Check that required leaves are in values without building record.
+
+        If has_base is True, unset fields are taken from a default instance.
+        Raise MissingArgument if a required field is missing.
+        """
+        for field in self.fields:
+            key = f"{prefix}.{field.name}"
+            has_default = has_base or field.optional or \
+                field.default is not EMPTY or field.default_factory is not None
+            if field.record is not None and (
+                field.record.is_set(values, key) or not has_default
+            ):
+                field.record.check(values, key, has_default)
+            elif key not in values and not has_default:
+                raise MissingArgument(key)
+
+    def build(self,
+              values: t.Mapping[str, t.Any],
+              prefix: str,
+              base: t.Any = EMPTY,
+              ) -> t.Any:
+        """Construct record from flattened values.
+
+        Keys in values are dotted paths that start with prefix. Fields that
+        aren't set are taken from base (a default instance) if it's given.
+        Raise MissingArgument if a required field is missing.
+        """
+        kwargs = {}
+        for field in self.fields:
+            value = self.get_value(field, values, f"{prefix}.{field.name}",
+                                   self.base_value(base, field.name))
+            if value is not EMPTY:
+                kwargs[field.name] = value
+        return self.cls(**kwargs)
+
+    @staticmethod
+    def base_value(base: t.Any, name: str) -> t.Any:
+        """Return field of default instance (EMPTY if there's none)."""
+        if isinstance(base, dict):
+            return base.get(name, EMPTY)
+        return getattr(base, name, EMPTY)
+
+    @staticmethod
+    def get_value(field: Field,
+                  values: t.Mapping[str, t.Any],
+                  key: str,
+                  base: t.Any = EMPTY,
+                  ) -> t.Any:
+        """Return field value (EMPTY if optional and not set).
+
+        Partially set records are merged into base or the field's default.
+        """
+        if field.record is not None and field.record.is_set(values, key):
+            return field.record.build(values, key,
+                                      default_value(field, base))
+        if key in values:
+            return values[key]
+        value = default_value(field, base)
+        if value is not EMPTY:
+            return value
+        if field.record is not None:
+            return field.record.build(values, key)
+        if not field.optional:
+            raise MissingArgument(key)
+        return EMPTY
+
+
+def default_value(field: Field, base: t.Any = EMPTY) -> t.Any:
+    """Return base, or default value of field (EMPTY if there's none)."""
+    if base is not EMPTY:
+        return base
+    if field.default_factory is not None:
+        return field.default_factory()
+    return field.default
+
+
+@functools.lru_cache(maxsize=None)
+def _get_record(hint: t.Any) -> t.Optional[Record]:
+    if not (is_dataclass(hint) or is_namedtuple(hint) or is_typeddict(hint)):
+        return None
+    pending = PENDING.__dict__.setdefault("types", set())
+    if hint in pending:
+        raise UnsupportedType(hint)  # Self-referential records can't be flat
+    pending.add(hint)
+    try:
+        return Record(hint)
+    finally:
+        pending.discard(hint)
+
+
+def get_record(hint: t.Any) -> t.Optional[Record]:
+    """Return (cached) Record of type hint, or None if it isn't a record.
+
+    Raise UnsupportedType if the record contains itself.
+    """
+    try:
+        hash(hint)
+    except TypeError:
+        return None
+    return _get_record(hint)
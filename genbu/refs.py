@@ -0,0 +1,43 @@
+"""Import objects by reference ("module:qualname")."""
+
+import enum
+import importlib
+import typing as t
+
+
+def resolve(ref: str) -> t.Any:
+    """Import object from reference (e.g. "examples.cat:cli").
+
+    qualname may be dotted (e.g. "package.module:Class.attribute").
+    """
+    module_name, sep, qualname = ref.partition(":")
+    if not sep or not module_name or not qualname:
+        raise ValueError(f"invalid reference: {ref!r}")
+    obj: t.Any = importlib.import_module(module_name)
+    for name in qualname.split("."):
+        obj = getattr(obj, name)
+    return obj
+
+
+def reference(obj: t.Any) -> t.Optional[str]:
+    """Return reference that resolves to obj, or None if there isn't one.
+
+    Module-level functions and classes (and their attributes), and enum
+    members have references. Lambdas and local functions don't.
+    """
+    module: t.Optional[str]
+    qualname: t.Optional[str]
+    if isinstance(obj, enum.Enum):
+        owner = type(obj)
+        module = owner.__module__
+        qualname = f"{owner.__qualname__}.{obj.name}"
+    else:
+        module = getattr(obj, "__module__", None)
+        qualname = getattr(obj, "__qualname__", None)
+    if not module or not qualname or "<" in qualname:
+        return None
+    ref = f"{module}:{qualname}"
+    try:
+        return ref if resolve(ref) is obj else None
+    except (ImportError, AttributeError):
+        return None
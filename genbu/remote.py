@@ -0,0 +1,117 @@
+"""Run Genbu commands in worker processes.
+
+Workers rebuild the Genbu tree once (from a "module:attr" reference or from
+a schema exported with refs=True), so only argv and results get pickled.
+"""
+
+import concurrent.futures
+import typing as t
+
+from . import refs, schema
+from .cli import Genbu
+
+
+Definition = t.Union[str, t.Dict[str, t.Any]]
+
+WORKER: t.Optional[Genbu] = None  # Genbu tree of the current worker process
+
+
+def definition(cli: t.Union[Genbu, Definition]) -> Definition:
+    """Return picklable definition of Genbu tree.
+
+    Genbu objects are exported as schemas with references (see
+    schema.export).
+    """
+    if not isinstance(cli, Genbu):
+        return cli
+    return schema.export(cli, refs=True)
+
+
+def build(cli: Definition) -> Genbu:
+    """Build Genbu tree from definition."""
+    if isinstance(cli, str):
+        result = refs.resolve(cli)
+        if not isinstance(result, Genbu):
+            raise TypeError(f"not a Genbu object: {cli!r}")
+        return result
+    return schema.load(cli)
+
+
+def initialize(cli: Definition) -> None:
+    """Build Genbu tree of worker process."""
+    global WORKER  # pylint: disable=global-statement
+    WORKER = build(cli)
+
+
+def run(argv: t.Sequence[str]) -> t.Any:
+    """Run Genbu tree of worker process."""
+    assert WORKER is not None
+    return WORKER.run(argv)
+
+
+def run_many(argvs: t.Sequence[t.Sequence[str]]) -> t.List[t.Any]:
+    """Run Genbu tree of worker process on a batch of argv."""
+    return [run(argv) for argv in argvs]
+
+
+class Remote:
+    """Run Genbu commands in a process pool.
+
+    cli can be a Genbu object (exported as schema with references), a
+    reference to one (e.g. "examples.cat:cli") or an exported schema.
+    Genbu trees that use custom ParserMakers must be passed by reference.
+    Callback results must be picklable. Errors raised in workers (including
+    SystemExit from error handlers) are raised again by run and map.
+    """
+    def __init__(self,
+                 cli: t.Union[Genbu, Definition],
+                 processes: t.Optional[int] = None,
+                 **kwargs: t.Any):
+        """kwargs are passed to concurrent.futures.ProcessPoolExecutor."""
+        self.definition = definition(cli)
+        self.executor = concurrent.futures.ProcessPoolExecutor(
+            processes,
+            initializer=initialize,
+            initargs=(self.definition,),
+            **kwargs,
+        )
+
+    def submit(self,
+               argv: t.Sequence[str],
+               ) -> "concurrent.futures.Future[t.Any]":
+        """Schedule command and return future result."""
+        return self.executor.submit(run, list(argv))
+
+    def run(self, argv: t.Sequence[str]) -> t.Any:
+        """Run command in worker process and return result."""
+        return self.submit(argv).result()
+
+    def map(self,
+            argvs: t.Iterable[t.Sequence[str]],
+            chunksize: int = 1,
+            ) -> t.Iterator[t.Any]:
+        """Run commands in worker processes and yield results in order.
+
+        Batches of chunksize commands are sent to workers at a time.
+        """
+        batch: t.List[t.List[str]] = []
+        batches = []
+        for argv in argvs:
+            batch.append(list(argv))
+            if len(batch) >= chunksize:
+                batches.append(batch)
+                batch = []
+        if batch:
+            batches.append(batch)
+        for results in self.executor.map(run_many, batches):
+            yield from results
+
+    def close(self) -> None:
+        """Shut down worker processes."""
+        self.executor.shutdown()
+
+    def __enter__(self) -> "Remote":
+        return self
+
+    def __exit__(self, *_: t.Any) -> None:
+        self.close()
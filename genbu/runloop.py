@@ -0,0 +1,256 @@
+"""Run one command per input line in a single process.
+
+Each line is split with shlex and run by the same Genbu tree, optionally
+on a thread or process pool. Results are written in input order, and
+errors become per-line records instead of exiting. Blank lines and
+comments (#) are skipped.
+
+Usage:
+    python -m genbu.runloop MODULE:ATTR [FILE] [-j JOBS] [--processes]
+                            [-o text|ndjson]
+"""
+
+import collections
+import concurrent.futures
+import functools
+import itertools
+import re
+import shlex
+import sys
+import typing as t
+
+from . import combinators as comb, output, remote
+from .cli import Genbu, error_message
+from .exceptions import CLError
+from .params import Param
+
+
+Line = t.Tuple[int, str]
+SHELL_CHARS = re.compile(r"[\"'\\]|[^\S \t\r\n]")  # Quotes and odd spaces
+
+
+class Record(t.NamedTuple):
+    """Outcome of input line (line numbers start at 1)."""
+    line: int
+    result: t.Any = None
+    error: t.Optional[str] = None
+
+
+class LineError(Exception):
+    """Error message of command line."""
+
+
+def raise_message(cli: Genbu, exc: CLError) -> t.NoReturn:
+    """Error handler that raises LineError instead of exiting."""
+    raise LineError(error_message(cli, exc)) from exc
+
+
+def split(line: str) -> t.List[str]:
+    """Split line like shlex.split (but faster if there are no quotes)."""
+    return shlex.split(line) if SHELL_CHARS.search(line) else line.split()
+
+
+def run_line(cli: Genbu, line: str) -> t.Tuple[t.Any, t.Optional[str]]:
+    """Run command line and return (result, error message)."""
+    try:
+        return cli.parse(split(line), raise_message).run(), None
+    except LineError as exc:
+        return None, str(exc)
+    except SystemExit as exc:
+        return None, None if exc.code in (None, 0) else str(exc.code)
+    except Exception as exc:  # pylint: disable=broad-except
+        return None, f"{type(exc).__name__}: {exc}"
+
+
+def run_batch(cli: t.Optional[Genbu],
+              lines: t.Sequence[Line],
+              materialize: bool = False,
+              ) -> t.List[Record]:
+    """Run batch of numbered lines (default cli: remote.WORKER).
+
+    If materialize is True, streamed results are turned into lists (e.g.
+    so that they can be pickled).
+    """
+    cli = cli or remote.WORKER
+    assert cli is not None
+    records = []
+    for number, line in lines:
+        result, error = run_line(cli, line)
+        if materialize and output.is_stream(result):
+            result = list(result)
+        records.append(Record(number, result, error))
+    return records
+
+
+def numbered(lines: t.Iterable[str]) -> t.Iterator[Line]:
+    """Number lines, and skip blank lines and comments."""
+    for number, line in enumerate(lines, 1):
+        stripped = line.strip()
+        if stripped and not stripped.startswith("#"):
+            yield number, line
+
+
+def batches(lines: t.Iterable[Line], size: int) -> t.Iterator[t.List[Line]]:
+    """Split lines into batches."""
+    iterator = iter(lines)
+    return iter(lambda: list(itertools.islice(iterator, size)), [])
+
+
+def ordered(executor: concurrent.futures.Executor,
+            func: t.Callable[[t.Any], t.Any],
+            items: t.Iterable[t.Any],
+            window: int,
+            ) -> t.Iterator[t.Any]:
+    """Map func over items on executor, and yield results in order.
+
+    Unlike Executor.map, input is read lazily: at most window items are
+    pending at a time.
+    """
+    pending: t.Deque["concurrent.futures.Future[t.Any]"] = \
+        collections.deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def build(cli: t.Union[Genbu, remote.Definition]) -> Genbu:
+    """Return Genbu tree (built from definition if necessary)."""
+    return cli if isinstance(cli, Genbu) else remote.build(cli)
+
+
+def make_executor(cli: t.Union[Genbu, remote.Definition],
+                  jobs: int,
+                  processes: bool,
+                  ) -> concurrent.futures.Executor:
+    """Make thread pool, or process pool with Genbu tree in every worker."""
+    if not processes:
+        return concurrent.futures.ThreadPoolExecutor(jobs)
+    return concurrent.futures.ProcessPoolExecutor(
+        jobs,
+        initializer=remote.initialize,
+        initargs=(remote.definition(cli),),
+    )
+
+
+def run_lines(cli: t.Union[Genbu, remote.Definition],
+              lines: t.Iterable[str],
+              *,
+              jobs: int = 0,
+              processes: bool = False,
+              chunksize: int = 256,
+              ) -> t.Iterator[Record]:
+    """Run command lines and yield records in input order.
+
+    If jobs is 0, lines run one by one in this thread. Otherwise batches of
+    chunksize lines run on a pool of jobs threads (or processes). Process
+    workers build the tree once (see genbu.remote), and their results must
+    be picklable (streamed results are turned into lists).
+    cli can also be a reference or a schema exported with refs=True.
+    """
+    if jobs <= 0:
+        tree = build(cli)
+        for number, line in numbered(lines):
+            yield Record(number, *run_line(tree, line))
+        return
+
+    func = functools.partial(run_batch, None, materialize=True) \
+        if processes else functools.partial(run_batch, build(cli))
+    with make_executor(cli, jobs, processes) as executor:
+        items = batches(numbered(lines), chunksize)
+        for records in ordered(executor, func, items, 4 * jobs):
+            yield from records
+
+
+def write_records(records: t.Iterable[Record],
+                  stream: t.Optional[t.TextIO] = None,
+                  errors: t.Optional[t.TextIO] = None,
+                  output_format: str = "text",
+                  ) -> int:
+    """Write results to stream and errors to errors (stdout and stderr).
+
+    With output_format="text", results are written like Genbu.main and
+    errors as "line N: message". With output_format="ndjson", every record
+    is written to stream as one JSON object per line (with keys "line", and
+    "result" or "error").
+    Return number of errors.
+    """
+    stream = stream if stream is not None else sys.stdout
+    errors = errors if errors is not None else sys.stderr
+    count = 0
+    for record in records:
+        count += record.error is not None
+        if output_format == "ndjson":
+            stream.write(output.dumps(to_json(record)) + "\n")
+        elif record.error is not None:
+            errors.write(f"line {record.line}: {record.error}\n")
+        else:
+            output.write(record.result, stream)
+    return count
+
+
+def to_json(record: Record) -> t.Dict[str, t.Any]:
+    """Convert record to JSON object."""
+    if record.error is not None:
+        return {"line": record.line, "error": record.error}
+    result = record.result
+    if output.is_stream(result):
+        result = list(result)
+    return {"line": record.line, "result": result}
+
+
+def command(ref: str,
+            file: str = "-",
+            jobs: int = 0,
+            processes: bool = False,
+            output_format: str = "text",
+            ) -> int:
+    """Run MODULE:ATTR Genbu once per line of FILE (default: stdin)."""
+    cli: t.Union[Genbu, str] = ref if processes else remote.build(ref)
+    try:
+        if file == "-":
+            count = run_file(cli, sys.stdin, jobs, processes, output_format)
+        else:
+            with open(file, encoding="utf-8") as lines:
+                count = run_file(cli, lines, jobs, processes, output_format)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        output.silence_stdout()
+        return 1
+    return 1 if count else 0
+
+
+def run_file(cli: t.Union[Genbu, str],
+             lines: t.Iterable[str],
+             jobs: int,
+             processes: bool,
+             output_format: str,
+             ) -> int:
+    """Run command lines and write records (return number of errors)."""
+    records = run_lines(cli, lines, jobs=jobs, processes=processes)
+    return write_records(records, output_format=output_format)
+
+
+runloop = Genbu(
+    command,
+    name="genbu.runloop",
+    params=[
+        Param("ref", ["ref"], comb.One(str)),
+        Param("file", ["file"], comb.Or(comb.One(str), comb.Emit("-"))),
+        Param("jobs", ["-j", "--jobs"], comb.One(int)),
+        Param("processes", ["--processes"], comb.Emit(True)),
+        Param("output_format", ["-o", "--output"],
+              comb.Or(comb.Lit("text"), comb.Lit("ndjson"))),
+    ],
+)
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> int:
+    """Run command lines from command-line arguments."""
+    return t.cast(int, runloop.run(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,486 @@
+"""Export Genbu trees as JSON grammars, and validate argv with them.
+
+The schema describes commands, Params and parser structure, so argv can
+be checked without importing the CLI or running converters and callbacks.
+Token types are reduced to a few kinds ("integer", "number", "complex",
+"string", "decimal", "date", "datetime", "time", ipaddress kinds like
+"ipv4_address", and "choice" for enums), and unknown converters accept
+any token.
+
+Schemas exported with refs=True also name converters, callbacks and
+aggregators ("module:qualname"), so load can rebuild the full Genbu tree
+(e.g. once per worker process).
+"""
+
+import datetime
+import decimal
+import inspect
+import json
+import os
+import typing as t
+
+from . import aggregators, combinators as comb, refs as references
+from .cli import Genbu, default_error_handler
+from .codegen import Compiled
+from .converters import DATETIME_KINDS, Converter, IP_KINDS, nonraising, \
+    strptime_converter
+from .exceptions import CLError
+from .infer import ParserMaker, default_parser_maker
+from .params import Param, default_aggregator
+
+
+VERSION = 1
+Schema = t.Dict[str, t.Any]
+Node = t.Dict[str, t.Any]
+
+KINDS: t.Dict[t.Any, str] = {
+    int: "integer",
+    float: "number",
+    complex: "complex",
+    str: "string",
+}
+CHECKS: t.Dict[str, Converter] = {
+    "integer": int,
+    "number": float,
+    "complex": complex,
+    "decimal": decimal.Decimal,
+    **{kind: cls for cls, kind in IP_KINDS.items()},
+}
+if hasattr(datetime.date, "fromisoformat"):
+    CHECKS.update({
+        kind: getattr(cls, "fromisoformat")
+        for kind, cls in DATETIME_KINDS.items()
+    })
+LEAVES: t.Dict[str, t.Callable[[], comb.Parser]] = {
+    "bool": comb.Bool,
+    "eof": comb.Eof,
+}
+AGGREGATORS: t.Dict[t.Any, str] = {
+    default_aggregator: "last",
+    aggregators.Last: "last",
+    aggregators.Count: "count",
+    aggregators.Sum: "sum",
+    aggregators.SetUnion: "set_union",
+    aggregators.AppendToFile: "append_to_file",
+}
+CONVERTERS: t.Dict[str, t.Callable[[t.Any], comb.Parser]] = {
+    "One": comb.One,
+    "Lazy": comb.Lazy,
+}
+AGGREGATOR_CLASSES: t.Dict[str, t.Callable[..., t.Any]] = {
+    "count": aggregators.Count,
+    "sum": aggregators.Sum,
+    "set_union": aggregators.SetUnion,
+    "append_to_file": aggregators.AppendToFile,
+}
+Hints = t.Dict[int, t.Any]
+
+
+def is_json_scalar(value: t.Any) -> bool:
+    """Check if value can be stored in JSON as is."""
+    return value is None or type(value) in (bool, int, float, str)
+
+
+def reference(obj: t.Any) -> str:
+    """Return reference to obj (raise ValueError if it has none)."""
+    ref = references.reference(obj)
+    if ref is None:
+        raise ValueError(f"can't reference {obj!r}")
+    return ref
+
+
+def export_value(value: t.Any) -> Node:
+    """Export Lit or Emit value (with refs)."""
+    if is_json_scalar(value):
+        return {"value": value}
+    if type(value) is tuple:  # pylint: disable=unidiomatic-typecheck
+        return {"tuple": list(map(export_value, value))}
+    return {"ref": reference(value)}
+
+
+def export_converter(parser: t.Any, hints: t.Optional[Hints]) -> Node:
+    """Export single token parser (One, Try or Lazy)."""
+    node = {
+        "type": "one",
+        "name": str(parser),
+        **getattr(parser, "kind", {"kind": KINDS.get(parser.func, "any")}),
+    }
+    if hints is None:
+        return node
+    if id(parser) in hints:
+        node["hint"] = reference(hints[id(parser)])
+    else:
+        node["class"] = type(parser).__name__
+        node["ref"] = reference(parser.func)
+    return node
+
+
+def export_then(node: Node, then: t.Any, hints: t.Optional[Hints]) -> Node:
+    """Add reference to then function of And or Repeat (with refs)."""
+    if hints is not None and then is not list:
+        node["then"] = reference(then)
+    return node
+
+
+def export_parser(parser: comb.Parser,
+                  hints: t.Optional[Hints] = None,
+                  ) -> Node:
+    """Export parser structure.
+
+    If hints isn't None, nodes also get references for load (hints maps ids
+    of cached parsers to their type hints).
+    """
+    while isinstance(parser, (comb.Memo, Compiled)):
+        parser = parser.parser
+    if isinstance(parser, comb.Packrat):
+        node = export_parser(parser.parser, hints)
+        if hints is not None:
+            node["packrat"] = parser.table.maxsize
+        return node
+    if isinstance(parser, (comb.Or, comb.And, comb.Repeat)):
+        return export_combinator(parser, hints)
+    if isinstance(parser, (comb.One, comb.Try, comb.Lazy)):
+        return export_converter(parser, hints)
+    return export_leaf(parser, hints is not None)
+
+
+def export_combinator(parser: t.Union[comb.Or, comb.And, comb.Repeat],
+                      hints: t.Optional[Hints] = None,
+                      ) -> Node:
+    """Export Or, And and Repeat parsers."""
+    node: Node
+    if isinstance(parser, comb.Repeat):
+        node = {"type": "repeat", "parser": export_parser(parser.parser,
+                                                          hints)}
+        return export_then(node, parser.then, hints)
+    parsers = [export_parser(p, hints) for p in parser.parsers]
+    if isinstance(parser, comb.And):
+        node = {"type": "and", "parsers": parsers}
+        return export_then(node, parser.then, hints)
+    return {"type": "or", "parsers": parsers}
+
+
+def export_leaf(parser: comb.Parser, refs: bool = False) -> Node:
+    """Export Lit, Bool, Emit and Eof parsers."""
+    if isinstance(parser, (comb.Lit, comb.Emit)):
+        return export_constant(parser, refs)
+    if isinstance(parser, comb.Bool):
+        return {"type": "bool"}
+    if isinstance(parser, comb.Eof):
+        return {"type": "eof"}
+    if refs:
+        raise ValueError(f"can't export {type(parser).__name__} parser")
+    return {"type": "one", "name": str(parser), "kind": "any"}
+
+
+def export_constant(parser: t.Union[comb.Lit, comb.Emit],
+                    refs: bool = False,
+                    ) -> Node:
+    """Export Lit and Emit parsers."""
+    node: Node
+    if isinstance(parser, comb.Lit):
+        node = {"type": "lit", "value": str(parser.value)}
+        if refs:
+            node["literal"] = export_value(parser.value)
+    elif refs:
+        node = {"type": "emit", **export_value(parser.value)}
+    else:
+        node = {"type": "emit"}
+        if is_json_scalar(parser.value):
+            node["value"] = parser.value
+    return node
+
+
+def export_aggregator(aggregator: t.Any, refs: bool = False) -> Node:
+    """Export aggregator name (and arguments or reference with refs)."""
+    name = AGGREGATORS.get(aggregator, AGGREGATORS.get(type(aggregator)))
+    if not refs:
+        return {"aggregator": name}
+    if name is None:
+        return {"aggregator_ref": reference(aggregator)}
+    if isinstance(aggregator, aggregators.Sum):
+        return {"aggregator": name, "start": export_value(aggregator.start)}
+    if isinstance(aggregator, aggregators.AppendToFile):
+        return {"aggregator": name, "path": os.fspath(aggregator.path)}
+    return {"aggregator": name}
+
+
+def export_param(param: Param, hints: t.Optional[Hints] = None) -> Node:
+    """Export Param (with references if hints isn't None)."""
+    node = {
+        "dest": param.dest,
+        "optargs": list(param.optargs),
+        "parser": export_parser(param.parser, hints),
+        **export_aggregator(param.aggregator, hints is not None),
+        "description": param.description,
+    }
+    if hints is not None:
+        node.update({
+            "arg_description": param.arg_description,
+            "env": param.env,
+            "config_key": param.config_key,
+        })
+    return {k: v for k, v in node.items() if v is not None}
+
+
+def required_params(cli: Genbu) -> t.List[str]:
+    """Return callback parameters that must be set in argv.
+
+    Record (e.g. dataclass) parameters and Params that can be set by env
+    vars or config files are not included.
+    """
+    try:
+        signature = inspect.signature(cli.callback)
+    except (TypeError, ValueError):
+        return []
+    dests = {
+        p.dest for p in cli.params if not p.env and not p.config_key
+    }
+    return [
+        name for name, param in signature.parameters.items()
+        if param.default is param.empty and name in dests
+        and param.kind not in (param.VAR_POSITIONAL, param.VAR_KEYWORD)
+    ]
+
+
+def parser_hints(cli: Genbu) -> Hints:
+    """Map ids of parsers made by cli's ParserMaker to their type hints.
+
+    Raise ValueError if cli uses a custom ParserMaker, because load can't
+    infer the same parsers without it.
+    """
+    maker = cli.parser_maker or default_parser_maker
+    if maker is not default_parser_maker:
+        raise ValueError(
+            f"can't reference custom ParserMaker of {cli.name!r} "
+            "(use a 'module:attr' reference to the Genbu tree instead)"
+        )
+    with maker.lock:
+        return {id(parser): hint for parser, hint in maker.hints.items()}
+
+
+def export(cli: Genbu, refs: bool = False) -> Schema:
+    """Export Genbu tree as JSON-compatible schema.
+
+    With refs=True, the schema also references callbacks, converters and
+    aggregators for load. Raise ValueError if one of them has no reference
+    (e.g. lambdas and local functions).
+    """
+    hints = parser_hints(cli) if refs else None
+    schema: Schema = {
+        "version": VERSION,
+        "name": cli.name,
+        "params": [export_param(p, hints) for p in cli.params],
+        "required": required_params(cli),
+        "commands": {
+            name: export(sub, refs) for name, sub in cli.subparsers.items()
+        },
+    }
+    if cli.description:
+        schema["description"] = cli.description
+    if cli.inherited:
+        schema["inherited"] = [export_param(p, hints) for p in cli.inherited]
+    if refs:
+        schema["callback"] = reference(cli.callback)
+        schema["error_handler"] = reference(cli.error_handler)
+        if cli.config_files is not None:
+            schema["config_files"] = [os.fspath(f) for f in cli.config_files]
+    return schema
+
+
+def dumps(cli: Genbu, refs: bool = False) -> str:
+    """Export Genbu tree as compact JSON string."""
+    return json.dumps(export(cli, refs), separators=(",", ":"))
+
+
+def any_token(token: str) -> str:
+    """Accept any token."""
+    return token
+
+
+def load_parser(node: Node) -> comb.Parser:
+    """Make structure-only parser from exported parser."""
+    kind = node["type"]
+    if kind in ("or", "and"):
+        parsers = list(map(load_parser, node["parsers"]))
+        return comb.Or(*parsers) if kind == "or" else comb.And(*parsers)
+    if kind == "repeat":
+        return comb.Repeat(load_parser(node["parser"]))
+    return load_leaf(node)
+
+
+def load_leaf(node: Node) -> comb.Parser:
+    """Make parser without sub-parsers from exported parser."""
+    kind = node["type"]
+    if kind == "lit":
+        return comb.Lit(node["value"])
+    if kind == "emit":
+        return comb.Emit(node.get("value"))
+    if kind in LEAVES:
+        return LEAVES[kind]()
+    return comb.Try(load_check(node), name=node["name"])
+
+
+def load_check(node: Node) -> Converter:
+    """Make non-raising token check of exported converter."""
+    if "choices" in node:
+        choices = frozenset(node["choices"])
+        return lambda token: token if token in choices else comb.NOTHING
+    if "formats" in node:
+        return strptime_converter(DATETIME_KINDS[node["kind"]],
+                                  node["formats"])
+    check = CHECKS.get(node["kind"], any_token)
+    return nonraising(check, (ArithmeticError, ValueError))
+
+
+def raise_error(_: Genbu, exc: CLError) -> t.NoReturn:
+    """Error handler that raises the error."""
+    raise exc
+
+
+def make_callback(schema: Schema) -> t.Callable[..., t.Any]:
+    """Make callback that only checks that required params are set."""
+    def callback(**kwargs: t.Any) -> t.Any:
+        return kwargs
+
+    parameters = [
+        inspect.Parameter(name, inspect.Parameter.KEYWORD_ONLY)
+        for name in schema["required"]
+    ]
+    parameters.append(
+        inspect.Parameter("kwargs", inspect.Parameter.VAR_KEYWORD),
+    )
+    setattr(callback, "__signature__", inspect.Signature(parameters))
+    return callback
+
+
+def validator(schema: Schema) -> Genbu:
+    """Make Genbu that validates argv using schema.
+
+    Parsers check token structure only, and aggregators only keep the last
+    value (e.g. AppendToFile doesn't write to files). Errors are raised
+    instead of handled.
+    """
+    params: t.List[t.Union[Param, str]] = [
+        Param(p["dest"], p["optargs"], load_parser(p["parser"]))
+        for p in schema["params"]
+    ]
+    inherited = [
+        Param(p["dest"], p["optargs"], load_parser(p["parser"]))
+        for p in schema.get("inherited", ())
+    ]
+    return Genbu(
+        make_callback(schema),
+        name=schema["name"],
+        description=schema.get("description"),
+        params=params,
+        subparsers=[validator(s) for s in schema["commands"].values()],
+        error_handler=raise_error,
+        inherited=inherited,
+    )
+
+
+def validate(schema: Schema, argv: t.Sequence[str]) -> None:
+    """Check argv using schema (raise CLError if invalid)."""
+    validator(schema).parse(argv)
+
+
+def load_value(node: Node) -> t.Any:
+    """Load Lit or Emit value exported with refs."""
+    if "tuple" in node:
+        return tuple(map(load_value, node["tuple"]))
+    if "ref" in node:
+        return references.resolve(node["ref"])
+    return node.get("value")
+
+
+def load_converter(node: Node, maker: ParserMaker) -> comb.Parser:
+    """Rebuild single token parser exported with refs."""
+    if "hint" in node:
+        return maker.infer_parser(references.resolve(node["hint"]))
+    func = references.resolve(node["ref"])
+    if node["class"] == "Try":
+        return comb.Try(func, name=node["name"])
+    return CONVERTERS[node["class"]](func)
+
+
+def rebuild_parser(node: Node, maker: ParserMaker) -> comb.Parser:
+    """Rebuild parser exported with refs."""
+    kind = node["type"]
+    then = references.resolve(node["then"]) if "then" in node else list
+    if kind in ("or", "and"):
+        parsers = [rebuild_parser(n, maker) for n in node["parsers"]]
+        parser: comb.Parser = comb.Or(*parsers) if kind == "or" else \
+            comb.And(*parsers, then=then)
+    elif kind == "repeat":
+        parser = comb.Repeat(rebuild_parser(node["parser"], maker), then=then)
+    elif kind == "one":
+        parser = load_converter(node, maker)
+    else:
+        parser = rebuild_leaf(node)
+    if "packrat" in node:
+        return comb.Packrat(parser, node["packrat"])
+    return parser
+
+
+def rebuild_leaf(node: Node) -> comb.Parser:
+    """Rebuild Lit, Bool, Emit or Eof parser exported with refs."""
+    if node["type"] == "lit":
+        return comb.Lit(load_value(node["literal"]))
+    if node["type"] == "emit":
+        return comb.Emit(load_value(node))
+    return LEAVES[node["type"]]()
+
+
+def load_aggregator(node: Node) -> t.Any:
+    """Rebuild aggregator of exported Param."""
+    if "aggregator_ref" in node:
+        return references.resolve(node["aggregator_ref"])
+    name = node.get("aggregator", "last")
+    if name == "last":
+        return default_aggregator
+    if "start" in node:
+        return aggregators.Sum(load_value(node["start"]))
+    if "path" in node:
+        return aggregators.AppendToFile(node["path"])
+    return AGGREGATOR_CLASSES[name]()
+
+
+def load_param(node: Node, maker: ParserMaker) -> Param:
+    """Rebuild Param exported with refs."""
+    return Param(
+        node["dest"],
+        node["optargs"],
+        rebuild_parser(node["parser"], maker),
+        aggregator=load_aggregator(node),
+        description=node.get("description"),
+        arg_description=node.get("arg_description"),
+        env=node.get("env"),
+        config_key=node.get("config_key"),
+    )
+
+
+def load(schema: Schema, parser_maker: t.Optional[ParserMaker] = None,
+         ) -> Genbu:
+    """Rebuild Genbu tree from schema exported with refs=True.
+
+    Parsers of type hints are inferred again using parser_maker (or the
+    default ParserMaker), so they get cached like in the original tree.
+    """
+    maker = parser_maker or default_parser_maker
+    params: t.List[t.Union[Param, str]] = [
+        load_param(p, maker) for p in schema["params"]
+    ]
+    error_handler = schema.get("error_handler")
+    return Genbu(
+        references.resolve(schema["callback"]),
+        name=schema["name"],
+        description=schema.get("description"),
+        params=params,
+        subparsers=[load(s, maker) for s in schema["commands"].values()],
+        error_handler=references.resolve(error_handler) if error_handler
+        else default_error_handler,
+        parser_maker=parser_maker,
+        config_files=schema.get("config_files"),
+        inherited=[load_param(p, maker) for p in schema.get("inherited", ())],
+    )
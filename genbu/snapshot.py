@@ -0,0 +1,186 @@
+"""Precomputed usage snapshots.
+
+A snapshot is a JSON file with the usage string of every command in a
+Genbu tree, so that help requests can be answered without building the
+tree or importing callback modules. The snapshot also contains a checksum
+of the source files it was built from, and it's ignored once they change.
+Files are only hashed if their mtime or size changed since the snapshot
+was built, and genbu.cli is only imported to build snapshots.
+
+Build: python -m genbu.snapshot MODULE:ATTR OUTPUT [SOURCE...]
+"""
+
+import hashlib
+import json
+import os
+import sys
+import typing as t
+
+from .refs import resolve
+
+if t.TYPE_CHECKING:
+    from .cli import Genbu
+
+
+VERSION = 1
+HELP_FLAGS = ("-h", "--help", "-?")
+Snapshot = t.Dict[str, t.Any]
+
+
+def command_paths(cli: "Genbu",
+                  prefix: t.Tuple[str, ...] = (),
+                  ) -> t.Iterator[t.Tuple[t.Tuple[str, ...], "Genbu"]]:
+    """Yield (subcommand names, Genbu) for every node in the tree."""
+    yield prefix, cli
+    for name, sub in cli.subparsers.items():
+        yield from command_paths(sub, prefix + (name,))
+
+
+def source_files(cli: "Genbu") -> t.List[str]:
+    """Return source files of callbacks in the tree and of genbu.usage."""
+    # pylint: disable=import-outside-toplevel
+    import inspect
+    from .usage import usage
+
+    files = {os.path.abspath(inspect.getfile(usage))}
+    for _, node in command_paths(cli):
+        try:
+            filename = inspect.getsourcefile(node.callback)
+        except TypeError:  # Built-in callbacks
+            continue
+        if filename is not None:
+            files.add(os.path.abspath(filename))
+    return sorted(files)
+
+
+def checksum(files: t.Iterable[str]) -> t.Optional[str]:
+    """Return checksum of files, or None if a file can't be read."""
+    digest = hashlib.sha256()
+    for filename in files:
+        try:
+            with open(filename, "rb") as file:
+                data = file.read()
+        except OSError:
+            return None
+        digest.update(os.path.basename(filename).encode() + b"\0")
+        digest.update(hashlib.sha256(data).digest())
+    return digest.hexdigest()
+
+
+def stamps(files: t.Iterable[str]) -> t.Optional[t.List[t.List[int]]]:
+    """Return [mtime_ns, size] of files, or None if a file can't be read."""
+    try:
+        return [
+            [stat.st_mtime_ns, stat.st_size] for stat in map(os.stat, files)
+        ]
+    except OSError:
+        return None
+
+
+def build(cli: "Genbu", files: t.Iterable[str] = ()) -> Snapshot:
+    """Render usage of every command in cli.
+
+    files are extra source files to include in the checksum (e.g. the
+    module that defines the tree).
+    """
+    from .usage import usage  # pylint: disable=import-outside-toplevel
+
+    sources = sorted(set(source_files(cli)) |
+                     {os.path.abspath(f) for f in files})
+    return {
+        "version": VERSION,
+        "files": sources,
+        "checksum": checksum(sources),
+        "stamps": stamps(sources),
+        "usage": {
+            " ".join(path): usage(node) for path, node in command_paths(cli)
+        },
+    }
+
+
+def save(cli: "Genbu", path: str, files: t.Iterable[str] = ()) -> None:
+    """Build snapshot and write it to path.
+
+    Source file names are stored relative to the snapshot's directory.
+    """
+    snapshot = build(cli, files)
+    directory = os.path.dirname(os.path.abspath(path))
+    snapshot["files"] = [
+        os.path.relpath(f, directory) for f in snapshot["files"]
+    ]
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(snapshot, file, separators=(",", ":"))
+
+
+def load(path: str) -> t.Optional[Snapshot]:
+    """Load snapshot, or return None if it's missing, invalid or stale."""
+    try:
+        with open(path, encoding="utf-8") as file:
+            snapshot = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("version") != VERSION:
+        return None
+
+    directory = os.path.dirname(os.path.abspath(path))
+    files = [os.path.join(directory, f) for f in snapshot["files"]]
+    unchanged = snapshot.get("stamps") is not None \
+        and stamps(files) == snapshot["stamps"]
+    if not unchanged and checksum(files) != snapshot["checksum"]:
+        return None
+    return snapshot
+
+
+def lookup(path: str, argv: t.Sequence[str]) -> t.Optional[str]:
+    """Return usage of command in argv from snapshot at path.
+
+    Leading subcommand names in argv select the command, like in
+    Genbu.parse. Return None if the snapshot can't be used.
+    """
+    snapshot = load(path)
+    if snapshot is None:
+        return None
+    table = snapshot["usage"]
+    names: t.List[str] = []
+    for token in argv:
+        if " ".join(names + [token]) not in table:
+            break
+        names.append(token)
+    return t.cast(str, table[" ".join(names)])
+
+
+def exit_with_help(path: str,
+                   argv: t.Optional[t.Sequence[str]] = None,
+                   flags: t.Collection[str] = HELP_FLAGS,
+                   ) -> None:
+    """Print usage from snapshot and exit if argv requests help.
+
+    Call this before importing the CLI. Returns normally if argv doesn't
+    contain help flags or if the snapshot is missing or stale.
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    if not any(arg in flags for arg in argv):
+        return
+    text = lookup(path, argv)
+    if text is not None:
+        sys.exit(text)
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> int:
+    """Build snapshot from command-line arguments."""
+    args = list(sys.argv[1:] if argv is None else argv)
+    if len(args) < 2:
+        print(__doc__.strip().rsplit("\n\n", 1)[-1], file=sys.stderr)
+        return 2
+    ref, output, *files = args
+    cli = resolve(ref)
+    module = sys.modules[ref.partition(":")[0]]
+    if getattr(module, "__file__", None):
+        files.append(t.cast(str, module.__file__))
+    save(cli, output, files)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
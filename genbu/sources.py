@@ -0,0 +1,266 @@
+"""Environment variable and config file value sources."""
+
+import itertools
+import json
+import os
+import shlex
+import threading
+import typing as t
+
+from .analysis import arity
+from .exceptions import CLError
+from .params import Param
+
+
+PathLike = t.Union[str, "os.PathLike[str]"]
+Config = t.Mapping[str, t.Any]
+
+
+class ConfigError(CLError):
+    """Invalid or unsupported config file."""
+    def __init__(self, path: PathLike, reason: str):
+        super().__init__()
+        self.path = path
+        self.reason = reason
+
+    def __str__(self) -> str:
+        return f"cannot load config file {os.fspath(self.path)}: {self.reason}"
+
+
+class EnvError(CLError):
+    """Invalid environment variable value."""
+    def __init__(self, name: str, reason: str):
+        super().__init__()
+        self.name = name
+        self.reason = reason
+
+    def __str__(self) -> str:
+        return f"invalid value of environment variable {self.name}: " \
+            f"{self.reason}"
+
+
+def load_json(path: str) -> t.Any:
+    """Load JSON file."""
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def load_toml(path: str) -> t.Any:
+    """Load TOML file using tomllib or toml.
+
+    These are imported on first use, so CLIs without TOML config files
+    don't pay for them.
+    """
+    # pylint: disable=import-outside-toplevel
+    try:
+        import tomllib  # type: ignore
+    except ImportError:  # pragma: no cover; python < 3.11
+        pass
+    else:
+        with open(path, "rb") as file:
+            return tomllib.load(file)
+    try:
+        import toml  # type: ignore
+    except ImportError:  # pragma: no cover
+        raise ConfigError(path, "TOML requires python 3.11+ or toml") \
+            from None
+    return toml.load(path)
+
+
+def parse_config(path: PathLike) -> Config:
+    """Parse JSON or TOML config file (based on file extension)."""
+    name = os.fspath(path)
+    loaders = {".json": load_json, ".toml": load_toml}
+    loader = loaders.get(os.path.splitext(name)[1])
+    if loader is None:
+        raise ConfigError(path, "unknown file type")
+    try:
+        data = loader(name)
+    except (OSError, ValueError) as exc:
+        raise ConfigError(path, str(exc)) from exc
+    if not isinstance(data, dict):
+        raise ConfigError(path, "expected a table/object")
+    return data
+
+
+class ConfigCache:
+    """Cache of parsed config files.
+
+    Entries are invalidated when the file's size or mtime changes.
+    """
+    def __init__(self) -> None:
+        self.entries: t.Dict[str, t.Tuple[t.Tuple[int, int], Config]] = {}
+        self.lock = threading.Lock()
+
+    def load(self, path: PathLike) -> t.Optional[Config]:
+        """Return parsed config file, or None if the file doesn't exist."""
+        name = os.path.abspath(path)
+        try:
+            stat = os.stat(name)
+        except FileNotFoundError:
+            return None
+        stamp = (stat.st_mtime_ns, stat.st_size)
+
+        entry = self.entries.get(name)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+
+        config = parse_config(name)
+        with self.lock:
+            self.entries[name] = (stamp, config)
+        return config
+
+    def clear(self) -> None:
+        """Clear cache."""
+        with self.lock:
+            self.entries.clear()
+
+
+config_cache = ConfigCache()
+MISSING: t.Any = object()
+FALSY = frozenset(["", "0", "false", "no", "off"])
+
+
+def lookup(config: Config, path: t.Sequence[str]) -> t.Any:
+    """Look up dotted config key (split into path), or return MISSING."""
+    value: t.Any = config
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return MISSING
+        value = value[key]
+    return value
+
+
+def to_tokens(value: t.Any) -> t.List[str]:
+    """Convert config value into tokens for Param parsers.
+
+    Lists are flattened, and tables are flattened into key-value pairs.
+    """
+    if isinstance(value, bool):
+        return ["true" if value else "false"]
+    if isinstance(value, (list, tuple)):
+        return [token for item in value for token in to_tokens(item)]
+    if isinstance(value, dict):
+        return [
+            token
+            for key, val in value.items()
+            for token in [str(key)] + to_tokens(val)
+        ]
+    return [str(value)]
+
+
+def is_truthy(value: t.Any) -> bool:
+    """Check if env var or config value turns on a flag.
+
+    Strings are falsy if they're empty, "0", "false", "no" or "off"
+    (case-insensitive).
+    """
+    if isinstance(value, str):
+        return value.strip().lower() not in FALSY
+    return bool(value)
+
+
+class Source(t.NamedTuple):
+    """Value sources of a Param."""
+    param: Param
+    env: t.Tuple[str, ...]
+    config_key: t.Optional[t.Tuple[str, ...]]
+
+
+class SourceIndex:
+    """Precomputed lookup index of env vars and config keys of Params.
+
+    Precedence (highest first): env vars (in the order declared in the
+    Param), then config files (later files override earlier ones).
+    Sources of the inherited index are used too, without copying them.
+    """
+    def __init__(self,
+                 params: t.Iterable[Param],
+                 inherited: t.Optional["SourceIndex"] = None):
+        self.inherited = inherited
+        self.sources = [
+            Source(
+                p,
+                tuple(p.env or ()),
+                tuple(p.config_key.split(".")) if p.config_key else None,
+            )
+            for p in params if p.env or p.config_key
+        ]
+
+    def __bool__(self) -> bool:
+        return bool(self.sources or self.inherited)
+
+    def __iter__(self) -> t.Iterator[Source]:
+        return itertools.chain(self.sources, self.inherited or ())
+
+    def resolve(self,
+                exclude: t.Container[Param],
+                config_files: t.Sequence[PathLike] = (),
+                environ: t.Optional[t.Mapping[str, str]] = None,
+                ) -> t.Iterator[t.Tuple[Param, t.List[str]]]:
+        """Yield (Param, tokens) for Params with values from sources.
+
+        Skips Params in exclude (e.g. Params already set in argv).
+        Missing config files are ignored.
+        """
+        if environ is None:
+            environ = os.environ
+        configs: t.Optional[t.List[Config]] = None
+
+        for source in self:
+            if source.param in exclude:
+                continue
+            tokens = self.from_env(source, environ)
+            if tokens is None and source.config_key is not None:
+                if configs is None:
+                    configs = [
+                        c for c in map(config_cache.load,
+                                       reversed(config_files))
+                        if c is not None
+                    ]
+                tokens = self.from_configs(source, configs)
+            if tokens is not None:
+                yield source.param, tokens
+
+    @staticmethod
+    def from_env(source: Source,
+                 environ: t.Mapping[str, str],
+                 ) -> t.Optional[t.List[str]]:
+        """Return tokens from first env var that is set.
+
+        The value is a single token if the Param parser takes at most one
+        token. Otherwise it's shell-split (raise EnvError if it can't be).
+        Flags (Params that take no tokens) are set by truthy values, and
+        falsy values are skipped.
+        """
+        maximum = arity(source.param.parser).maximum
+        for name in source.env:
+            value = environ.get(name)
+            if value is None or (maximum == 0 and not is_truthy(value)):
+                continue
+            if maximum == 0:
+                return []
+            if maximum == 1:
+                return [value]
+            try:
+                return shlex.split(value)
+            except ValueError as exc:
+                raise EnvError(name, str(exc)) from exc
+        return None
+
+    @staticmethod
+    def from_configs(source: Source,
+                     configs: t.Iterable[Config],
+                     ) -> t.Optional[t.List[str]]:
+        """Return tokens from first config that has the key.
+
+        Flags are set by truthy values, and falsy values are skipped.
+        """
+        assert source.config_key is not None
+        flag = arity(source.param.parser).maximum == 0
+        for config in configs:
+            value = lookup(config, source.config_key)
+            if value is MISSING or (flag and not is_truthy(value)):
+                continue
+            return [] if flag else to_tokens(value)
+        return None
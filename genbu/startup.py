@@ -0,0 +1,227 @@
+"""Profile startup of Genbu trees.
+
+Imports the module of a Genbu tree with instrumentation, and times module
+imports (e.g. of subcommand modules), Genbu.__init__ calls, Param inference
+(signature inspection and infer_parser calls) and usage rendering of every
+command. The report is
+sorted by total time, and folded stacks can be rendered with flamegraph.pl
+or speedscope.
+
+Usage: python -m genbu.startup MODULE:ATTR [FOLDED_OUTPUT]
+"""
+
+import contextlib
+import functools
+import inspect
+import sys
+import time
+import typing as t
+
+from . import cli as cli_module, infer
+from .cli import Genbu
+from .refs import resolve
+from .snapshot import command_paths
+from .usage import usage
+
+
+Label = t.Callable[..., t.Optional[str]]
+Stack = t.Tuple[str, ...]
+
+
+class Entry:  # pylint: disable=too-few-public-methods
+    """Timing statistics of a label (e.g. "import module")."""
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total = 0.0
+        self.self_time = 0.0
+
+
+class Profiler:
+    """Nested timer of startup events.
+
+    Not thread-safe: the tree should be built by one thread.
+    """
+    def __init__(self) -> None:
+        self.stack: t.List[t.List[t.Any]] = []  # [label, start, child time]
+        self.entries: t.Dict[str, Entry] = {}
+        self.samples: t.Dict[Stack, float] = {}  # Self time of stacks
+
+    @contextlib.contextmanager
+    def span(self, label: str) -> t.Iterator[None]:
+        """Time block (nested spans are subtracted from its self time)."""
+        frame: t.List[t.Any] = [label, time.perf_counter(), 0.0]
+        self.stack.append(frame)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - frame[1]
+            stack = tuple(f[0] for f in self.stack)
+            self.stack.pop()
+            if self.stack:
+                self.stack[-1][2] += elapsed
+            self.record(stack, elapsed, elapsed - frame[2])
+
+    def record(self, stack: Stack, total: float, self_time: float) -> None:
+        """Add timing of stack."""
+        entry = self.entries.setdefault(stack[-1], Entry())
+        entry.calls += 1
+        entry.self_time += self_time
+        if stack[-1] not in stack[:-1]:  # Don't count recursive time twice
+            entry.total += total
+        self.samples[stack] = self.samples.get(stack, 0.0) + self_time
+
+    def wrap(self,
+             function: t.Callable[..., t.Any],
+             label: Label,
+             ) -> t.Callable[..., t.Any]:
+        """Wrap function to time calls.
+
+        label gets the call arguments, and calls labeled None aren't timed.
+        """
+        @functools.wraps(function)
+        def wrapper(*args: t.Any, **kwargs: t.Any) -> t.Any:
+            name = label(*args, **kwargs)
+            if name is None:
+                return function(*args, **kwargs)
+            with self.span(name):
+                return function(*args, **kwargs)
+        return wrapper
+
+    @contextlib.contextmanager
+    def patch(self) -> t.Iterator[None]:
+        """Instrument imports, Genbu.__init__ and Param inference."""
+        targets: t.List[t.Tuple[t.Any, str, Label]] = [
+            (Genbu, "__init__", init_label),
+            (cli_module, "infer_params_from_signature", infer_params_label),
+            (inspect, "signature", signature_label),
+            (infer.ParserMaker, "infer_parser", infer_parser_label),
+        ]
+        originals = [(o, n, getattr(o, n)) for o, n, _ in targets]
+        finder = ImportTimer(self)
+        try:
+            for owner, name, label in targets:
+                setattr(owner, name, self.wrap(getattr(owner, name), label))
+            sys.meta_path.insert(0, finder)
+            yield
+        finally:
+            sys.meta_path.remove(finder)
+            for owner, name, original in originals:
+                setattr(owner, name, original)
+
+    def report(self, limit: t.Optional[int] = None) -> str:
+        """Return table of labels sorted by total time (in ms)."""
+        rows = sorted(self.entries.items(), key=lambda i: -i[1].total)
+        lines = [f"{'total ms':>10} {'self ms':>10} {'calls':>7}  label"]
+        for label, entry in rows[:limit]:
+            lines.append(
+                f"{entry.total * 1000:10.3f} {entry.self_time * 1000:10.3f}"
+                f" {entry.calls:7}  {label}"
+            )
+        return "\n".join(lines)
+
+    def folded(self) -> str:
+        """Return folded stacks with self times in microseconds."""
+        return "".join(
+            ";".join(s.replace(";", ",") for s in stack)
+            + f" {round(seconds * 1e6)}\n"
+            for stack, seconds in sorted(self.samples.items())
+        )
+
+
+class ImportTimer:  # pylint: disable=too-few-public-methods
+    """Meta path finder that times execution of imported modules.
+
+    Specs are found by the other finders, and exec_module of their loaders
+    is wrapped (built-in and frozen modules aren't timed).
+    """
+    def __init__(self, profiler: Profiler):
+        self.profiler = profiler
+
+    def find_spec(self,
+                  fullname: str,
+                  path: t.Optional[t.Sequence[str]] = None,
+                  target: t.Any = None,
+                  ) -> t.Any:
+        """Find spec using the other finders, and time its loader."""
+        for finder in sys.meta_path:
+            find_spec = getattr(finder, "find_spec", None)
+            if finder is self or find_spec is None:
+                continue
+            spec = find_spec(fullname, path, target)
+            if spec is not None:
+                self.instrument(fullname, spec.loader)
+                return spec
+        return None
+
+    def instrument(self, fullname: str, loader: t.Any) -> None:
+        """Time next exec_module call of loader instance."""
+        if isinstance(loader, type) or not hasattr(loader, "exec_module"):
+            return
+        exec_module = loader.exec_module
+
+        def timed(module: t.Any) -> None:
+            del loader.exec_module
+            with self.profiler.span(f"import {fullname}"):
+                exec_module(module)
+        loader.exec_module = timed
+
+
+def name_of(obj: t.Any) -> str:
+    """Return qualified name of object (or its repr)."""
+    name = getattr(obj, "__qualname__", None)
+    module = getattr(obj, "__module__", None)
+    return f"{module}.{name}" if name and module else repr(obj)
+
+
+def init_label(_: Genbu, callback: t.Any = None, **kwargs: t.Any) -> str:
+    """Label Genbu.__init__ call."""
+    callback = kwargs.get("callback", callback)
+    name = kwargs.get("name") or getattr(callback, "__name__", "?")
+    return f"Genbu({name})"
+
+
+def infer_params_label(function: t.Any, *_: t.Any, **__: t.Any) -> str:
+    """Label infer_params_from_signature call."""
+    return f"infer_params {name_of(function)}"
+
+
+def signature_label(function: t.Any, *_: t.Any, **__: t.Any) -> str:
+    """Label inspect.signature call."""
+    return f"signature {name_of(function)}"
+
+
+def infer_parser_label(_: infer.ParserMaker, hint: t.Any) -> str:
+    """Label ParserMaker.infer_parser call."""
+    return f"infer_parser {hint!r}"
+
+
+def profile(ref: str) -> t.Tuple[Profiler, Genbu]:
+    """Import Genbu tree from reference and render usage of every command.
+
+    The module should not have been imported yet.
+    """
+    profiler = Profiler()
+    with profiler.patch():
+        obj = resolve(ref)
+        for names, node in command_paths(obj):
+            with profiler.span(" ".join(("usage",) + names).strip()):
+                usage(node)
+    return profiler, obj
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> int:
+    """Print startup report, and save folded stacks if requested."""
+    args = list(sys.argv[1:] if argv is None else argv)
+    if len(args) not in (1, 2) or ":" not in args[0]:
+        print(__doc__.strip().rsplit("\n\n", 1)[-1], file=sys.stderr)
+        return 2
+    profiler, _ = profile(args[0])
+    print(profiler.report())
+    if len(args) == 2:
+        with open(args[1], "w", encoding="utf-8") as file:
+            file.write(profiler.folded())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
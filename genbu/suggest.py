@@ -0,0 +1,119 @@
+"""Suggestions for unknown options and commands ("did you mean")."""
+
+import collections
+import typing as t
+
+
+def distance(source: str, target: str, limit: t.Optional[int] = None) -> int:
+    """Return Levenshtein (edit) distance between strings.
+
+    If limit is not None, distances greater than limit are returned as
+    limit + 1 (the computation stops early).
+    """
+    if len(source) < len(target):
+        source, target = target, source
+    if limit is not None and len(source) - len(target) > limit:
+        return limit + 1
+    previous = list(range(len(target) + 1))
+    for i, char in enumerate(source, 1):
+        current = [i]
+        for j, other in enumerate(target, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char != other),
+            ))
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def ngrams(word: str, size: int = 2) -> t.Counter[str]:
+    """Return n-grams of word with their counts."""
+    return collections.Counter(
+        word[i:i + size] for i in range(len(word) - size + 1)
+    )
+
+
+class NGramIndex:
+    """N-gram index of words.
+
+    Strings within edit distance k of each other share at least
+    max(len(a), len(b)) - size + 1 - k * size n-grams, so only words that
+    share enough n-grams with the query are compared with it.
+    """
+    def __init__(self, words: t.Iterable[str] = (), size: int = 2):
+        self.size = size
+        self.words = list(dict.fromkeys(words))
+        self.postings: t.Dict[str, t.List[t.Tuple[int, int]]] = \
+            collections.defaultdict(list)
+        self.lengths: t.Dict[int, t.List[int]] = collections.defaultdict(list)
+        for index, word in enumerate(self.words):
+            self.lengths[len(word)].append(index)
+            for gram, count in ngrams(word, size).items():
+                self.postings[gram].append((index, count))
+
+    def thresholds(self, query: str, limit: int) -> t.Dict[int, int]:
+        """Return number of n-grams that matches must share with query.
+
+        Keys are the lengths of words that pass the length filter.
+        """
+        return {
+            length: max(len(query), length) - self.size + 1 - limit * self.size
+            for length in range(len(query) - limit, len(query) + limit + 1)
+        }
+
+    def candidates(self, query: str, limit: int) -> t.Iterator[int]:
+        """Generate indices of words that pass the length and count filters.
+
+        Words of lengths with a non-positive threshold (i.e. short words)
+        only have to pass the length filter.
+        """
+        thresholds = self.thresholds(query, limit)
+        for length, threshold in thresholds.items():
+            if threshold <= 0:
+                yield from self.lengths.get(length, ())
+
+        shared: t.Dict[int, int] = {}
+        for gram, count in ngrams(query, self.size).items():
+            for index, other in self.postings.get(gram, ()):
+                shared[index] = shared.get(index, 0) + min(count, other)
+        for index, count in shared.items():
+            threshold = thresholds.get(len(self.words[index]), 0)
+            if 0 < threshold <= count:
+                yield index
+
+    def search(self, query: str, limit: int) -> t.List[t.Tuple[int, str]]:
+        """Return (distance, word) pairs of words within limit of query.
+
+        The result is sorted by distance, then by word.
+        """
+        result = []
+        for index in self.candidates(query, limit):
+            word = self.words[index]
+            key = distance(query, word, limit)
+            if key <= limit:
+                result.append((key, word))
+        return sorted(result)
+
+
+def max_distance(token: str) -> int:
+    """Return largest edit distance of suggestions for token."""
+    return max(1, len(token.lstrip("-")) // 3)
+
+
+class Index:  # pylint: disable=too-few-public-methods
+    """Suggestion index of option and command names."""
+    def __init__(self, options: t.Iterable[str], commands: t.Iterable[str]):
+        self.options = NGramIndex(options)
+        self.commands = NGramIndex(commands)
+
+    def suggest(self, token: str, count: int = 3) -> t.List[str]:
+        """Return up to count options or commands similar to token.
+
+        Tokens that start with "-" are compared with options only.
+        """
+        index = self.options if token.startswith("-") else self.commands
+        matches = index.search(token, max_distance(token))
+        return [word for _, word in matches[:count]]
@@ -64,10 +64,10 @@ def render_option(param: Param) -> t.Optional[str]:
     return result
 
 
-def options_block(*params: Param) -> str:
+def options_block(*params: Param, title: str = "options") -> str:
     """Construct options info block."""
     options = filter(bool, map(render_option, params))
-    result = "options:\n"
+    result = f"{title}:\n"
     for option in options:
         assert option is not None
         result += "{}\n".format(textwrap.indent(option, "    "))
@@ -79,7 +79,8 @@ def usage_example(parser: Genbu) -> str:
     args = [
         f"<{p.dest}:{p.parser!s}>" for p in parser.params if not p.is_option()
     ]
-    prefix = "[options] " if parser.options else ""
+    prefix = "[options] " if parser.options or parser.inherited_scope() \
+        else ""
     return (prefix + " ".join(args)).strip()
 
 
@@ -116,9 +117,16 @@ def usage(cli: Genbu,
     result = render_example(cli)
     if header:
         result += f"\n\n{header}"
-    if cli.takes_params():
+    shared = cli.inherited_scope()
+    params = [
+        p for p in cli.params if shared is None or p not in shared.params
+    ]
+    if params:
+        result += "\n\n"
+        result += options_block(*params)
+    if shared is not None:
         result += "\n\n"
-        result += options_block(*cli.params)
+        result += options_block(*shared.params, title="global options")
     if cli.has_subcommands():
         result += "\n\n"
         result += command_block("commands", cli)
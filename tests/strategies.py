@@ -1,6 +1,8 @@
 # pylint: disable=unsubscriptable-object
 """Strategies for generating type annotations."""
 
+import inspect
+import re
 import sys
 import typing as t
 from hypothesis import strategies as st
@@ -36,3 +38,120 @@ def t_tuples(*args: t.Any) -> st.SearchStrategy[t.Type[t.Tuple[t.Any, ...]]]:
 def t_sequences(arg: t.Any) -> st.SearchStrategy[t.Type[t.Sequence[t.Any]]]:
     """Generate sequence types."""
     return st.one_of(t_lists(arg), t_tuples(arg, ...))
+
+
+def t_scalars() -> st.SearchStrategy[t.Any]:
+    """Generate scalar types."""
+    return st.sampled_from([int, float, str, bool, complex, t.Optional[int]])
+
+
+def t_hints() -> st.SearchStrategy[t.Any]:
+    """Generate (nested) type hints that genbu can parse."""
+    def extend(children: st.SearchStrategy[t.Any]) -> st.SearchStrategy[t.Any]:
+        pairs = st.tuples(children, children)
+        return st.one_of(
+            children.flatmap(t_sequences),
+            pairs.flatmap(lambda p: t_tuples(*p)),
+            pairs.flatmap(lambda p: t_dicts(str, p[1])),
+            pairs.map(lambda p: t.Union[p]),  # type: ignore
+        )
+    return st.recursive(t_scalars(), extend, max_leaves=6)
+
+
+NoneType = type(None)
+SCALAR_TOKENS: t.Dict[t.Any, st.SearchStrategy[t.List[str]]] = {
+    int: st.integers(0, 10**6).map(lambda x: [str(x)]),
+    float: st.floats(0, 1e6).map(lambda x: [repr(x)]),
+    str: st.from_regex(r"\A[a-z][a-z0-9]{0,7}\Z").map(lambda x: [x]),
+    bool: st.sampled_from(["true", "false", "1", "0"]).map(lambda x: [x]),
+    complex: st.complex_numbers(max_magnitude=1e6, allow_nan=False)
+    .map(lambda x: str(x).strip("()"))
+    .filter(lambda x: not x.startswith("-"))
+    .map(lambda x: [x]),
+}
+
+
+def concat(lists: t.Iterable[t.Iterable[t.Any]]) -> t.List[t.Any]:
+    """Concatenate lists."""
+    return [token for tokens in lists for token in tokens]
+
+
+def tokens(hint: t.Any, max_size: int = 8) -> st.SearchStrategy[t.List[str]]:
+    """Generate tokens for hint (from t_hints).
+
+    Tokens of union types may be parsed as a different alternative, or may
+    fail to parse in some contexts (e.g. inside lists).
+    """
+    if hint in SCALAR_TOKENS:
+        return SCALAR_TOKENS[hint]
+    origin = getattr(hint, "__origin__", None)
+    args: t.Tuple[t.Any, ...] = getattr(hint, "__args__", ())
+    if origin is t.Union:
+        return st.one_of(*(
+            st.just([]) if arg is NoneType else tokens(arg, max_size)
+            for arg in args
+        ))
+    if origin in (list, t.List) or args[-1:] == (...,):
+        return st.lists(tokens(args[0], max_size), max_size=max_size) \
+            .map(concat)
+    if origin in (dict, t.Dict):
+        return st.lists(st.tuples(tokens(args[0]), tokens(args[1])),
+                        max_size=max_size).map(concat).map(concat)
+    return st.tuples(*(tokens(a, max_size) for a in args)).map(concat)
+
+
+@st.composite
+def signatures(draw: t.Callable[..., t.Any],
+               max_params: int = 20,
+               max_size: int = 8,
+               ) -> t.Tuple[t.List[t.Any], t.List[str]]:
+    """Generate hints of keyword-only params and argv that sets them.
+
+    Params are named p0, p1, etc. (like make_callback).
+    """
+    hints = draw(st.lists(t_hints(), min_size=1, max_size=max_params))
+    argv = []
+    for i, hint in enumerate(hints):
+        argv.append(f"--p{i}")
+        argv.extend(draw(tokens(hint, max_size)))
+    return hints, argv
+
+
+BUILTIN_GENERICS = re.compile(r"(?<![\w.])(dict|list|tuple)\[")
+
+
+def dump_hint(hint: t.Any) -> str:
+    """Return type hint as string that load_hint can evaluate.
+
+    Builtin generics (e.g. list[int]) are spelled like typing.List[int], so
+    that the string can be evaluated before python 3.9.
+    """
+    if isinstance(hint, type) and getattr(hint, "__origin__", None) is None:
+        return hint.__name__
+    return BUILTIN_GENERICS.sub(
+        lambda m: f"typing.{m.group(1).capitalize()}[",
+        repr(hint),
+    )
+
+
+def load_hint(text: str) -> t.Any:
+    """Evaluate type hint string from dump_hint."""
+    namespace = {"typing": t, "NoneType": NoneType}
+    return eval(text, namespace)  # pylint: disable=eval-used
+
+
+def make_callback(hints: t.Sequence[t.Any],
+                  name: str = "callback",
+                  ) -> t.Callable[..., t.Any]:
+    """Make callback with one keyword-only parameter per hint."""
+    def callback(**kwargs: t.Any) -> t.Any:
+        return kwargs
+
+    parameters = [
+        inspect.Parameter(f"p{i}", inspect.Parameter.KEYWORD_ONLY,
+                          annotation=hint)
+        for i, hint in enumerate(hints)
+    ]
+    setattr(callback, "__signature__", inspect.Signature(parameters))
+    callback.__name__ = name
+    return callback
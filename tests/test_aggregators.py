@@ -0,0 +1,107 @@
+# pylint: disable=missing-function-docstring
+"""Test genbu.aggregators."""
+
+import gc
+import pathlib
+import typing as t
+import warnings
+
+import pytest
+
+from genbu import Genbu, Param, combinators as comb
+from genbu.aggregators import (
+    LAST, AppendToFile, Collect, Count, Last, SetUnion, StreamingAggregator,
+    Sum, streaming,
+)
+from genbu.params import default_aggregator
+
+
+@pytest.mark.parametrize("aggregator,values,expected", [
+    (Last(), [1, 2, 3], 3),
+    (Count(), ["a", "b"], 2),
+    (Count(), [], 0),
+    (Sum(), [1, 2, 3], 6),
+    (Sum(start=[]), [[1], [2, 3]], [1, 2, 3]),
+    (SetUnion(), ["a", ["b", "c"], "a"], {"a", "b", "c"}),
+    (Collect(sorted), [3, 1, 2], [1, 2, 3]),
+])
+def test_aggregator_call(aggregator: StreamingAggregator,
+                         values: t.List[t.Any],
+                         expected: t.Any,
+                         ) -> None:
+    assert aggregator(values) == expected
+
+
+def test_append_to_file(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "values.txt"
+    aggregator = AppendToFile(path)
+    assert aggregator(["a", 1]) == path
+    assert aggregator(["b"]) == path
+    assert path.read_text() == "a\n1\nb\n"
+
+
+@pytest.mark.filterwarnings("error::ResourceWarning")
+def test_append_to_file_has_no_side_effects_on_failed_parse(
+    tmp_path: pathlib.Path,
+) -> None:
+    path = tmp_path / "values.txt"
+    cli = Genbu(
+        lambda log, n: (log, n),
+        name="cli",
+        params=[
+            Param("log", ["--log"], aggregator=AppendToFile(path)),
+            Param("n", ["-n"], comb.One(int)),
+        ],
+    )
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        for _ in range(3):
+            with pytest.raises(SystemExit):
+                cli.run(["--log", "a", "-n", "x"])
+        gc.collect()
+    assert not [w for w in caught if w.category is ResourceWarning]
+    assert not path.exists()
+
+
+def test_streaming() -> None:
+    count = Count()
+    assert streaming(count) is count
+    assert streaming(default_aggregator) is LAST
+    assert isinstance(streaming(sum), Collect)
+
+
+def test_cli_with_streaming_aggregators(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "log.txt"
+
+    def callback(verbose: int, tags: t.Set[str], total: int, log: t.Any,
+                 ) -> t.Any:
+        return verbose, tags, total, log
+
+    cli = Genbu(
+        callback,
+        params=[
+            Param("verbose", ["-v"], comb.Emit(True), aggregator=Count()),
+            Param("tags", ["--tag"], comb.Repeat(comb.One(str)),
+                  aggregator=SetUnion()),
+            Param("total", ["-n"], comb.Lazy(int), aggregator=Sum()),
+            Param("log", ["--log"], aggregator=AppendToFile(path)),
+        ],
+    )
+    argv = "-vvv --tag a b --tag a -n 1 -n 2 --log x --log y".split()
+    assert cli.run(argv) == (3, {"a", "b"}, 3, path)
+    assert path.read_text() == "x\ny\n"
+
+    argv = ["-v", "--tag", "x", "-n", "1", "--log", "z"] * 5000
+    assert cli.run(argv) == (5000, {"x"}, 5000, path)
+
+
+def test_count_checks_lazy_values() -> None:
+    def callback(n: int) -> int:
+        return n
+
+    cli = Genbu(callback, params=[
+        Param("n", ["-n"], comb.Lazy(int), aggregator=Count()),
+    ])
+    assert cli.run(["-n", "1", "-n", "2"]) == 2
+    with pytest.raises(SystemExit):
+        cli.run(["-n", "abc", "-n", "x"])
@@ -0,0 +1,156 @@
+# pylint: disable=missing-function-docstring
+"""Test genbu.analysis."""
+
+import collections
+import typing as t
+
+from hypothesis import given, strategies as st
+import pytest
+
+from genbu import ParserMaker
+from genbu import analysis, combinators as comb
+
+
+def run(parser: comb.Parser, tokens: t.Sequence[str]) -> t.Any:
+    """Return parsed value and remaining tokens, or None on error."""
+    deque = collections.deque(tokens)
+    result = parser.attempt(deque)
+    if result is None:
+        return None
+    return result.value, list(deque)
+
+
+def succeeds(func: t.Callable[[str], t.Any], token: str) -> bool:
+    try:
+        func(token)
+        return True
+    except ValueError:
+        return False
+
+
+@given(st.one_of(
+    st.text(),
+    st.integers().map(str),
+    st.floats().map(str),
+    st.from_regex(r"\A\s*[+-]?[\d_.]+(e[+-]?\d+)?\s*\Z"),
+))
+def test_classify_over_approximates_int_and_float(token: str) -> None:
+    kind = analysis.classify(token)
+    if succeeds(int, token):
+        assert kind == analysis.INTEGER
+    if succeeds(float, token):
+        assert kind in (analysis.INTEGER, analysis.NUMBER)
+
+
+@pytest.mark.parametrize("parser,expected", [
+    (comb.Lit("a"), analysis.First(False, literals=frozenset("a"))),
+    (comb.One(int), analysis.First(False, frozenset([analysis.INTEGER]))),
+    (comb.Emit(None), analysis.First(True)),
+    (comb.Repeat(comb.Lit("a")), analysis.First(True,
+                                                literals=frozenset("a"))),
+    (
+        comb.And(comb.Emit(0), comb.Lit("a"), comb.Lit("b")),
+        analysis.First(False, literals=frozenset("a")),
+    ),
+    (
+        comb.Or(comb.Lit("a"), comb.One(float)),
+        analysis.First(False, frozenset([analysis.INTEGER, analysis.NUMBER]),
+                       frozenset("a")),
+    ),
+])
+def test_first(parser: comb.Parser, expected: analysis.First) -> None:
+    assert analysis.first(parser) == expected
+
+
+@pytest.mark.parametrize("parser,expected", [
+    (comb.One(int), (1, 1)),
+    (comb.Emit(None), (0, 0)),
+    (comb.Repeat(comb.One(int)), (0, None)),
+    (comb.Repeat(comb.Emit(None)), (0, 0)),
+    (comb.And(comb.One(int), comb.Lit("a"), comb.Eof()), (2, 2)),
+    (comb.And(comb.One(int), comb.Repeat(comb.Bool())), (1, None)),
+    (comb.Or(comb.One(int), comb.And(comb.Bool(), comb.Bool())), (1, 2)),
+    (comb.Or(comb.Emit(None), comb.Lazy(int)), (0, 1)),
+    (comb.Packrat(comb.And(comb.Try(int), comb.Try(int))), (2, 2)),
+])
+def test_arity(parser: comb.Parser, expected: t.Tuple[int, int]) -> None:
+    assert analysis.arity(parser) == expected
+
+
+@pytest.mark.parametrize("parser,dead", [
+    (comb.Or(comb.One(str), comb.One(int)), [1]),
+    (comb.Or(comb.One(str), comb.Emit(None)), []),
+    (comb.Or(comb.Emit(None), comb.One(int)), [1]),
+    (comb.Or(comb.One(float), comb.One(int)), [1]),
+    (comb.Or(comb.One(int), comb.One(float)), []),
+    (comb.Or(comb.One(int), comb.Lit(5), comb.Lit("x")), [1]),
+    (comb.Or(comb.Bool(), comb.Lit("yes"), comb.Bool()), [1, 2]),
+    (comb.Or(comb.Lit("a"), comb.Lit("b"), comb.Lit("a")), [2]),
+])
+def test_dead_alternatives(parser: comb.Or, dead: t.List[int]) -> None:
+    result = analysis.dead_alternatives(parser)
+    assert [d.position for d in result] == dead
+
+
+def test_check_warns_about_nested_dead_alternatives() -> None:
+    parser = comb.Repeat(comb.Or(comb.One(str), comb.One(int)))
+    with pytest.warns(analysis.GrammarWarning, match="int"):
+        assert len(analysis.check(parser)) == 1
+
+
+PARSERS = [
+    comb.Or(comb.One(str), comb.One(int)),
+    comb.Or(comb.One(int), comb.One(float), comb.One(str)),
+    comb.Or(comb.One(float), comb.Lit("a"), comb.Emit(None)),
+    comb.Or(comb.Lit("1"), comb.Lit("b"), comb.One(int), comb.Bool()),
+    comb.Repeat(comb.Or(comb.One(int), comb.Lit("x"))),
+    comb.And(comb.Or(comb.Lit("a"), comb.One(int)),
+             comb.Or(comb.Eof(), comb.One(complex))),
+]
+
+
+@pytest.mark.parametrize("parser", PARSERS)
+@given(st.lists(st.sampled_from(
+    ["1", "-2", "2.5", "1e3", "inf", "a", "b", "x", "yes", "0", "1j", ""]
+)))
+def test_optimize_preserves_results(parser: comb.Parser,
+                                    tokens: t.List[str],
+                                    ) -> None:
+    optimized = analysis.optimize(parser)
+    assert str(optimized) == str(parser)
+    assert run(optimized, tokens) == run(parser, tokens)
+
+
+def test_dispatch_skips_alternatives() -> None:
+    calls = []
+
+    def convert(token: str) -> str:
+        calls.append(token)
+        return token
+
+    parser = analysis.Dispatch(comb.One(int), comb.Lit("a"), comb.One(convert))
+    assert run(parser, ["a"]) == ("a", [])
+    assert run(parser, ["5"]) == (5, [])
+    assert not calls
+    assert run(parser, ["b"]) == ("b", [])
+    assert calls == ["b"]
+
+
+def test_dispatch_on_empty_tokens() -> None:
+    parser = analysis.Dispatch(comb.One(int), comb.Emit(None))
+    assert parser.candidates(collections.deque()) == (parser.parsers[1],)
+    assert run(parser, []) == (None, [])
+    with pytest.raises(comb.CantParse):
+        analysis.Dispatch(comb.One(int))(collections.deque())
+
+
+def test_parser_maker_dispatch() -> None:
+    parser = ParserMaker(dispatch=True).infer_parser(
+        t.Optional[t.Union[int, float]]
+    )
+    assert isinstance(parser, analysis.Dispatch)
+    assert run(parser, ["5"]) == (5, [])
+    assert run(parser, ["5.5"]) == (5.5, [])
+
+    with pytest.warns(analysis.GrammarWarning):
+        ParserMaker(dispatch=True).infer_parser(t.Union[str, int])
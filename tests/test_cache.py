@@ -0,0 +1,174 @@
+# pylint: disable=missing-function-docstring,redefined-outer-name
+"""Test genbu.cache."""
+
+import functools
+import os
+import pathlib
+import subprocess
+import sys
+import threading
+import typing as t
+
+import pytest
+
+from genbu import Genbu
+from genbu.cache import ResultCache, fingerprint
+
+CALLS: t.List[t.Any] = []
+
+
+def count_lines(path: pathlib.Path, tags: t.Optional[t.List[str]] = None,
+                ) -> int:
+    """Count lines in file."""
+    CALLS.append((path, tags))
+    return len(path.read_text().splitlines())
+
+
+def stream(n: int) -> t.Iterator[int]:
+    """Generate numbers."""
+    return iter(range(n))
+
+
+def make_cli(cache: ResultCache) -> Genbu:
+    return Genbu(lambda: None, name="tool", subparsers=[
+        Genbu(count_lines, cache=cache),
+        Genbu(stream, cache=cache),
+    ])
+
+
+@pytest.fixture
+def cache(tmp_path: pathlib.Path) -> ResultCache:
+    CALLS.clear()
+    return ResultCache(tmp_path / "cache")
+
+
+def test_cached_results_skip_callback(cache: ResultCache,
+                                      tmp_path: pathlib.Path,
+                                      ) -> None:
+    path = tmp_path / "input.txt"
+    path.write_text("a\nb\n")
+    cli = make_cli(cache)
+    argv = ["count_lines", "--path", str(path), "--tags", "x", "y"]
+
+    assert cli.run(argv) == 2
+    assert make_cli(cache).run(argv) == 2
+    assert len(CALLS) == 1
+    assert make_cli(cache).run(argv[:3] + ["--tags", "y", "x"]) == 2
+    assert len(CALLS) == 2
+
+    path.write_text("a\nb\nc\n")
+    assert cli.run(argv) == 3
+    assert cli.run(argv[:3]) == 3
+    assert len(CALLS) == 4
+
+
+def test_streams_are_not_cached(cache: ResultCache) -> None:
+    cli = make_cli(cache)
+    assert list(cli.run(["stream", "--n", "3"])) == [0, 1, 2]
+    assert list(cli.run(["stream", "--n", "3"])) == [0, 1, 2]
+    assert not os.path.exists(cache.directory)
+
+
+def test_fingerprint() -> None:
+    assert fingerprint({"a": {1, 2}}) == fingerprint({"a": {2, 1}})
+    assert fingerprint([1, 2]) != fingerprint((1, 2))
+    assert fingerprint("1") != fingerprint(1)
+    with pytest.raises(Exception):
+        fingerprint(lambda: None)
+
+
+def test_eviction(tmp_path: pathlib.Path) -> None:
+    cache = ResultCache(tmp_path, max_size=3000)
+    for i in range(5):
+        assert cache.set(str(i), b"x" * 1000)
+        os.utime(cache.path(str(i)), ns=(i, i))
+    assert cache.get("0") == (False, None)
+    assert cache.get("4") == (True, b"x" * 1000)
+    assert sum(f.stat().st_size for f in tmp_path.iterdir()) <= 3000
+
+    assert not cache.set("big", b"x" * 5000)
+    assert cache.set("unpicklable", lambda: None) is False
+    cache.clear()
+    assert not list(tmp_path.iterdir())
+
+
+def test_corrupt_entries_are_misses(cache: ResultCache) -> None:
+    cache.set("key", 1)
+    pathlib.Path(cache.path("key")).write_bytes(b"corrupt")
+    assert cache.get("key") == (False, None)
+    assert not os.path.exists(cache.path("key"))
+
+
+@pytest.mark.parametrize("data", [
+    b"cgenbu\nNoSuchClass\n.",
+    b"cno_such_module\nNoSuchClass\n.",
+])
+def test_stale_entries_are_misses(cache: ResultCache, data: bytes) -> None:
+    cache.set("key", 1)
+    pathlib.Path(cache.path("key")).write_bytes(data)
+    assert cache.get("key") == (False, None)
+    assert not os.path.exists(cache.path("key"))
+
+
+class Scale:  # pylint: disable=too-few-public-methods
+    """Callable instance."""
+    def __init__(self, factor: int):
+        self.factor = factor
+        self.lock: t.Any = None
+
+    def __call__(self, n: int) -> int:
+        CALLS.append(n)
+        return n * self.factor
+
+
+def scale(n: int, factor: int = 1) -> int:
+    """Scale n."""
+    CALLS.append(n)
+    return n * factor
+
+
+def test_partials_and_callable_instances(cache: ResultCache) -> None:
+    commands: t.List[t.Callable[..., int]] = [
+        functools.partial(scale, factor=2),
+        functools.partial(scale, factor=3),
+        Scale(2),
+        Scale(3),
+    ]
+    results = [
+        Genbu(c, name="scale", cache=cache).run(["--n", "5"]) for c in commands
+    ]
+    assert results == [10, 15, 10, 15]
+    assert [Genbu(c, name="scale", cache=cache).run(["--n", "5"])
+            for c in commands] == results
+    assert len(CALLS) == 4
+
+
+def make_offset(offset: int) -> t.Callable[[int], int]:
+    def add(n: int) -> int:
+        CALLS.append(n)
+        return n + offset
+    return add
+
+
+def test_closures_have_different_keys(cache: ResultCache) -> None:
+    first = Genbu(make_offset(1), name="add", cache=cache)
+    second = Genbu(make_offset(100), name="add", cache=cache)
+    assert first.run(["--n", "1"]) == 2
+    assert second.run(["--n", "1"]) == 101
+    assert first.run(["--n", "1"]) == 2
+    assert len(CALLS) == 2
+
+
+def test_unpicklable_callbacks_run_uncached(cache: ResultCache) -> None:
+    callback = Scale(2)
+    callback.lock = threading.Lock()
+    cli = Genbu(callback, name="scale", cache=cache)
+    assert cli.run(["--n", "1"]) == cli.run(["--n", "1"]) == 2
+    assert len(CALLS) == 2
+
+
+def test_cache_is_imported_lazily() -> None:
+    code = "import sys, genbu; print('genbu.cache' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", code], check=True,
+                            stdout=subprocess.PIPE, text=True).stdout
+    assert output.strip() == "False"
@@ -7,7 +7,11 @@ import typing as t
 from hypothesis import given, strategies as st
 import pytest
 
-from genbu import Genbu, Param, combinators as comb, infer_params
+from genbu import (
+    Genbu, Param, ParserMaker, UnsupportedType, combinators as comb,
+    infer_params,
+)
+from genbu.aggregators import Count
 
 
 def make_cli(**kwargs: t.Any) -> Genbu:
@@ -54,6 +58,56 @@ def test_cli_run_with_arguments() -> None:
     assert cli.run(["0.45e-5"]) == 0.45e-5
 
 
+def test_cli_run_with_variadic_arguments_in_any_position() -> None:
+    """Variadic arguments shouldn't take tokens needed by later arguments."""
+    cli = make_cli(
+        params=[
+            Param("sources", parser=comb.Repeat(comb.One(str))),
+            Param("target", parser=comb.One(str)),
+        ],
+        callback=lambda sources, target: (sources, target),
+    )
+    assert cli.run(["a", "b", "c"]) == (["a", "b"], "c")
+    assert cli.run(["a"]) == ([], "a")
+    with pytest.raises(SystemExit):
+        cli.run([])
+
+    cli = make_cli(
+        params=[
+            Param("first", parser=comb.One(int)),
+            Param("middle", parser=comb.Repeat(comb.One(int))),
+            Param("pair", parser=comb.And(comb.One(str), comb.One(str))),
+        ],
+        callback=lambda first, middle, pair: (first, middle, pair),
+    )
+    assert cli.run("1 2 3 a b".split()) == (1, [2, 3], ["a", "b"])
+    assert cli.run("1 a b".split()) == (1, [], ["a", "b"])
+    with pytest.raises(SystemExit):
+        cli.run("1 2 x a b".split())
+
+
+def test_cli_run_checks_argument_count_before_parsing() -> None:
+    """Wrong number of arguments should fail without running converters."""
+    calls = []
+
+    def record(token: str) -> str:
+        calls.append(token)
+        return token
+
+    cli = make_cli(
+        params=[
+            Param("a", parser=comb.One(record)),
+            Param("b", parser=comb.And(comb.One(record), comb.One(record))),
+        ],
+        callback=lambda a, b: (a, b),
+    )
+    for argv in (["x"], ["x", "y"], ["x", "y", "z", "w"]):
+        with pytest.raises(SystemExit):
+            cli.run(argv)
+    assert not calls
+    assert cli.run(["x", "y", "z"]) == ("x", ["y", "z"])
+
+
 def test_cli_run_with_short_options() -> None:
     """Test with short options."""
     cli = make_cli(
@@ -290,6 +344,28 @@ class TestGenbuParams:
         cli = Genbu(function, params=[])
         assert not cli.params
 
+    def test_does_not_infer_explicit_params(self) -> None:
+        """Don't inspect unsupported annotations that are overridden."""
+        def callback(foo: t.Callable[[], int]) -> t.Any:
+            return foo
+
+        with pytest.raises(UnsupportedType):
+            Genbu(callback)
+
+        cli = Genbu(callback, params=[Param("foo", parser=comb.One(str))])
+        assert cli.run(["bar"]) == "bar"
+
+    def test_does_not_infer_overridden_params_with_ellipsis(self) -> None:
+        """Only infer params that aren't overridden next to "..."."""
+        def callback(foo: t.Callable[[], int], bar: int = 0) -> t.Any:
+            return foo, bar
+
+        override = Param("foo", ["--foo"], comb.One(str))
+        cli = Genbu(callback, params=["...", override])
+        assert cli.params[0] is override
+        assert [p.dest for p in cli.params] == ["foo", "bar"]
+        assert cli.run(["--foo", "x", "--bar", "1"]) == ("x", 1)
+
     def test_genbu_params_with_ellipsis(self,
                                         function: t.Callable[..., t.Any],
                                         ) -> None:
@@ -313,3 +389,150 @@ class TestGenbuParams:
             assert actual.aggregator == expected.aggregator
             assert actual.description == expected.description
             assert actual.arg_description == expected.arg_description
+
+
+def test_cli_run_with_lazy_conversions() -> None:
+    """Lazy ParserMaker should only convert values that are used."""
+    calls = []
+
+    class Slow(str):
+        """Converter that records calls."""
+        def __new__(cls, token: str) -> "Slow":
+            if token == "bad":
+                raise ValueError(token)
+            calls.append(token)
+            return super().__new__(cls, token)
+
+    def callback(path: Slow, pair: t.Tuple[Slow, int]) -> t.Any:
+        return path, pair
+
+    cli = Genbu(callback, parser_maker=ParserMaker(lazy=True))
+    argv = "--path a --path b --path c --pair d 1 --pair e 2".split()
+    assert cli.run(argv) == ("c", ("e", 2))
+    assert calls == ["c", "e"]
+
+    assert cli.run("--path bad --path f --pair g 3".split()) == \
+        ("f", ("g", 3))
+    with pytest.raises(SystemExit):
+        cli.run("--path bad --pair g 3".split())
+
+
+def test_cli_run_with_negative_numbers() -> None:
+    """Negative numbers should be parsed as arguments."""
+    cli = make_cli(
+        params=[
+            Param("numbers", parser=comb.Repeat(comb.One(float))),
+            Param("offset", ["-o"], parser=comb.One(int)),
+        ],
+        callback=lambda numbers, offset=0: sum(numbers) + offset,
+    )
+    assert cli.run("-1 2 -3.5".split()) == -2.5
+    assert cli.run("-o -10 -1".split()) == -11
+    assert cli.run("-o-10 -1".split()) == -11
+
+
+def make_inherited_cli() -> Genbu:
+    """Make Genbu tree with inherited options."""
+    def show(name: str, verbose: int = 0, profile: str = "default") -> t.Any:
+        """Show."""
+        return name, verbose, profile
+
+    def root() -> None:
+        """Root."""
+
+    verbose = Param("verbose", ["-v", "--verbose"], comb.Emit(1),
+                    aggregator=Count())
+    profile = Param("profile", ["-p", "--profile"], comb.One(str))
+    return Genbu(
+        root,
+        inherited=[verbose],
+        subparsers=[
+            Genbu(lambda: None, name="group", inherited=[profile],
+                  subparsers=[Genbu(show)]),
+            Genbu(lambda verbose=0: verbose, name="dump"),
+        ],
+    )
+
+
+@pytest.mark.parametrize("argv,expected", [
+    ("group show --name a", ("a", 0, "default")),
+    ("-v group show --name a -v", ("a", 2, "default")),
+    ("-vv group --profile=x show --name a", ("a", 2, "x")),
+    ("--verb group -p show show --name a", ("a", 1, "show")),
+    ("group show --name a --profile y --verbose", ("a", 1, "y")),
+])
+def test_cli_run_with_inherited_options(argv: str, expected: t.Any) -> None:
+    """Inherited options can come before or after subcommand names."""
+    cli = make_inherited_cli()
+    assert cli.run(argv.split()) == expected
+
+
+def test_inherited_options_are_shared() -> None:
+    """Subcommands reuse the inherited options table of their parent."""
+    cli = make_inherited_cli()
+    group = cli.subparsers["group"]
+    assert cli.subparsers["dump"].inherited_scope() is cli.inherited_scope()
+    assert group.subparsers["show"].inherited_scope() is \
+        group.inherited_scope()
+    assert cli.run(["dump", "-vv"]) == 2
+
+    with pytest.raises(SystemExit):
+        cli.run(["--profile", "x", "group"])
+    with pytest.raises(ValueError):
+        Genbu(lambda: None, inherited=[Param("arg")])
+
+
+def test_parsing_scope_chains_inherited_options() -> None:
+    """Parsing scopes don't copy inherited options."""
+    cli = make_inherited_cli()
+    dump = cli.subparsers["dump"]
+    scope = dump.parsing_scope()
+    shared = cli.inherited_scope()
+    assert shared is not None
+    assert scope.params == []  # verbose is replaced by inherited option
+    assert scope.option_table.options["-v"] is shared.params[0]
+    assert set(scope.option_table.options) == {"-v", "--verbose"}
+    assert scope.option_table.short == {"v": False}
+
+
+def test_cli_run_nested_subcommands() -> None:
+    """Subcommand names are looked up in the current subcommand."""
+    cli = Genbu(lambda: "root", subparsers=[
+        Genbu(lambda: "a", name="a", subparsers=[
+            Genbu(lambda: "b", name="b"),
+        ]),
+        Genbu(lambda: "b", name="b"),
+    ])
+    assert cli.run(["a"]) == "a"
+    assert cli.run(["a", "b"]) == "b"
+    with pytest.raises(SystemExit):
+        cli.run(["a", "a"])
+
+
+def test_cli_run_chain() -> None:
+    """Commands separated by delimiters run in order."""
+    def add(a: int, b: int = 0, previous: t.Optional[int] = None) -> int:
+        """Add numbers (and previous result)."""
+        return a + b + (previous or 0)
+
+    cli = Genbu(lambda: None, name="calc", subparsers=[
+        Genbu(add),
+        Genbu(lambda: 0, name="reset"),
+    ])
+    argv = "add --a 1 --b 2 + add --a 10 + + reset + add --a 1".split()
+    assert cli.run_chain(argv) == [3, 10, 0, 1]
+    assert cli.run_chain(argv, forward="previous") == [3, 13, 0, 1]
+    assert cli.run_chain("add --a 1 , add --a 2 --previous 5".split(),
+                         delimiter=",", forward="previous") == [1, 7]
+    assert not cli.run_chain([])
+
+
+def test_cli_run_chain_parses_every_command_first() -> None:
+    """Callbacks don't run if a command in the chain is invalid."""
+    calls = []
+    cli = Genbu(lambda: None, name="tool", subparsers=[
+        Genbu(lambda: calls.append("ok"), name="ok"),
+    ])
+    with pytest.raises(SystemExit):
+        cli.run_chain("ok + invalid".split())
+    assert not calls
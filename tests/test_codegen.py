@@ -0,0 +1,86 @@
+# pylint: disable=missing-function-docstring
+"""Test genbu.codegen."""
+
+import collections
+import typing as t
+
+from hypothesis import given, strategies as st
+import pytest
+
+from genbu import ParserMaker, analysis, codegen, combinators as comb
+from genbu.converters import nonraising
+
+from .strategies import t_hints
+
+
+def nested(parser: comb.Parser, depth: int) -> comb.Parser:
+    """Make grammar that backtracks exponentially without memoization."""
+    for _ in range(depth):
+        parser = comb.Or(*(comb.And(parser, comb.Lit(c)) for c in "ab"))
+    return parser
+
+
+TOKENS = ["1", "-2", "2.5", "1e3", "1j", "x", "a", "b", "yes", "NO", ""]
+
+
+def outcome(parser: comb.Parser, tokens: t.Sequence[str]) -> t.Any:
+    """Return parsed value, empty flag and remaining tokens, or error."""
+    deque = collections.deque(tokens)
+    try:
+        result = parser(deque)
+        return comb.force(result.value), result.empty, list(deque)
+    except comb.CantParse as exc:
+        return "error", exc.parser, exc.tokens
+
+
+def assert_same(parser: comb.Parser, tokens: t.Sequence[str]) -> None:
+    compiled = codegen.compile_parser(parser)
+    assert outcome(compiled, tokens) == outcome(parser, tokens)
+
+
+@pytest.mark.filterwarnings("ignore::genbu.analysis.GrammarWarning")
+@pytest.mark.parametrize("dispatch", [False, True])
+@given(hint=t_hints(), tokens=st.lists(st.sampled_from(TOKENS), max_size=8))
+def test_inferred_parsers(dispatch: bool,
+                          hint: t.Any,
+                          tokens: t.List[str],
+                          ) -> None:
+    assert_same(ParserMaker(dispatch=dispatch).infer_parser(hint), tokens)
+
+
+PARSERS = [
+    comb.And(comb.One(int), comb.Eof()),
+    comb.Or(comb.Eof(), comb.Emit("default")),
+    comb.And(comb.Or(comb.Eof(), comb.One(int)), comb.Emit(0), then=tuple),
+    comb.Repeat(comb.Emit(1)),
+    comb.Repeat(comb.Or(comb.Lit("a"), comb.Repeat(comb.Lit("b")))),
+    comb.Repeat(comb.Try(nonraising(float), name="float"), then=sum),
+    comb.And(comb.Lazy(int), comb.Lazy(int)),
+    comb.Repeat(comb.Or(comb.Lazy(int), comb.Bool())),
+    comb.And(comb.Bool(), comb.Lit("a"), comb.Try(nonraising(int))),
+    comb.Packrat(comb.Repeat(comb.Or(comb.One(int), comb.One(str)))),
+    analysis.Dispatch(comb.Lit("x"), comb.One(int), comb.Bool()),
+    nested(comb.One(int), 3),
+]
+
+
+@pytest.mark.parametrize("parser", PARSERS, ids=str)
+@given(tokens=st.lists(st.sampled_from(TOKENS), max_size=8))
+def test_hand_built_parsers(parser: comb.Parser, tokens: t.List[str]) -> None:
+    assert_same(parser, tokens)
+
+
+def test_shared_sub_parsers_are_compiled_once() -> None:
+    compiled = codegen.compile_parser(nested(comb.One(int), 4))
+    assert compiled.source.count("def ") == 4 * 3  # Or and two Ands
+    tokens = collections.deque(["1", "b", "a", "b", "b"])
+    assert compiled(tokens).value == [[[[1, "b"], "a"], "b"], "b"]
+    assert not tokens
+
+
+def test_compile_parser_is_cached() -> None:
+    parser = comb.Repeat(comb.One(int))
+    compiled = codegen.compile_parser(parser)
+    assert codegen.compile_parser(parser) is compiled
+    assert codegen.compile_parser(compiled) is compiled
+    assert str(compiled) == str(parser)
@@ -259,3 +259,149 @@ def test_nan() -> None:
     parser = comb.One(float)
     result = parser(collections.deque(["nan"]))
     assert math.isnan(result.value)
+
+
+def parse_digits(token: str) -> t.Any:
+    """Non-raising int converter for Try tests."""
+    return int(token) if token.isdigit() else comb.NOTHING
+
+
+@pytest.mark.parametrize("source,expected", [
+    ("5", 5),
+    ("12 foo", 12),
+])
+def test_try_parse_valid(source: str, expected: int) -> None:
+    """Try(f) parser must consume one token if f doesn't return NOTHING."""
+    tokens = as_tokens(source)
+    before = len(tokens)
+    assert comb.Try(parse_digits)(tokens).value == expected
+    assert len(tokens) == before - 1
+
+
+@pytest.mark.parametrize("source", ["", "foo", "-5"])
+def test_try_parse_invalid(source: str) -> None:
+    """Try(f) parser must raise CantParse without consuming tokens."""
+    parser = comb.Try(parse_digits, name="digits")
+    tokens = as_tokens(source)
+    before = tuple(tokens)
+    with pytest.raises(comb.CantParse) as info:
+        parser(tokens)
+    assert info.value.parser is parser
+    assert tuple(tokens) == before
+    assert parser.attempt(tokens) is None
+    assert str(parser) == "digits"
+
+
+def test_try_inside_or_and_repeat() -> None:
+    """Or and Repeat should use the non-raising fast path."""
+    parser = comb.Repeat(comb.Or(comb.Try(parse_digits), comb.Lit("x")))
+    tokens = as_tokens("1 x 2 y 3")
+    assert parser(tokens).value == [1, "x", 2]
+    assert list(tokens) == ["y", "3"]
+
+
+def test_lazy_defers_conversion() -> None:
+    """Lazy parser should convert tokens only when forced (once)."""
+    calls = []
+
+    def convert(token: str) -> int:
+        calls.append(token)
+        return int(token)
+
+    parser = comb.Lazy(convert)
+    tokens = as_tokens("5 x")
+    thunk = parser(tokens).value
+    assert list(tokens) == ["x"]
+    assert not calls
+    assert comb.force([thunk, (thunk,), {thunk: {thunk}}]) == \
+        [5, (5,), {5: {5}}]
+    assert calls == ["5"]
+    assert str(parser) == "convert"
+
+    with pytest.raises(comb.CantParse):
+        comb.force(parser(tokens).value)
+    with pytest.raises(comb.CantParse):
+        parser(tokens)
+
+
+@pytest.mark.parametrize("parser,expected", [
+    (comb.One(int), comb.Lazy),
+    (comb.And(comb.One(int), comb.One(str), then=tuple), comb.And),
+    (comb.Or(comb.One(int), comb.Lit("x")), comb.Or),
+    (comb.Repeat(comb.One(int)), comb.Repeat),
+])
+def test_lazify(parser: comb.Parser, expected: type) -> None:
+    """lazify should only replace One parsers outside of Or and Repeat."""
+    lazy = comb.lazify(parser)
+    assert isinstance(lazy, expected)
+    assert str(lazy) == str(parser)
+    for child in comb.children(lazy):
+        assert isinstance(child, comb.Lazy) == isinstance(lazy, comb.And)
+    tokens = as_tokens("1 2")
+    assert comb.force(lazy(tokens).value) == parser(as_tokens("1 2")).value
+
+
+class TestPackrat:
+    """Test memoized parsers."""
+    @staticmethod
+    def nested(parser: comb.Parser, depth: int) -> comb.Parser:
+        """Make grammar that backtracks exponentially without memoization."""
+        for _ in range(depth):
+            parser = comb.Or(*(comb.And(parser, comb.Lit(c)) for c in "ab"))
+        return parser
+
+    def test_packrat_runs_parser_once_per_position(self) -> None:
+        """Each sub-parser should run at most once per token position."""
+        calls = []
+
+        def convert(token: str) -> int:
+            calls.append(token)
+            return int(token)
+
+        parser = self.nested(comb.One(convert), 10)
+        tokens = ["1"] + ["b"] * 10 + ["rest"]
+        expected = parser(as_tokens(tokens)).value
+        assert len(calls) == 2 ** 10
+
+        calls.clear()
+        packrat = comb.Packrat(self.nested(comb.One(convert), 10))
+        deque = as_tokens(tokens)
+        assert packrat(deque).value == expected
+        assert list(deque) == ["rest"]
+        assert len(calls) == 1
+        assert not packrat.table.entries
+        assert str(packrat) == str(parser)
+
+    @given(st.lists(st.sampled_from(["1", "x", "2.5", "a", "b"])))
+    def test_packrat_matches_plain_parser(self, tokens: t.List[str]) -> None:
+        """Memoized parser should return the same values and errors."""
+        parser: comb.Parser = comb.Repeat(comb.Or(
+            comb.And(comb.One(int), comb.One(str), then=tuple),
+            comb.And(comb.One(int), comb.Lit("a")),
+            comb.One(float),
+        ))
+        parser = comb.And(parser, comb.Or(comb.Lit("b"), comb.Eof()))
+        for packrat in (comb.Packrat(parser), comb.Packrat(parser, 2)):
+            try:
+                expected = parser(as_tokens(tokens)).value
+            except comb.CantParse:
+                with pytest.raises(comb.CantParse):
+                    packrat(as_tokens(tokens))
+            else:
+                assert packrat(as_tokens(tokens)).value == expected
+
+    def test_memo_table_is_bounded(self) -> None:
+        """MemoTable should evict least recently used entries."""
+        table = comb.MemoTable(maxsize=2)
+        parser = comb.Memo(comb.One(int), table)
+        for source in ("1", "1 2", "1 2 3"):
+            parser(as_tokens(source))
+        assert len(table.entries) == 2
+
+    def test_memoize_preserves_shared_sub_parsers(self) -> None:
+        """Shared sub-parsers should be wrapped once."""
+        shared = comb.One(int)
+        memoized = comb.memoize(comb.And(shared, shared), comb.MemoTable())
+        assert isinstance(memoized, comb.Memo)
+        first, second = comb.children(comb.children(memoized)[0])
+        assert first is second
@@ -0,0 +1,88 @@
+# pylint: disable=missing-function-docstring
+"""Test genbu.converters."""
+
+import collections
+import datetime
+import decimal
+import enum
+import ipaddress
+import typing as t
+
+import pytest
+
+from genbu import CantParse, ParserMaker
+from genbu import combinators as comb
+from genbu.converters import (
+    interned, make_datetime_parser, make_enum_parser, nonraising
+)
+
+
+class Color(enum.Enum):
+    """Test enum."""
+    RED = "red"
+    GREEN = "green"
+    BLUE = 3
+
+
+def parse(parser: comb.Parser, *tokens: str) -> t.Any:
+    """Parse tokens and return value."""
+    return parser(collections.deque(tokens)).value
+
+
+def test_nonraising() -> None:
+    func = nonraising(int)
+    assert func("5") == 5
+    assert func("five") is comb.NOTHING
+    with pytest.raises(TypeError):
+        func(None)  # type: ignore
+
+
+def test_interned_returns_same_object() -> None:
+    func = interned(ipaddress.ip_address)
+    assert func("127.0.0.1") is func("127.0.0.1")
+
+
+def test_enum_parser_accepts_values_and_names() -> None:
+    parser = make_enum_parser(Color)
+    assert str(parser) == "Color"
+    assert parse(parser, "red") is Color.RED
+    assert parse(parser, "GREEN") is Color.GREEN
+    assert parse(parser, "BLUE") is Color.BLUE
+    for token in ("3", "blue", "yellow"):
+        with pytest.raises(CantParse):
+            parse(parser, token)
+
+
+def test_datetime_parser_with_formats() -> None:
+    make = make_datetime_parser("%d/%m/%Y", "%Y%m%d")
+    assert parse(make(datetime.date), "31/12/2020") == \
+        datetime.date(2020, 12, 31)
+    assert parse(make(datetime.datetime), "20201231") == \
+        datetime.datetime(2020, 12, 31)
+    with pytest.raises(CantParse):
+        parse(make(datetime.date), "2020-12-31")
+
+
+@pytest.mark.parametrize("hint,token,expected", [
+    (datetime.date, "2021-07-04", datetime.date(2021, 7, 4)),
+    (datetime.datetime, "2021-07-04T10:30",
+     datetime.datetime(2021, 7, 4, 10, 30)),
+    (datetime.time, "10:30", datetime.time(10, 30)),
+    (decimal.Decimal, "1.10", decimal.Decimal("1.10")),
+    (ipaddress.IPv4Address, "10.0.0.1", ipaddress.IPv4Address("10.0.0.1")),
+    (ipaddress.IPv6Network, "::/64", ipaddress.IPv6Network("::/64")),
+    (Color, "green", Color.GREEN),
+])
+def test_default_converters(hint: t.Any, token: str, expected: t.Any) -> None:
+    parser = ParserMaker().infer_parser(hint)
+    assert isinstance(parser, comb.Try)
+    assert parse(parser, token) == expected
+
+
+@pytest.mark.parametrize("hint", [
+    datetime.date, decimal.Decimal, ipaddress.IPv4Address, Color,
+])
+def test_default_converters_on_invalid_input(hint: t.Any) -> None:
+    parser = ParserMaker().infer_parser(hint)
+    with pytest.raises(CantParse):
+        parse(parser, "invalid")
@@ -0,0 +1,170 @@
+# pylint: disable=missing-function-docstring,redefined-outer-name
+"""Test genbu.forkserver."""
+
+import array
+import os
+import pathlib
+import signal
+import socket
+import stat
+import subprocess
+import sys
+import time
+import typing as t
+
+import pytest
+
+from genbu import Genbu
+from genbu import forkclient, forkserver
+
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX") or not hasattr(os, "fork"),
+    reason="requires Unix sockets and fork",
+)
+
+
+def greet(name: str = "world", fail: bool = False) -> str:
+    """Greet name using environment and cwd."""
+    if fail:
+        raise RuntimeError("failed")
+    greeting = os.environ.get("GREETING", "Hello")
+    return f"{greeting}, {name}! ({os.path.basename(os.getcwd())})"
+
+
+@pytest.fixture
+def server(tmp_path: pathlib.Path) -> t.Iterator[str]:
+    """Run fork server in child process and return socket path."""
+    path = str(tmp_path / "genbu.sock")
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover; runs in child
+        try:
+            forkserver.serve(Genbu(greet), path)
+        finally:
+            os._exit(0)  # pylint: disable=protected-access
+
+    for _ in range(500):
+        if os.path.exists(path):
+            break
+        time.sleep(0.01)
+    yield path
+    os.kill(pid, signal.SIGTERM)
+    os.waitpid(pid, 0)
+
+
+def call(path: str,
+         argv: t.List[str],
+         tmp_path: pathlib.Path,
+         env: t.Optional[t.Dict[str, str]] = None,
+         ) -> t.Tuple[int, str, str]:
+    """Call fork server and return exit status, stdout and stderr."""
+    out, err = tmp_path / "out", tmp_path / "err"
+    with open(os.devnull, "rb") as stdin, open(out, "wb") as stdout, \
+            open(err, "wb") as stderr:
+        status = forkclient.call(
+            path,
+            argv,
+            env=env if env is not None else {},
+            cwd=str(tmp_path),
+            fds=(stdin.fileno(), stdout.fileno(), stderr.fileno()),
+        )
+    return status, out.read_text(), err.read_text()
+
+
+def test_call(server: str, tmp_path: pathlib.Path) -> None:
+    status, out, err = call(server, ["--name", "genbu"], tmp_path,
+                            {"GREETING": "Hi"})
+    assert status == 0
+    assert out == f"Hi, genbu! ({tmp_path.name})\n"
+    assert err == ""
+
+    status, out, _ = call(server, [], tmp_path)
+    assert (status, out) == (0, f"Hello, world! ({tmp_path.name})\n")
+
+
+def test_call_with_errors(server: str, tmp_path: pathlib.Path) -> None:
+    status, out, err = call(server, ["--invalid"], tmp_path)
+    assert status == 1
+    assert out == ""
+    assert "greet" in err
+
+    status, out, err = call(server, ["--fail", "true"], tmp_path)
+    assert status == 1
+    assert "RuntimeError: failed" in err
+
+
+def test_exit_status() -> None:
+    assert forkserver.exit_status(None) == 0
+    assert forkserver.exit_status(3) == 3
+    assert forkserver.exit_status("error") == 1
+
+
+def test_main_usage(capsys: pytest.CaptureFixture[str]) -> None:
+    assert forkserver.main(["invalid"]) == 2
+    assert "python -m genbu.forkserver" in capsys.readouterr().err
+    assert forkclient.main([]) == 2
+    assert "forkclient.py SOCKET" in capsys.readouterr().err
+
+
+def test_client_only_imports_standard_library() -> None:
+    code = (
+        "import runpy, sys;"
+        f"runpy.run_path({forkclient.__file__!r}, run_name='client');"
+        "print(sorted(m for m in sys.modules if m.startswith('genbu')))"
+    )
+    output = subprocess.run([sys.executable, "-c", code], check=True,
+                            stdout=subprocess.PIPE, text=True).stdout
+    assert output.strip() == "[]"
+
+
+def test_socket_is_private(server: str) -> None:
+    assert stat.S_IMODE(os.stat(server).st_mode) == 0o600
+
+
+def test_peer_credentials() -> None:
+    left, right = socket.socketpair(socket.AF_UNIX)
+    with left, right:
+        assert forkserver.ForkServer.is_trusted(left)
+        if hasattr(socket, "SO_PEERCRED"):
+            assert forkserver.peer_uid(left) == os.getuid()
+
+
+@pytest.mark.parametrize("header", [
+    [],
+    {"argv": [1], "env": {}, "cwd": "."},
+    {"argv": [], "env": {"A": 1}, "cwd": "."},
+    {"argv": [], "env": {}},
+])
+def test_validate_rejects_invalid_headers(header: t.Any) -> None:
+    with pytest.raises(ValueError):
+        forkserver.validate(header, [0, 1, 2])
+
+
+def test_server_is_not_blocked_by_slow_clients(server: str,
+                                               tmp_path: pathlib.Path,
+                                               ) -> None:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as slow:
+        slow.connect(server)
+        slow.sendall(forkclient.HEADER.pack(100))
+        start = time.perf_counter()
+        assert call(server, [], tmp_path)[0] == 0
+        assert time.perf_counter() - start < forkserver.TIMEOUT
+
+
+def test_server_survives_bad_requests(server: str,
+                                      tmp_path: pathlib.Path,
+                                      ) -> None:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(server)
+        conn.sendall(b"\0")
+    assert call(server, [], tmp_path)[0] == 0
+
+    fds = array.array("i", forkclient.STDIO).tobytes()
+    for payload in (b"[]", b"{", b'{"argv": 1}', b'{"argv": []}'):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.connect(server)
+            conn.sendmsg(
+                [forkclient.HEADER.pack(len(payload)), payload],
+                [(socket.SOL_SOCKET, socket.SCM_RIGHTS, fds)],
+            )
+    assert call(server, [], tmp_path)[0] == 0
@@ -0,0 +1,38 @@
+"""Regression tests for slow parses found by benchmarks/fuzz.py."""
+
+import json
+import os
+import time
+import typing as t
+
+import pytest
+
+from genbu import CLError, Genbu
+
+from . import strategies
+
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures",
+                        "slow_parses.json")
+# Generous bound (in seconds), so that loaded CI runners don't fail. The
+# regressions that these guard against were orders of magnitude slower.
+BUDGET = 5.0
+
+
+def load_cases() -> t.List[t.Dict[str, t.Any]]:
+    """Load saved slow parses."""
+    with open(FIXTURES, encoding="utf-8") as file:
+        return t.cast(t.List[t.Dict[str, t.Any]], json.load(file))
+
+
+@pytest.mark.parametrize("case", load_cases())
+def test_slow_parse_stays_fast(case: t.Dict[str, t.Any]) -> None:
+    """Parse time should stay within budget."""
+    hints = list(map(strategies.load_hint, case["hints"]))
+    cli = Genbu(strategies.make_callback(hints))
+    start = time.perf_counter()
+    try:
+        Genbu.parse_optargs(cli, case["argv"])
+    except CLError:
+        pass
+    assert time.perf_counter() - start < max(BUDGET, 100 * case["seconds"])
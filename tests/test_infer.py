@@ -9,8 +9,10 @@ from hypothesis import example, given, strategies as st
 import pytest
 
 from genbu import CantParse
-from genbu.combinators import Parser
-from genbu.infer import infer_parser
+from genbu.combinators import Bool, Emit, Lit, One, Parser, Try
+from genbu.infer import (
+    CacheInfo, ParserMaker, default_parser_maker, infer_parser
+)
 
 from . import strategies
 
@@ -571,3 +573,77 @@ def test_empty_tuple(hint: t.Any, tokens: t.List[str]) -> None:
     assert before == after
     assert not result.empty
     assert result.value == ()
+
+
+class TestParserMaker:
+    """Test ParserMaker cache."""
+    def test_cache_info_counts_hits_and_misses(self) -> None:
+        maker = ParserMaker()
+        assert maker.cache_info() == CacheInfo(0, 0, None, 0)
+
+        parser = maker.infer_parser(int)
+        assert maker.infer_parser(int) is parser
+        maker.infer_parser(bool)
+        assert maker.cache_info() == CacheInfo(2, 1, None, 1)
+
+        maker.cache_clear()
+        assert maker.cache_info() == CacheInfo(0, 0, None, 0)
+        assert maker.infer_parser(int) is not parser
+
+    def test_bounded_cache_evicts_least_recently_used_parser(self) -> None:
+        maker = ParserMaker(maxsize=2)
+        int_parser = maker.infer_parser(int)
+        maker.infer_parser(float)
+        assert maker.infer_parser(int) is int_parser
+        maker.infer_parser(str)
+
+        assert list(maker.parsers) == [int, str]
+        assert maker.cache_info().currsize == 2
+        assert maker.infer_parser(int) is int_parser
+
+    def test_pinned_parsers_are_never_evicted(self) -> None:
+        maker = ParserMaker(maxsize=0)
+        assert isinstance(maker.infer_parser(bool), Bool)
+        assert isinstance(maker.infer_parser(None), Emit)
+        assert maker.cache_info().currsize == 0
+
+    def test_isolated_maker_does_not_touch_default_cache(self) -> None:
+        class Custom:  # pylint: disable=too-few-public-methods
+            """Custom type."""
+            def __init__(self, arg: str):
+                self.arg = arg
+
+        maker = ParserMaker()
+        maker.infer_parser(t.List[Custom])
+        assert Custom in maker.parsers
+        assert Custom not in default_parser_maker.parsers
+
+    def test_invalid_maxsize(self) -> None:
+        with pytest.raises(ValueError):
+            ParserMaker(maxsize=-1)
+
+
+class TestRegistry:
+    """Test ParserMaker.register."""
+    def test_registered_maker_applies_to_subclasses(self) -> None:
+        class Base(str):
+            """Base class."""
+
+        class Derived(Base):
+            """Derived class."""
+
+        maker = ParserMaker()
+        maker.register(Base, lambda hint: Lit(hint("ok")))
+        parser = maker.infer_parser(t.List[Derived])
+        assert parser(collections.deque(["ok", "ok", "no"])).value == \
+            ["ok", "ok"]
+
+    def test_register_invalidates_cached_parsers(self) -> None:
+        maker = ParserMaker()
+        assert isinstance(maker.infer_parser(complex), One)
+
+        maker.register(complex, lambda hint: Try(lambda _: 0j))
+        assert isinstance(maker.infer_parser(complex), Try)
+
+        maker.unregister(complex)
+        assert isinstance(maker.infer_parser(complex), One)
@@ -7,6 +7,7 @@ import typing as t
 from hypothesis import given, strategies as st
 import pytest
 
+from genbu.infer import ParserMaker
 from genbu.infer_params import (
     UnsupportedCallback, infer_params_from_signature as infer
 )
@@ -69,3 +70,14 @@ def test_infer_raises_unsupported_callback_if_it_has_no_signature(func: t.Any,
         infer(func)
     assert info.type is UnsupportedCallback
     assert info.value.callback is func
+
+
+def test_infer_with_custom_parser_maker() -> None:
+    def function(arg: int, args: t.List[float]) -> None:
+        """Does nothing."""
+
+    maker = ParserMaker()
+    params = infer(function, maker)
+    assert [str(p.parser) for p in params] == ["int", "[float...]"]
+    assert int in maker.parsers
+    assert float in maker.parsers
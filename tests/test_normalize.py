@@ -0,0 +1,90 @@
+# pylint: disable=missing-function-docstring
+"""Test genbu.normalize."""
+
+import typing as t
+
+import pytest
+
+from genbu import Param, UnknownOption, combinators as comb
+from genbu.normalize import OptionTable, normalize
+
+
+PARAMS = [
+    Param("a", ["-a"], comb.Emit(True)),
+    Param("b", ["-b"], comb.Emit(True)),
+    Param("n", ["-n", "--num"], comb.One(int)),
+    Param("x", parser=comb.Repeat(comb.One(float))),
+]
+
+
+def test_option_table() -> None:
+    table = OptionTable(PARAMS)
+    assert table.short == {"a": False, "b": False, "n": True}
+    assert not table.numeric_options
+    assert OptionTable([Param("one", ["-1"], comb.Emit(1))]).numeric_options
+    assert not table.optional
+
+
+OPTIONAL = [
+    Param("a", ["-a"], comb.Or(comb.One(int), comb.Emit(0))),
+    Param("b", ["-b"], comb.Emit(True)),
+]
+
+
+@pytest.mark.parametrize("argv,options,arguments", [
+    ("-ab", [["-a"], ["-b"]], []),
+    ("-ba", [["-b"], ["-a"]], []),
+    ("-ba 1", [["-b"], ["-a", "1"]], []),
+    ("-a1", [["-a", "1"]], []),
+    ("-a=b", [["-a", "b"]], []),
+    ("-ac", [["-a", "c"]], []),
+])
+def test_options_with_optional_arguments_can_be_stacked(
+    argv: str,
+    options: t.List[t.List[str]],
+    arguments: t.List[str],
+) -> None:
+    assert OptionTable(OPTIONAL).optional == {"a"}
+    normalized = normalize(OPTIONAL, argv.split())
+    assert normalized.options == options
+    assert normalized.arguments == arguments
+
+
+@pytest.mark.parametrize("argv,options,arguments", [
+    ("-ab", [["-a"], ["-b"]], []),
+    ("-ba 1", [["-b"], ["-a"]], ["1"]),
+    ("-abn5", [["-a"], ["-b"], ["-n", "5"]], []),
+    ("-abn=5", [["-a"], ["-b"], ["-n", "5"]], []),
+    ("-abn 5", [["-a"], ["-b"], ["-n", "5"]], []),
+    ("-n -5", [["-n", "-5"]], []),
+    ("-5 -1.5 -.5", [], ["-5", "-1.5", "-.5"]),
+    ("- -a", [["-a"]], ["-"]),
+    ("-a=foo", [["-a", "foo"]], []),
+    ("-a4", [["-a", "4"]], []),
+])
+def test_normalize_short_options(argv: str,
+                                 options: t.List[t.List[str]],
+                                 arguments: t.List[str],
+                                 ) -> None:
+    normalized = normalize(PARAMS, argv.split())
+    assert normalized.options == options
+    assert normalized.arguments == arguments
+
+
+@pytest.mark.parametrize("token,option", [
+    ("-c", "-c"),
+    ("-cab", "-cab"),
+    ("-c=1", "-c"),
+    ("-5a", "-5a"),
+])
+def test_normalize_unknown_short_options(token: str, option: str) -> None:
+    with pytest.raises(UnknownOption) as info:
+        normalize(PARAMS, [token])
+    assert info.value.option == option
+
+
+def test_numeric_options_disable_negative_number_arguments() -> None:
+    params = [Param("one", ["-1"], comb.Emit(1))]
+    assert normalize(params, ["-1"]).options == [["-1"]]
+    with pytest.raises(UnknownOption):
+        normalize(params, ["-5"])
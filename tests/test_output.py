@@ -0,0 +1,128 @@
+# pylint: disable=missing-function-docstring
+"""Test genbu.output."""
+
+import io
+import pathlib
+import subprocess
+import sys
+import textwrap
+import tracemalloc
+import typing as t
+
+import pytest
+
+from genbu import Genbu, output
+
+
+def text_stream() -> io.TextIOWrapper:
+    return io.TextIOWrapper(io.BytesIO(), encoding="utf-8", newline="")
+
+
+def written(stream: io.TextIOWrapper) -> bytes:
+    stream.flush()
+    return t.cast(io.BytesIO, stream.buffer).getvalue()
+
+
+@pytest.mark.parametrize("result,expected", [
+    (None, b""),
+    ("hello", b"hello\n"),
+    ([1, 2], b"[1, 2]\n"),
+    (b"\x00raw", b"\x00raw"),
+    (iter(["a", "b"]), b"a\nb\n"),
+    ((x for x in ["a", b"b\n", 3]), b"a\nb\n3\n"),
+])
+def test_write_text(result: t.Any, expected: bytes) -> None:
+    stream = text_stream()
+    output.write(result, stream)
+    assert written(stream) == expected
+
+
+def test_write_without_binary_buffer() -> None:
+    stream = io.StringIO()
+    output.write(iter([b"a\n", "b"]), stream)
+    assert stream.getvalue() == "a\nb\n"
+
+
+@pytest.mark.parametrize("output_format,result,expected", [
+    ("json", {"a": [1, 2]}, '{"a":[1,2]}\n'),
+    ("json", iter([1, "x"]), '[1,"x"]\n'),
+    ("json", iter(()), "[]\n"),
+    ("json", {1}, "[1]\n"),
+    ("ndjson", [1, {"b": None}], '1\n{"b":null}\n'),
+    ("ndjson", (x for x in "ab"), '"a"\n"b"\n'),
+    ("ndjson", pathlib.PurePosixPath("a/b"), '"a/b"\n'),
+])
+def test_write_json(output_format: str, result: t.Any, expected: str) -> None:
+    stream = io.StringIO()
+    output.write(result, stream, output=output_format)
+    assert stream.getvalue() == expected
+
+
+def test_write_files(tmp_path: pathlib.Path) -> None:
+    source = tmp_path / "source"
+    source.write_bytes(b"x" * 100000 + b"\n")
+    target = tmp_path / "target"
+
+    with open(target, "w", encoding="utf-8") as stream:
+        stream.write("head\n")
+        file = open(source, "rb")  # pylint: disable=consider-using-with
+        output.write(file, stream)
+        assert file.closed
+        stream.write("tail\n")
+    assert target.read_bytes() == b"head\n" + source.read_bytes() + b"tail\n"
+
+    stream = text_stream()
+    output.write(io.BytesIO(b"bytes"), stream)
+    output.write(io.StringIO("text"), stream)
+    assert written(stream) == b"bytestext"
+
+
+def test_streaming_memory_stays_flat() -> None:
+    class Sink(io.TextIOBase):
+        """Text stream that discards writes."""
+        def write(self, text: str) -> int:
+            return len(text)
+
+    lines = ("x" * 100 for _ in range(100000))
+    tracemalloc.start()
+    try:
+        output.write(lines, t.cast(t.TextIO, Sink()))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak < 1 << 20
+
+
+def test_main(capsys: pytest.CaptureFixture[str]) -> None:
+    def count(n: int) -> t.Iterator[int]:
+        return iter(range(n))
+
+    cli = Genbu(count)
+    cli.main(["--n", "3"])
+    cli.main(["--n", "2"], output_format="json")
+    assert capsys.readouterr().out == "0\n1\n2\n[0,1]\n"
+
+
+def test_main_checks_output_format_before_running_callback() -> None:
+    calls: t.List[None] = []
+    cli = Genbu(lambda: calls.append(None), name="touch")
+    with pytest.raises(ValueError):
+        cli.main([], output_format="yaml")
+    assert not calls
+
+
+def test_main_exits_quietly_on_broken_pipe() -> None:
+    code = textwrap.dedent("""
+        from genbu import Genbu
+        Genbu(lambda: (str(i) for i in range(10 ** 7)), name="seq").main()
+    """)
+    with subprocess.Popen(
+        [sys.executable, "-c", code],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    ) as process:
+        assert process.stdout is not None and process.stderr is not None
+        assert process.stdout.readline() == b"0\n"
+        process.stdout.close()
+        assert process.wait(timeout=60) == 1
+        assert process.stderr.read() == b""
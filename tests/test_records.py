@@ -0,0 +1,184 @@
+# pylint: disable=missing-function-docstring,unused-argument
+# pylint: disable=too-few-public-methods
+"""Test genbu.records."""
+
+import dataclasses
+import sys
+import typing as t
+
+import pytest
+
+from genbu import Genbu, MissingArgument, UnsupportedType, infer_params
+from genbu.records import get_record
+
+
+@dataclasses.dataclass
+class Database:
+    """Database config."""
+    host: str
+    port: int = 5432
+    tags: t.List[str] = dataclasses.field(default_factory=list)
+
+
+class Point(t.NamedTuple):
+    """Point."""
+    x: float
+    y: float = 0.0
+
+
+@dataclasses.dataclass
+class Config:
+    """Nested config."""
+    db: Database
+    origin: Point = Point(0.0)
+    verbose: bool = False
+
+
+@dataclasses.dataclass
+class Loop:
+    """Self-referential record."""
+    loop: "Loop"
+
+
+class Left(t.NamedTuple):
+    """Mutually recursive record."""
+    right: "Right"
+
+
+class Right(t.NamedTuple):
+    """Mutually recursive record."""
+    left: Left
+
+
+def test_get_record_returns_none_for_other_types() -> None:
+    for hint in (int, str, t.List[int], [int], None, tuple, dict):
+        assert get_record(hint) is None
+
+
+def test_get_record_is_cached() -> None:
+    assert get_record(Config) is get_record(Config)
+
+
+@pytest.mark.parametrize("hint", [Loop, Left, Right])
+def test_get_record_rejects_recursive_records(hint: type) -> None:
+    for _ in range(2):
+        with pytest.raises(UnsupportedType):
+            get_record(hint)
+
+    def callback(value: hint) -> None:  # type: ignore
+        """Does nothing."""
+
+    with pytest.raises(UnsupportedType):
+        infer_params(callback)
+
+
+def test_record_leaves() -> None:
+    record = get_record(Config)
+    assert record is not None
+    assert [leaf.path for leaf in record.leaves] == [
+        "db.host", "db.port", "db.tags", "origin.x", "origin.y", "verbose",
+    ]
+
+
+def test_record_build() -> None:
+    record = get_record(Config)
+    assert record is not None
+    config = record.build({"c.db.host": "localhost"}, "c")
+    assert config == Config(Database("localhost"))
+
+    values = {"c.db.host": "localhost", "c.origin.y": 1.0}
+    assert record.build(values, "c").origin == Point(0.0, 1.0)
+    record.check(values, "c")
+
+    with pytest.raises(MissingArgument) as info:
+        record.build({"c.db.port": 1}, "c")
+    assert info.value.name == "c.db.host"
+    with pytest.raises(MissingArgument) as info:
+        record.check({"c.db.port": 1}, "c")
+    assert info.value.name == "c.db.host"
+
+
+@pytest.mark.skipif(sys.version_info < (3, 9), reason="requires python 3.9")
+def test_typeddict_record() -> None:
+    class Options(t.TypedDict, total=False):  # type: ignore  # noqa
+        """Options."""
+        name: str
+        count: int
+
+    record = get_record(Options)
+    assert record is not None
+    assert record.build({"o.count": 1}, "o") == {"count": 1}
+
+
+def test_infer_params_expands_records() -> None:
+    def callback(config: Config, dry_run: bool = False) -> None:
+        """Does nothing."""
+
+    params = infer_params(callback)
+    assert [p.optargs for p in params] == [
+        ["--config.db.host"],
+        ["--config.db.port"],
+        ["--config.db.tags"],
+        ["--config.origin.x"],
+        ["--config.origin.y"],
+        ["--config.verbose"],
+        ["--dry_run"],
+    ]
+    assert str(params[2].parser) == "[str...]"
+
+
+def test_genbu_builds_records_at_bind_time() -> None:
+    def callback(config: Config) -> Config:
+        """Return config."""
+        return config
+
+    cli = Genbu(callback)
+    argv = "--config.db.host db --config.db.tags a b --config.origin.x 1"
+    assert cli.run(argv.split()) == Config(
+        Database("db", tags=["a", "b"]),
+        Point(1.0),
+    )
+
+    with pytest.raises(SystemExit):
+        cli.run(["--config.verbose", "true"])
+
+
+FACTORY_CALLS: t.List[None] = []
+
+
+def make_database() -> Database:
+    FACTORY_CALLS.append(None)
+    return Database("default")
+
+
+@dataclasses.dataclass
+class Service:
+    """Record with default factory."""
+    db: Database = dataclasses.field(default_factory=make_database)
+    name: str = "service"
+
+
+def test_records_are_built_once_at_bind_time() -> None:
+    def callback(service: Service) -> Service:
+        """Return service."""
+        return service
+
+    FACTORY_CALLS.clear()
+    cli = Genbu(callback)
+    assert cli.run(["--service.name", "x"]) == \
+        Service(Database("default"), "x")
+    assert len(FACTORY_CALLS) == 1
+
+    assert cli.run(["--service.db.port", "1"]) == \
+        Service(Database("default", 1))
+    assert len(FACTORY_CALLS) == 2
+
+
+def test_record_with_default_is_optional() -> None:
+    def callback(point: Point = Point(5.0, 5.0)) -> Point:
+        """Return point."""
+        return point
+
+    cli = Genbu(callback)
+    assert cli.run([]) == Point(5.0, 5.0)
+    assert cli.run(["--point.x", "1"]) == Point(1.0)
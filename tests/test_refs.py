@@ -0,0 +1,49 @@
+# pylint: disable=missing-function-docstring
+"""Test genbu.refs."""
+
+import enum
+import json
+import os.path
+import typing as t
+
+import pytest
+
+from genbu import refs
+from genbu.cli import Genbu
+
+
+def test_resolve() -> None:
+    assert refs.resolve("genbu.cli:Genbu") is Genbu
+    assert refs.resolve("genbu.cli:Genbu.run") is Genbu.run
+    assert refs.resolve("os:path.join") is os.path.join
+
+
+@pytest.mark.parametrize("ref", ["genbu.cli", "genbu.cli:", ":Genbu"])
+def test_resolve_invalid_reference(ref: str) -> None:
+    with pytest.raises(ValueError):
+        refs.resolve(ref)
+
+
+class Color(enum.Enum):
+    """Enum for reference tests."""
+    RED = "red"
+
+
+@pytest.mark.parametrize("obj,expected", [
+    (Genbu, "genbu.cli:Genbu"),
+    (Genbu.run, "genbu.cli:Genbu.run"),
+    (Color.RED, "tests.test_refs:Color.RED"),
+    (lambda: None, None),
+    (json.dumps, "json:dumps"),
+    (1, None),
+])
+def test_reference(obj: t.Any, expected: t.Optional[str]) -> None:
+    assert refs.reference(obj) == expected
+    if expected is not None:
+        assert refs.resolve(expected) is obj
+
+
+def test_reference_of_local_function() -> None:
+    def local() -> None:
+        pass
+    assert refs.reference(local) is None
@@ -0,0 +1,53 @@
+# pylint: disable=missing-function-docstring
+"""Test genbu.remote."""
+
+import os
+import typing as t
+
+import pytest
+
+from genbu import Genbu, remote
+
+
+def add(a: int, b: int = 0) -> int:
+    """Add numbers."""
+    return a + b
+
+
+def pid() -> int:
+    """Return process ID."""
+    return os.getpid()
+
+
+def tool() -> None:
+    """Tool."""
+
+
+cli = Genbu(tool, subparsers=[Genbu(add), Genbu(pid)])
+
+
+@pytest.mark.parametrize("definition", [cli, "tests.test_remote:cli"])
+def test_run(definition: t.Any) -> None:
+    with remote.Remote(definition, processes=2) as pool:
+        assert pool.run(["add", "--a", "1", "--b", "2"]) == 3
+        assert pool.run(["pid"]) != os.getpid()
+        assert pool.submit(["add", "--a", "5"]).result() == 5
+
+
+def test_map_keeps_order() -> None:
+    argvs = [["add", "--a", str(i), "--b", "1"] for i in range(50)]
+    with remote.Remote(cli, processes=2) as pool:
+        assert list(pool.map(argvs, chunksize=8)) == list(range(1, 51))
+        assert not list(pool.map([]))
+
+
+def test_errors_propagate() -> None:
+    with remote.Remote(cli, processes=1) as pool:
+        with pytest.raises(SystemExit):
+            pool.run(["add", "--a", "x"])
+        assert pool.run(["add", "--a", "1"]) == 1
+
+
+def test_build_rejects_non_genbu_reference() -> None:
+    with pytest.raises(TypeError):
+        remote.build("tests.test_remote:add")
@@ -0,0 +1,104 @@
+# pylint: disable=missing-function-docstring
+"""Test genbu.runloop."""
+
+import io
+import pathlib
+import typing as t
+
+import pytest
+
+from genbu import Genbu, runloop
+
+
+def add(a: int, b: int = 0) -> int:
+    """Add numbers."""
+    return a + b
+
+
+def fail(code: t.Optional[int] = None) -> None:
+    """Exit or raise."""
+    if code is None:
+        raise RuntimeError("failed")
+    raise SystemExit(code)
+
+
+def tool() -> None:
+    """Tool."""
+
+
+cli = Genbu(tool, subparsers=[
+    Genbu(add),
+    Genbu(fail),
+    Genbu(lambda n=3: (str(i) for i in range(int(n))), name="count"),
+])
+
+LINES = [
+    "add --a 1 --b 2\n",
+    "\n",
+    "  # comment\n",
+    "add --a 'x'\n",
+    "fail --code 0\n",
+    "fail --code 2\n",
+    "fail\n",
+    "add --a \"unclosed\n",
+    "count\n",
+]
+EXPECTED = [
+    (1, 3, None),
+    (4, None, "tool add: cannot parse int from ''"),
+    (5, None, None),
+    (6, None, "2"),
+    (7, None, "RuntimeError: failed"),
+    (8, None, "ValueError: No closing quotation"),
+]
+
+
+@pytest.mark.parametrize("jobs,processes", [(0, False), (2, False),
+                                            (2, True)])
+def test_run_lines(jobs: int, processes: bool) -> None:
+    definition = "tests.test_runloop:cli" if processes else cli
+    records = list(runloop.run_lines(definition, LINES, jobs=jobs,
+                                     processes=processes, chunksize=2))
+    assert [tuple(r) for r in records[:-1]] == EXPECTED
+    assert records[-1].line == 9
+    assert list(records[-1].result) == ["0", "1", "2"]
+
+
+def test_run_lines_keeps_order() -> None:
+    lines = [f"add --a {i}" for i in range(1000)]
+    records = runloop.run_lines("tests.test_runloop:cli", lines, jobs=4,
+                                chunksize=7)
+    assert [r.result for r in records] == list(range(1000))
+
+
+def test_write_records() -> None:
+    records = list(runloop.run_lines(cli, LINES))
+    stream, errors = io.StringIO(), io.StringIO()
+    assert runloop.write_records(records, stream, errors) == 4
+    assert stream.getvalue() == "3\n0\n1\n2\n"
+    assert errors.getvalue().splitlines()[0] == \
+        "line 4: tool add: cannot parse int from ''"
+
+    stream = io.StringIO()
+    lines = ["add --a 1", "fail", "count"]
+    assert runloop.write_records(runloop.run_lines(cli, lines), stream,
+                                 output_format="ndjson") == 1
+    assert stream.getvalue() == (
+        '{"line":1,"result":1}\n'
+        '{"line":2,"error":"RuntimeError: failed"}\n'
+        '{"line":3,"result":["0","1","2"]}\n'
+    )
+
+
+def test_main(tmp_path: pathlib.Path,
+              capsys: pytest.CaptureFixture[str],
+              ) -> None:
+    path = tmp_path / "lines"
+    path.write_text("add --a 1\nadd --a 2 --b 3\n")
+    assert runloop.main(["tests.test_runloop:cli", str(path), "-j", "2"]) == 0
+    assert capsys.readouterr().out == "1\n5\n"
+
+    path.write_text("add --a 1\nadd\n")
+    assert runloop.main(["tests.test_runloop:cli", str(path),
+                         "-o", "ndjson"]) == 1
+    assert capsys.readouterr().out.splitlines()[0] == '{"line":1,"result":1}'
@@ -0,0 +1,306 @@
+# pylint: disable=missing-function-docstring
+"""Test genbu.schema."""
+
+import collections
+import datetime
+import decimal
+import enum
+import ipaddress
+import json
+import sys
+import typing as t
+
+import pytest
+
+from genbu import (
+    CLError, Genbu, Param, combinators as comb, infer_parser, schema,
+)
+from genbu.aggregators import Count, Sum
+from genbu.converters import make_datetime_parser
+from genbu.infer import ParserMaker, default_parser_maker
+
+if sys.version_info >= (3, 8):
+    Mode = t.Literal["fast", "slow"]  # pylint: disable=no-member
+else:  # pragma: no cover
+    Mode = str
+
+CALLS: t.List[str] = []
+
+
+def record(token: str) -> str:
+    """Converter that records calls."""
+    CALLS.append(token)
+    return token
+
+
+def run(mode: Mode, count: int, ratio: float = 0.5,
+        files: t.Optional[t.List[str]] = None,
+        verbose: int = 0,
+        ) -> t.Any:
+    """Run."""
+    return mode, count, ratio, files, verbose
+
+
+def make_cli() -> Genbu:
+    return Genbu(
+        lambda: None,
+        name="tool",
+        subparsers=[
+            Genbu(run, params=[
+                "...",
+                Param("files", ["--files"], comb.Repeat(comb.One(record))),
+                Param("verbose", ["-v"], comb.Emit(True), aggregator=Count()),
+            ]),
+        ],
+    )
+
+
+def test_export_is_json() -> None:
+    exported = schema.export(make_cli())
+    assert json.loads(schema.dumps(make_cli())) == exported
+    assert exported["name"] == "tool"
+
+    command = exported["commands"]["run"]
+    assert command["required"] == ["mode", "count"]
+    params = {p["dest"]: p for p in command["params"]}
+    assert params["count"]["parser"] == {
+        "type": "one", "name": "int", "kind": "integer",
+    }
+    assert params["verbose"]["aggregator"] == "count"
+    assert params["verbose"]["parser"] == {"type": "emit", "value": True}
+    assert params["files"]["parser"]["type"] == "repeat"
+    if sys.version_info >= (3, 8):
+        assert params["mode"]["parser"] == {"type": "or", "parsers": [
+            {"type": "lit", "value": "fast"},
+            {"type": "lit", "value": "slow"},
+        ]}
+
+
+@pytest.mark.parametrize("argv", [
+    "run --mode fast --count 5",
+    "run --mode slow --count -5 --ratio 1e3 --files a b -vv",
+    "",
+])
+def test_validate_valid_argv(argv: str) -> None:
+    exported = json.loads(schema.dumps(make_cli()))
+    CALLS.clear()
+    schema.validate(exported, argv.split())
+    assert not CALLS
+
+
+@pytest.mark.parametrize("argv", [
+    "run --mode fast --count five",
+    "run --mode fast --count 5 --ratio x",
+    "run --count 5",
+    "run --mode fast --count 5 --invalid",
+    "invalid",
+])
+def test_validate_invalid_argv(argv: str) -> None:
+    exported = schema.export(make_cli())
+    with pytest.raises(CLError):
+        schema.validate(exported, argv.split())
+
+
+def test_validate_literal_choices() -> None:
+    if sys.version_info < (3, 8):  # pragma: no cover
+        pytest.skip("requires typing.Literal")
+    exported = schema.export(make_cli())
+    with pytest.raises(CLError):
+        schema.validate(exported, "run --mode medium --count 5".split())
+
+
+def test_unknown_parsers_accept_any_token() -> None:
+    class Custom(comb.Parser):
+        """Custom parser."""
+        def __str__(self) -> str:
+            return "custom"
+
+        def parse(self, tokens: comb.Tokens) -> comb.Result:
+            raise comb.CantParse(self, tokens)
+
+    node = schema.export_parser(comb.Packrat(comb.And(Custom(), comb.Eof())))
+    assert node == {"type": "and", "parsers": [
+        {"type": "one", "name": "custom", "kind": "any"},
+        {"type": "eof"},
+    ]}
+    parser = schema.load_parser(node)
+    assert parser(collections.deque(["x"])).value == ["x"]
+
+
+class Color(enum.Enum):
+    """Color."""
+    RED = "red"
+    BLUE = "blue"
+
+
+def paint(color: Color,
+          when: datetime.date,
+          amount: decimal.Decimal,
+          sizes: t.Optional[t.List[int]] = None,
+          total: int = 0,
+          ) -> t.Any:
+    """Paint."""
+    return color, when, amount, sizes, total
+
+
+def pair(values: t.Sequence[t.Any]) -> t.Tuple[t.Any, ...]:
+    """Turn parsed values into tuple."""
+    return tuple(values)
+
+
+def make_ref_cli() -> Genbu:
+    return Genbu(
+        paint,
+        params=[
+            "...",
+            Param("total", ["-n"], comb.One(int),
+                  aggregator=Sum(10), env=["TOTAL"]),
+            Param("point", ["--point"], comb.Packrat(
+                comb.And(comb.One(int), comb.Lit(("x", 1)), then=pair),
+                maxsize=16,
+            )),
+        ],
+        error_handler=schema.raise_error,
+    )
+
+
+def mix(colors: t.List[Color]) -> t.List[Color]:
+    """Mix colors."""
+    return colors
+
+
+@pytest.mark.parametrize("argv", [
+    "--colors red BLUE",
+    "--colors red purple",
+    "--colors RED Red",
+    "--colors",
+])
+def test_validator_agrees_with_cli_on_enum_lists(argv: str) -> None:
+    cli = Genbu(mix, error_handler=schema.raise_error)
+    try:
+        cli.run(argv.split())
+    except CLError:
+        with pytest.raises(CLError):
+            schema.validate(schema.export(cli), argv.split())
+    else:
+        schema.validate(schema.export(cli), argv.split())
+
+
+@pytest.mark.parametrize("argv,valid", [
+    ("--color red --when 2020-01-02 --amount 1.5", True),
+    ("--color red --when 2020-13-02 --amount 1.5", False),
+    ("--color red --when 2020-01-02 --amount x", False),
+])
+def test_validate_registered_converter_kinds(argv: str, valid: bool) -> None:
+    if sys.version_info < (3, 7):  # pragma: no cover
+        pytest.skip("requires fromisoformat")
+    exported = schema.export(Genbu(paint))
+    assert exported["params"][0]["parser"]["kind"] == "choice"
+    if valid:
+        schema.validate(exported, argv.split())
+    else:
+        with pytest.raises(CLError):
+            schema.validate(exported, argv.split())
+
+
+def test_export_ip_kinds_and_datetime_formats() -> None:
+    maker = ParserMaker()
+    maker.register(datetime.date, make_datetime_parser("%d/%m/%Y"))
+    ip_node = schema.export_parser(maker.infer_parser(ipaddress.IPv6Network))
+    date_node = schema.export_parser(maker.infer_parser(datetime.date))
+    assert ip_node["kind"] == "ipv6_network"
+    assert date_node["formats"] == ["%d/%m/%Y"]
+
+    assert schema.load_parser(ip_node)(collections.deque(["::/0"]))
+    assert schema.load_parser(date_node)(collections.deque(["02/01/2020"]))
+    for node, token in [(ip_node, "::1/0"), (date_node, "2020-01-02")]:
+        with pytest.raises(comb.CantParse):
+            schema.load_parser(node)(collections.deque([token]))
+
+
+def test_load_rebuilds_genbu_tree() -> None:
+    cli = make_ref_cli()
+    exported = json.loads(schema.dumps(cli, refs=True))
+    assert exported["callback"] == "tests.test_schema:paint"
+    loaded = schema.load(exported)
+
+    argv = [
+        "--color", "blue", "--when", "2020-01-02", "--amount", "1.5",
+        "--sizes", "1", "2", "-n", "3", "-n", "4",
+    ]
+    assert loaded.run(argv) == cli.run(argv) == (
+        Color.BLUE, datetime.date(2020, 1, 2), decimal.Decimal("1.5"),
+        [1, 2], 17,
+    )
+    params = {p.dest: p for p in loaded.params}
+    assert params["total"].env == ["TOTAL"]
+    assert params["color"].parser is infer_parser(Color)
+
+    point = params["point"].parser
+    assert isinstance(point, comb.Packrat)
+    assert point.table.maxsize == 16
+    assert point(collections.deque(["1", "('x', 1)"])).value == (1, ("x", 1))
+    with pytest.raises(CLError):
+        loaded.run(["--color", "green"])
+
+
+def test_export_refs_rejects_local_functions() -> None:
+    with pytest.raises(ValueError):
+        schema.export(make_cli(), refs=True)
+    with pytest.raises(ValueError):
+        schema.export(Genbu(paint, params=[
+            Param("color", ["--color"], comb.One(lambda s: s)),
+        ]), refs=True)
+
+
+def test_export_refs_rejects_custom_parser_makers() -> None:
+    maker = ParserMaker()
+    maker.register(Color, lambda _: comb.One(str.upper))
+    with pytest.raises(ValueError):
+        schema.export(Genbu(paint, parser_maker=maker), refs=True)
+
+
+class Shade(enum.Enum):
+    """Shade."""
+    DARK = "dark"
+
+
+def shade(value: Shade) -> Shade:
+    """Return shade."""
+    return value
+
+
+def test_export_refs_of_evicted_parsers(monkeypatch: pytest.MonkeyPatch,
+                                        ) -> None:
+    monkeypatch.setattr(default_parser_maker, "maxsize", 0)
+    cli = Genbu(shade)
+    assert Shade not in default_parser_maker.parsers
+    exported = schema.export(cli, refs=True)
+    assert exported["params"][0]["parser"]["hint"] == "tests.test_schema:Shade"
+    assert schema.load(exported).run(["--value", "dark"]) is Shade.DARK
+
+
+def test_validate_params_with_sources(monkeypatch: pytest.MonkeyPatch,
+                                      ) -> None:
+    def login(token: str) -> str:
+        return token
+
+    cli = Genbu(login, params=[
+        Param("token", ["--token"], comb.One(str), env=["TOKEN"]),
+    ])
+    monkeypatch.setenv("TOKEN", "secret")
+    assert cli.run([]) == "secret"
+    exported = schema.export(cli)
+    assert exported["required"] == []
+    schema.validate(exported, [])
+
+
+def test_validate_inherited_options() -> None:
+    cli = Genbu(lambda: None, name="tool", subparsers=[
+        Genbu(lambda: None, name="sub"),
+    ], inherited=[Param("verbose", ["-v"], comb.Emit(True))])
+    exported = json.loads(schema.dumps(cli))
+    assert [p["dest"] for p in exported["inherited"]] == ["verbose"]
+    schema.validate(exported, ["-v", "sub", "-v"])
+    with pytest.raises(CLError):
+        schema.validate(exported, ["-x", "sub"])
@@ -0,0 +1,133 @@
+# pylint: disable=disallowed-name,missing-function-docstring
+"""Test genbu.snapshot."""
+
+import json
+import os
+import pathlib
+import subprocess
+import sys
+import typing as t
+
+import pytest
+
+from genbu import Genbu, snapshot, usage
+
+
+def bar(count: int = 0) -> int:
+    """Bar."""
+    return count
+
+
+def foo() -> None:
+    """Foo."""
+
+
+cli = Genbu(foo, subparsers=[Genbu(bar), Genbu(lambda: None, name="baz")])
+
+
+def test_build() -> None:
+    result = snapshot.build(cli)
+    assert result["usage"] == {
+        "": usage(cli),
+        "bar": usage(cli.subparsers["bar"]),
+        "baz": usage(cli.subparsers["baz"]),
+    }
+    assert __file__ in result["files"]
+
+
+def test_lookup(tmp_path: pathlib.Path) -> None:
+    path = str(tmp_path / "usage.json")
+    snapshot.save(cli, path)
+    assert snapshot.lookup(path, []) == usage(cli)
+    assert snapshot.lookup(path, ["-h"]) == usage(cli)
+    assert snapshot.lookup(path, ["bar", "--count", "-h"]) == \
+        usage(cli.subparsers["bar"])
+    assert snapshot.lookup(path, ["foo", "bar"]) == usage(cli)
+
+
+def test_lookup_stale_snapshot(tmp_path: pathlib.Path) -> None:
+    path = str(tmp_path / "usage.json")
+    source = tmp_path / "source.py"
+    source.write_text("x = 0")
+    snapshot.save(cli, path, [str(source)])
+    assert snapshot.lookup(path, []) is not None
+
+    source.write_text("x = 1")
+    os.utime(source, ns=(0, 0))
+    assert snapshot.lookup(path, []) is None
+    source.unlink()
+    assert snapshot.lookup(path, []) is None
+
+
+def test_lookup_only_hashes_changed_files(tmp_path: pathlib.Path,
+                                          monkeypatch: pytest.MonkeyPatch,
+                                          ) -> None:
+    path = str(tmp_path / "usage.json")
+    source = tmp_path / "source.py"
+    source.write_text("x = 0")
+    snapshot.save(cli, path, [str(source)])
+
+    checksum = snapshot.checksum
+    calls = []
+
+    def counting_checksum(files: t.Iterable[str]) -> t.Optional[str]:
+        calls.append(files)
+        return checksum(files)
+
+    monkeypatch.setattr(snapshot, "checksum", counting_checksum)
+    assert snapshot.lookup(path, []) is not None
+    assert not calls
+
+    os.utime(source, ns=(0, 0))  # Touched but unchanged
+    assert snapshot.lookup(path, []) is not None
+    assert len(calls) == 1
+
+
+def test_lookup_invalid_snapshot(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "usage.json"
+    assert snapshot.lookup(str(path), []) is None
+    path.write_text("[")
+    assert snapshot.lookup(str(path), []) is None
+    path.write_text(json.dumps({"version": 0}))
+    assert snapshot.lookup(str(path), []) is None
+
+
+def test_exit_with_help(tmp_path: pathlib.Path) -> None:
+    path = str(tmp_path / "usage.json")
+    snapshot.exit_with_help(path, ["-h"])  # Missing snapshot
+
+    snapshot.save(cli, path)
+    snapshot.exit_with_help(path, ["bar"])
+    with pytest.raises(SystemExit) as info:
+        snapshot.exit_with_help(path, ["bar", "--help"])
+    assert info.value.code == usage(cli.subparsers["bar"])
+
+
+FAST_PATH = """
+import sys
+from genbu import snapshot
+try:
+    snapshot.exit_with_help(sys.argv[1], ["bar", "-h"])
+except SystemExit as exc:
+    print(exc.code)
+print(sorted(m for m in sys.modules if m.startswith("genbu")))
+"""
+
+
+def test_exit_with_help_only_imports_snapshot_reader(tmp_path: pathlib.Path,
+                                                     ) -> None:
+    path = str(tmp_path / "usage.json")
+    snapshot.save(cli, path)
+    output = subprocess.run([sys.executable, "-c", FAST_PATH, path],
+                            check=True, stdout=subprocess.PIPE,
+                            text=True).stdout
+    assert usage(cli.subparsers["bar"]) in output
+    assert output.rstrip().rsplit("\n", 1)[-1] == \
+        "['genbu', 'genbu.refs', 'genbu.snapshot']"
+
+
+def test_main(tmp_path: pathlib.Path) -> None:
+    path = str(tmp_path / "usage.json")
+    assert snapshot.main(["tests.test_snapshot:cli", path]) == 0
+    assert snapshot.lookup(path, ["baz"]) == usage(cli.subparsers["baz"])
+    assert snapshot.main([]) == 2
@@ -0,0 +1,195 @@
+# pylint: disable=missing-function-docstring,redefined-outer-name
+"""Test genbu.sources."""
+
+import json
+import os
+import pathlib
+import subprocess
+import sys
+import typing as t
+
+import pytest
+
+from genbu import Genbu, Param, combinators as comb
+from genbu.sources import (
+    ConfigError, EnvError, MISSING, SourceIndex, config_cache, lookup,
+    to_tokens,
+)
+
+
+@pytest.fixture
+def config(tmp_path: pathlib.Path) -> pathlib.Path:
+    """Create JSON config file."""
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({
+        "db": {"host": "localhost", "port": 5432},
+        "tags": ["a", "b"],
+        "verbose": True,
+    }))
+    return path
+
+
+def make_cli(**kwargs: t.Any) -> Genbu:
+    """Make Genbu with env and config sources."""
+    def callback(host: str = "default",
+                 port: int = 0,
+                 tags: t.Tuple[str, ...] = (),
+                 ) -> t.Any:
+        return host, port, tags
+
+    return Genbu(
+        callback,
+        params=[
+            Param("host", ["--host"], env=["APP_HOST", "HOST"],
+                  config_key="db.host"),
+            Param("port", ["--port"], comb.One(int), env=["APP_PORT"],
+                  config_key="db.port"),
+            Param("tags", ["--tags"], comb.Repeat(comb.One(str), then=tuple),
+                  env=["APP_TAGS"], config_key="tags"),
+        ],
+        **kwargs,
+    )
+
+
+def test_lookup() -> None:
+    config = {"a": {"b": {"c": 1}}, "d": 2}
+    assert lookup(config, ["a", "b", "c"]) == 1
+    assert lookup(config, ["d"]) == 2
+    assert lookup(config, ["d", "e"]) is MISSING
+    assert lookup(config, ["x"]) is MISSING
+
+
+def test_to_tokens() -> None:
+    assert to_tokens(True) == ["true"]
+    assert to_tokens(1.5) == ["1.5"]
+    assert to_tokens([1, [2, "a b"]]) == ["1", "2", "a b"]
+    assert to_tokens({"x": 1, "y": [2, 3]}) == ["x", "1", "y", "2", "3"]
+
+
+def test_precedence(config: pathlib.Path,
+                    monkeypatch: pytest.MonkeyPatch,
+                    ) -> None:
+    cli = make_cli(config_files=[config])
+    assert cli.run([]) == ("localhost", 5432, ("a", "b"))
+
+    monkeypatch.setenv("HOST", "env-host")
+    monkeypatch.setenv("APP_TAGS", "x 'y z'")
+    assert cli.run([]) == ("env-host", 5432, ("x", "y z"))
+
+    monkeypatch.setenv("APP_HOST", "app-host")
+    assert cli.run(["--port", "1"]) == ("app-host", 1, ("x", "y z"))
+    assert cli.run(["--host", "argv"])[0] == "argv"
+
+
+@pytest.mark.parametrize("value", ["hello world", "O'Brien", "", ' "a" '])
+def test_env_values_of_single_token_params_are_not_split(
+    value: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("APP_HOST", value)
+    assert make_cli().run([])[0] == value
+
+
+def test_env_values_of_multi_token_params_are_shell_split(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    cli = make_cli()
+    monkeypatch.setenv("APP_TAGS", "")
+    assert cli.run([])[2] == ()
+
+    monkeypatch.setenv("APP_TAGS", "O'Brien")
+    with pytest.raises(SystemExit) as exit_info:
+        cli.run([])
+    assert "environment variable APP_TAGS" in str(exit_info.value.code)
+
+    index = SourceIndex(cli.params)
+    with pytest.raises(EnvError) as info:
+        list(index.resolve((), environ={"APP_TAGS": "'"}))
+    assert info.value.name == "APP_TAGS"
+
+
+def make_flag_cli(**kwargs: t.Any) -> Genbu:
+    def callback(verbose: bool = False) -> bool:
+        return verbose
+
+    return Genbu(callback, params=[
+        Param("verbose", ["--verbose"], comb.Emit(True), env=["VERBOSE"],
+              config_key="verbose"),
+    ], **kwargs)
+
+
+@pytest.mark.parametrize("value,expected", [
+    ("1", True), ("yes", True), ("0", False), ("off", False), ("", False),
+])
+def test_flags_from_env(value: str, expected: bool,
+                        monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("VERBOSE", value)
+    assert make_flag_cli().run([]) is expected
+
+
+@pytest.mark.parametrize("value,expected", [
+    (True, True), ("true", True), (False, False), (0, False),
+])
+def test_flags_from_config(value: t.Any, expected: bool,
+                           tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "flags.json"
+    path.write_text(json.dumps({"verbose": value}))
+    assert make_flag_cli(config_files=[path]).run([]) is expected
+
+
+def test_toml_is_imported_lazily() -> None:
+    code = "import sys, genbu; print('tomllib' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", code], check=True,
+                            stdout=subprocess.PIPE, text=True).stdout
+    assert output.strip() == "False"
+
+
+def test_later_config_files_override_earlier_ones(config: pathlib.Path,
+                                                  ) -> None:
+    override = config.with_name("override.json")
+    override.write_text(json.dumps({"db": {"port": 1}}))
+    missing = config.with_name("missing.json")
+
+    cli = make_cli(config_files=[config, override, missing])
+    assert cli.run([]) == ("localhost", 1, ("a", "b"))
+
+
+def test_subcommands_inherit_config_files(config: pathlib.Path) -> None:
+    sub = make_cli(name="sub")
+    cli = Genbu(lambda: None, subparsers=[sub], config_files=[config])
+    assert cli.run(["sub"]) == ("localhost", 5432, ("a", "b"))
+
+
+def test_invalid_values(config: pathlib.Path,
+                        monkeypatch: pytest.MonkeyPatch,
+                        ) -> None:
+    cli = make_cli(config_files=[config])
+    monkeypatch.setenv("APP_PORT", "1 2")
+    with pytest.raises(SystemExit):
+        cli.run([])
+
+    config.write_text("[]")
+    with pytest.raises(SystemExit):
+        cli.run(["--port", "1"])
+
+
+def test_config_cache(config: pathlib.Path) -> None:
+    first = config_cache.load(config)
+    assert first is not None
+    assert config_cache.load(config) is first
+
+    config.write_text(json.dumps({"db": {}}))
+    os.utime(config, ns=(0, 0))
+    assert config_cache.load(config) == {"db": {}}
+
+    with pytest.raises(ConfigError):
+        config_cache.load(config.rename(config.with_suffix(".ini")))
+    assert config_cache.load(config.with_name("missing.json")) is None
+
+
+def test_source_index_skips_params_without_sources() -> None:
+    params = [Param("a"), Param("b", env=["B"])]
+    index = SourceIndex(params)
+    assert [s.param.dest for s in index.sources] == ["b"]
+    assert list(index.resolve((), environ={"B": "1"})) == [(params[1], ["1"])]
+    assert not SourceIndex([Param("a")])
@@ -0,0 +1,127 @@
+# pylint: disable=missing-function-docstring,redefined-outer-name
+"""Test genbu.startup."""
+
+import inspect
+import pathlib
+import sys
+import typing as t
+import uuid
+
+import pytest
+
+from genbu import Genbu, startup
+from genbu.infer import ParserMaker
+
+
+SUBCOMMAND = '''
+def greet(name: str, times: int = 1) -> str:
+    """Greet name."""
+    return name * times
+'''
+
+ROOT = '''
+from genbu import Genbu
+from {package} import greet
+
+cli = Genbu(lambda: None, name="tool", subparsers=[Genbu(greet.greet)])
+'''
+
+
+@pytest.fixture
+def package(tmp_path: pathlib.Path,
+            monkeypatch: pytest.MonkeyPatch,
+            ) -> t.Iterator[str]:
+    """Make package with a Genbu tree that hasn't been imported yet."""
+    name = f"startup_{uuid.uuid4().hex}"
+    directory = tmp_path / name
+    directory.mkdir()
+    (directory / "__init__.py").write_text("")
+    (directory / "greet.py").write_text(SUBCOMMAND)
+    (directory / "cli.py").write_text(ROOT.format(package=name))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield name
+    for module in [m for m in sys.modules if m.startswith(name)]:
+        del sys.modules[module]
+
+
+def test_profile_times_imports_inference_and_usage(package: str) -> None:
+    profiler, cli = startup.profile(f"{package}.cli:cli")
+    assert isinstance(cli, Genbu)
+
+    labels = set(profiler.entries)
+    assert {
+        f"import {package}.cli",
+        f"import {package}.greet",
+        "Genbu(greet)",
+        f"infer_params {package}.greet.greet",
+        f"signature {package}.greet.greet",
+        "infer_parser <class 'int'>",
+        "usage",
+        "usage greet",
+    } <= labels
+
+    stacks = set(profiler.samples)
+    assert (f"import {package}.cli", f"import {package}.greet") in stacks
+    assert any(s[:2] == (f"import {package}.cli", "Genbu(greet)")
+               for s in stacks)
+
+
+def test_profile_restores_patched_functions(package: str) -> None:
+    originals = (Genbu.__init__, inspect.signature, ParserMaker.infer_parser)
+    finders = list(sys.meta_path)
+    startup.profile(f"{package}.cli:cli")
+    assert (Genbu.__init__, inspect.signature,
+            ParserMaker.infer_parser) == originals
+    assert sys.meta_path == finders
+
+
+def test_report_is_sorted_by_total_time() -> None:
+    profiler = startup.Profiler()
+    profiler.record(("a",), 1.0, 0.5)
+    profiler.record(("a", "b"), 0.5, 0.5)
+    profiler.record(("c",), 2.0, 2.0)
+
+    lines = profiler.report().splitlines()
+    assert lines[0].split() == ["total", "ms", "self", "ms", "calls", "label"]
+    assert [line.split()[-1] for line in lines[1:]] == ["c", "a", "b"]
+    assert lines[1].split()[:3] == ["2000.000", "2000.000", "1"]
+    assert profiler.report(limit=1).count("\n") == 1
+
+
+def test_recursive_spans_are_counted_once() -> None:
+    profiler = startup.Profiler()
+    with profiler.span("a"):
+        with profiler.span("a"):
+            pass
+    entry = profiler.entries["a"]
+    assert entry.calls == 2
+    assert entry.total <= entry.self_time + 1e-3
+
+
+def test_folded_stacks() -> None:
+    profiler = startup.Profiler()
+    profiler.record(("import x", "infer_parser a;b"), 0.002, 0.002)
+    profiler.record(("import x",), 0.003, 0.001)
+    assert profiler.folded() == (
+        "import x 1000\n"
+        "import x;infer_parser a,b 2000\n"
+    )
+
+
+def test_main(package: str,
+              tmp_path: pathlib.Path,
+              capsys: pytest.CaptureFixture[str],
+              ) -> None:
+    output = tmp_path / "startup.folded"
+    assert startup.main([f"{package}.cli:cli", str(output)]) == 0
+    assert f"import {package}.greet" in capsys.readouterr().out
+    assert all(line.rsplit(" ", 1)[1].isdigit()
+               for line in output.read_text().splitlines())
+
+
+@pytest.mark.parametrize("argv", [[], ["module"], ["a:b", "c", "d"]])
+def test_main_rejects_bad_arguments(argv: t.List[str],
+                                    capsys: pytest.CaptureFixture[str],
+                                    ) -> None:
+    assert startup.main(argv) == 2
+    assert "Usage:" in capsys.readouterr().err
@@ -0,0 +1,86 @@
+# pylint: disable=missing-function-docstring
+"""Test genbu.suggest."""
+
+import typing as t
+
+from hypothesis import given, strategies as st
+import pytest
+
+from genbu import Genbu, Param, UnknownOption, combinators as comb
+from genbu.suggest import Index, NGramIndex, distance
+
+words = st.text(alphabet="abc-", max_size=8)
+
+
+@pytest.mark.parametrize("source,target,expected", [
+    ("", "", 0),
+    ("abc", "", 3),
+    ("kitten", "sitting", 3),
+    ("--verbose", "--verbsoe", 2),
+])
+def test_distance(source: str, target: str, expected: int) -> None:
+    assert distance(source, target) == expected
+    assert distance(target, source) == expected
+    assert distance(source, target, limit=1) == min(expected, 2)
+
+
+@given(st.lists(words), words, st.integers(0, 3))
+def test_ngram_index_matches_linear_scan(vocabulary: t.List[str],
+                                         word: str,
+                                         limit: int,
+                                         ) -> None:
+    expected = sorted(
+        (distance(word, w), w) for w in set(vocabulary)
+        if distance(word, w) <= limit
+    )
+    assert NGramIndex(vocabulary).search(word, limit) == expected
+
+
+def test_index_separates_options_and_commands() -> None:
+    index = Index(["--color", "--colour", "--version", "-v"],
+                  ["install", "remove"])
+    assert index.suggest("--colou") == ["--color", "--colour"]
+    assert index.suggest("--verison") == ["--version"]
+    assert index.suggest("instal") == ["install"]
+    assert index.suggest("-install") == []
+    assert index.suggest("xyz") == []
+
+
+def test_unknown_option_suggestions() -> None:
+    def raise_error(_: Genbu, exc: Exception) -> t.NoReturn:
+        raise exc
+
+    def install(force: bool = False, verbose: bool = False) -> t.Any:
+        """Install."""
+        return force, verbose
+
+    cli = Genbu(
+        lambda: None,
+        name="pkg",
+        subparsers=[
+            Genbu(install, error_handler=raise_error),
+            Genbu(lambda: None, name="remove"),
+        ],
+        params=[Param("color", ["--color"], comb.Emit(True))],
+        error_handler=raise_error,
+    )
+    with pytest.raises(UnknownOption) as info:
+        cli.parse(["instal"])
+    assert info.value.suggestions == ["install"]
+
+    with pytest.raises(UnknownOption) as info:
+        cli.parse(["--colr"])
+    assert info.value.suggestions == ["--color"]
+
+    with pytest.raises(UnknownOption) as info:
+        cli.parse(["install", "--frce"])
+    assert info.value.suggestions == ["--force"]
+
+
+def test_default_error_handler_shows_suggestions() -> None:
+    cli = Genbu(lambda: None, name="pkg", subparsers=[
+        Genbu(lambda: None, name="install"),
+    ])
+    with pytest.raises(SystemExit) as info:
+        cli.run(["instal"])
+    assert str(info.value.code).endswith("Did you mean install?")
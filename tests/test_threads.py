@@ -0,0 +1,102 @@
+# pylint: disable=missing-function-docstring
+"""Test parsing with shared Genbu trees in multiple threads."""
+
+import concurrent.futures
+import sys
+import threading
+import typing as t
+
+import pytest
+
+from genbu import Genbu, Param, ParserMaker, combinators as comb
+
+THREADS = 8
+
+
+@pytest.fixture(autouse=True)
+def switch_often() -> t.Iterator[None]:
+    """Make threads switch more often to expose races."""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def run_threads(func: t.Callable[[int], t.Any]) -> t.List[t.Any]:
+    """Run func(index) in THREADS threads that start at the same time."""
+    barrier = threading.Barrier(THREADS)
+
+    def target(index: int) -> t.Any:
+        barrier.wait()
+        return func(index)
+
+    with concurrent.futures.ThreadPoolExecutor(THREADS) as executor:
+        return list(executor.map(target, range(THREADS)))
+
+
+def add(numbers: t.List[float], scale: int = 1, verbose: bool = False,
+        ) -> t.Any:
+    """Add numbers."""
+    return sum(numbers) * scale, verbose
+
+
+def make_cli() -> Genbu:
+    ambiguous = comb.Packrat(comb.And(
+        comb.Repeat(comb.Or(comb.One(int), comb.One(float))),
+        comb.One(str),
+    ))
+    return Genbu(
+        lambda: None,
+        name="tool",
+        subparsers=[
+            Genbu(add, params=[
+                "...",
+                Param("verbose", ["-v"], comb.Emit(True)),
+            ]),
+            Genbu(lambda tail: tail, name="tail", params=[
+                Param("tail", ["--tail"], ambiguous),
+            ]),
+        ],
+    )
+
+
+def make_argv(index: int) -> t.List[str]:
+    if index % 2:
+        return ["add", "--numbers", *map(str, range(index)), "--scale",
+                str(index), "-v"]
+    return ["tail", "--tail", *map(str, range(index)), f"x{index}"]
+
+
+def test_shared_tree_parses_like_sequential_runs() -> None:
+    cli = make_cli()
+    inputs = [make_argv(i) for i in range(50)]
+    expected = [cli.run(argv) for argv in inputs]
+
+    def work(_: int) -> t.List[t.Any]:
+        return [cli.run(argv) for _ in range(20) for argv in inputs]
+
+    for results in run_threads(work):
+        assert results == expected * 20
+
+
+def test_shared_parser_maker() -> None:
+    maker = ParserMaker(maxsize=4)
+    hints = [int, float, str, complex, bytes, bool, t.List[int]]
+
+    def work(index: int) -> t.List[comb.Parser]:
+        return [
+            maker.infer_parser(hints[(index + i) % len(hints)])
+            for i in range(200)
+        ]
+
+    for results in run_threads(work):
+        assert all(isinstance(p, comb.Parser) for p in results)
+    info = maker.cache_info()
+    assert info.currsize <= 4
+
+
+def test_concurrent_misses_share_parser() -> None:
+    maker = ParserMaker()
+    results = run_threads(lambda _: maker.infer_parser(complex))
+    assert all(p is results[0] for p in results)
+    assert maker.infer_parser(complex) is results[0]
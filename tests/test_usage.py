@@ -216,3 +216,26 @@ def test_usage_subcommand_with_no_description() -> None:
     actual = usage(cli)
     assert expected in actual
     assert "None" not in actual
+
+
+def test_usage_with_inherited_options() -> None:
+    """Inherited options are listed once, as global options."""
+    def show(name: str, verbose: bool = False) -> None:  # noqa; # pylint: disable=W0613
+        """Show."""
+
+    sub = Genbu(show)
+    Genbu(
+        callback,
+        name="tool",
+        subparsers=[sub],
+        inherited=[Param("verbose", ["-v"], comb.Emit(True))],
+    )
+    assert usage(sub) == """usage:  tool show [options]
+
+Show.
+
+options:
+    --name <str>
+
+global options:
+    -v"""